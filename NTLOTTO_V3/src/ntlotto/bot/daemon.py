@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import argparse
+import hmac
+import importlib
+import io
+import json
+import os
+import secrets
+import sys
+import threading
+import traceback
+import urllib.error
+import urllib.request
+from contextlib import redirect_stderr, redirect_stdout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+"""
+NTLOTTO v3 CLI daemon
+Role: Keep one warm interpreter (pandas imported, SSOT tables memoized) for the bot flow.
+
+`python -m ntlotto.bot.daemon start` serves POST /call {"method": "run_cli", "params": {...}}
+on localhost. run_cli() is the thin client used by krflow: it sends the CLI step to the daemon
+when one answers, otherwise runs the CLI's main() in this process. No step starts a new
+interpreter any more.
+
+A step's output is echoed line by line while it runs (the daemon streams it back as JSON lines
+{"output": ...}, then {"ok": ..., "result": ...}). An exception from main() ends the step like
+a child interpreter would: traceback in the output, exit code 1.
+
+Requests must carry the token the daemon wrote at start to a 0600 file under the project
+(token_path(port)) in the X-NTLotto-Daemon-Token header, Content-Type application/json and a
+localhost Host header, so neither other local users nor browser pages can call it. The daemon
+takes no environment from a request: a step run with a LOCAL_ENV gate set (combo generation)
+runs in-process, and the daemon's own steps run with the gates unset. A request's cwd and
+every path argument (PATH_FLAGS) must resolve inside the project.
+
+NTLOTTO_DAEMON=0 skips the daemon; NTLOTTO_DAEMON_PORT moves it.
+"""
+
+HOST = "127.0.0.1"
+PORT = 8766
+
+# ntlotto.cli modules the daemon may run
+CLI_MODULES = (
+    "make_reports", "make_why_reports", "eval_k_cli", "set_strategy_cli",
+    "generate_combos_cli", "score_round_cli", "update_weights_cli",
+)
+# Environment gates the CLIs read: never taken from a request (see run_cli())
+LOCAL_ENV = ("ALLOW_COMBO_GENERATION",)
+# CLI options (argparse dest names) whose value is a file or directory
+PATH_FLAGS = ("outdir", "histdir", "out", "combos", "selection", "eval_json")
+
+TOKEN_HEADER = "X-NTLotto-Daemon-Token"
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+def token_path(port: int) -> Path:
+    return PROJECT_ROOT / "data" / f".bot_daemon_{int(port)}.token"
+
+class _Tee(io.TextIOBase):
+    """Text stream that keeps everything written and passes complete lines to echo."""
+    def __init__(self, echo: Optional[Callable[[str], None]] = None):
+        self._buf = io.StringIO()
+        self._echo = echo
+        self._pending = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._buf.write(s)
+        if self._echo is not None:
+            self._pending += s
+            cut = self._pending.rfind("\n") + 1
+            if cut:
+                self._echo(self._pending[:cut])
+                self._pending = self._pending[cut:]
+        return len(s)
+
+    def flush(self) -> None:
+        if self._echo is not None and self._pending:
+            self._echo(self._pending)
+            self._pending = ""
+
+    def getvalue(self) -> str:
+        return self._buf.getvalue()
+
+def _in_project(path: Path) -> bool:
+    path = path.resolve()
+    return path == PROJECT_ROOT or PROJECT_ROOT in path.parents
+
+def _check_cwd(cwd: Optional[str]) -> Optional[str]:
+    if not cwd:
+        return None
+    if not _in_project(Path(cwd)):
+        raise ValueError(f"cwd outside the project: {cwd}")
+    if not Path(cwd).resolve().is_dir():
+        raise ValueError(f"cwd is not a directory: {cwd}")
+    return str(Path(cwd).resolve())
+
+def _is_path_flag(arg: str) -> bool:
+    # argparse also accepts unambiguous prefixes (--outd for --outdir)
+    name = arg.lstrip("-")
+    return arg.startswith("-") and bool(name) and any(f.startswith(name) for f in PATH_FLAGS)
+
+def _check_args(args: List[str], cwd: Optional[str]) -> None:
+    """ValueError when a PATH_FLAGS value resolves outside the project (relative to cwd)."""
+    base = Path(cwd) if cwd else Path.cwd()
+    expect_path = False
+    for a in args:
+        if expect_path:
+            value, expect_path = a, False
+        else:
+            flag, eq, value = a.partition("=")
+            if not _is_path_flag(flag):
+                continue
+            if not eq:
+                expect_path = True
+                continue
+        if not _in_project(base / value):
+            raise ValueError(f"Path argument outside the project: {value}")
+
+def _write_token(path: Path) -> str:
+    token = secrets.token_hex(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists() or path.is_symlink():
+        path.unlink()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+def _read_token(port: int) -> Optional[str]:
+    try:
+        return token_path(port).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+class CliService:
+    """remote: serving requests (LOCAL_ENV gates unset, path arguments confined to the project)."""
+    def __init__(self, remote: bool = False):
+        self.remote = remote
+        self._lock = threading.Lock()
+
+    def warm(self) -> None:
+        # Populates the in-process SSOT table memo (ntlotto.core.ssot_cache)
+        from ntlotto.core.load_ssot import load_ssot
+        s_path, o_path = PROJECT_ROOT / "data" / "ssot_sorted.csv", PROJECT_ROOT / "data" / "ssot_ordered.csv"
+        if s_path.exists() and o_path.exists():
+            load_ssot(str(s_path), str(o_path))
+
+    def dispatch(self, method: str, params: dict, echo: Optional[Callable[[str], None]] = None) -> Any:
+        if method == "ping":
+            return {"pid": os.getpid()}
+        if method != "run_cli":
+            raise ValueError(f"Unknown method: {method}")
+        with self._lock:
+            return self.run_cli(echo=echo, **params)
+
+    def run_cli(self, module: str, args: list, cwd: Optional[str] = None,
+                echo: Optional[Callable[[str], None]] = None) -> dict:
+        """
+        Run ntlotto.cli.<module>.main() with args; returns {"code": exit code, "output": text}.
+        Output goes to echo line by line as it is written. An exception from main() returns
+        code 1 with the traceback at the end of the output.
+        """
+        if module not in CLI_MODULES:
+            raise ValueError(f"Unknown CLI module: {module}")
+        args = [str(a) for a in args]
+        cwd = _check_cwd(cwd)
+        env = {}
+        if self.remote:
+            _check_args(args, cwd)
+            env = {k: None for k in LOCAL_ENV}
+        old_argv, old_cwd = sys.argv, os.getcwd()
+        old_env = {k: os.environ.get(k) for k in env}
+        out = _Tee(echo)
+        code = 0
+        try:
+            sys.argv = [f"ntlotto.cli.{module}"] + args
+            if cwd:
+                os.chdir(cwd)
+            for k, v in env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+            with redirect_stdout(out), redirect_stderr(out):
+                try:
+                    importlib.import_module(f"ntlotto.cli.{module}").main()
+                except SystemExit as e:
+                    code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+                finally:
+                    out.flush()
+        finally:
+            sys.argv = old_argv
+            os.chdir(old_cwd)
+            for k, v in old_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+        return {"code": code, "output": out.getvalue()}
+
+def _host_name(host: str) -> str:
+    if host.startswith("["):
+        return host[1:host.find("]")]
+    return host.rsplit(":", 1)[0]
+
+def _handler(service: CliService, stop):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            refused = self._refused()
+            if refused is not None:
+                self._reply({"ok": False, "error": refused[1]}, status=refused[0])
+                return
+            if self.path == "/shutdown":
+                self._reply({"ok": True, "result": None})
+                stop()
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except Exception as e:
+                self._reply({"ok": False, "error": f"{type(e).__name__}: {e}"})
+                return
+            method, params = body.get("method", ""), body.get("params") or {}
+            if method == "run_cli":
+                self._stream(method, params)
+                return
+            try:
+                self._reply({"ok": True, "result": service.dispatch(method, params)})
+            except Exception as e:
+                self._reply({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+        def _stream(self, method: str, params: dict):
+            # JSON lines without Content-Length: the body ends when the connection closes (HTTP/1.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            gone = []
+
+            def emit(obj: dict):
+                if gone:
+                    return
+                try:
+                    self.wfile.write((json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except OSError:
+                    # Client went away: the step still runs to the end
+                    gone.append(True)
+
+            try:
+                emit({"ok": True, "result": service.dispatch(method, params, echo=lambda s: emit({"output": s}))})
+            except Exception as e:
+                emit({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+        def _refused(self) -> Optional[Tuple[int, str]]:
+            """(status, reason) unless the request is a localhost JSON call with the token."""
+            if _host_name(self.headers.get("Host", "")) not in LOCAL_HOSTS:
+                return 403, "Host must be localhost"
+            if self.headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json":
+                return 415, "Content-Type must be application/json"
+            if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode("utf-8"), self.server.token.encode("utf-8")):
+                return 403, "Bad or missing daemon token"
+            return None
+
+        def _reply(self, obj: dict, status: int = 200):
+            data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+class DaemonServer(HTTPServer):
+    """HTTPServer holding the request token; removes its token file on server_close()."""
+    token: str = ""
+    token_file: Optional[Path] = None
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.token_file is not None and self.token_file.exists():
+            self.token_file.unlink()
+
+def make_server(port: int = PORT, service: Optional[CliService] = None) -> DaemonServer:
+    service = service or CliService(remote=True)
+    server: Optional[DaemonServer] = None
+
+    def stop():
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    server = DaemonServer((HOST, port), _handler(service, stop))
+    server.service = service
+    server.token_file = token_path(server.server_address[1])
+    server.token = _write_token(server.token_file)
+    return server
+
+# --- client ---
+
+def _port() -> int:
+    return int(os.environ.get("NTLOTTO_DAEMON_PORT", PORT))
+
+def _request(path: str, obj: dict, port: Optional[int]) -> urllib.request.Request:
+    port = port or _port()
+    return urllib.request.Request(
+        f"http://{HOST}:{port}{path}", data=json.dumps(obj).encode("utf-8"),
+        headers={"Content-Type": "application/json", TOKEN_HEADER: _read_token(port) or ""}, method="POST")
+
+def _post(path: str, obj: dict, timeout: float, port: Optional[int] = None) -> dict:
+    try:
+        with urllib.request.urlopen(_request(path, obj, port), timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        # Refusals (403/415) still carry a JSON {"ok": false, "error"} body
+        with e:
+            return json.loads(e.read().decode("utf-8"))
+
+def _post_stream(path: str, obj: dict, timeout: float, port: Optional[int] = None) -> dict:
+    """POST expecting JSON lines: prints {"output"} lines as they arrive, returns the final reply."""
+    reply = {"ok": False, "error": "데몬 응답이 끊겼습니다"}
+    with urllib.request.urlopen(_request(path, obj, port), timeout=timeout) as resp:
+        for line in resp:
+            msg = json.loads(line.decode("utf-8"))
+            if "output" in msg:
+                print(msg["output"], end="", flush=True)
+            else:
+                reply = msg
+    return reply
+
+def daemon_available(port: Optional[int] = None) -> bool:
+    if _read_token(port or _port()) is None:
+        return False
+    try:
+        return bool(_post("/call", {"method": "ping", "params": {}}, 0.5, port).get("ok"))
+    except (OSError, ValueError):
+        return False
+
+_LOCAL: Optional[CliService] = None
+
+def run_cli(module: str, args: list) -> None:
+    """
+    Run one ntlotto.cli step (daemon first, in-process otherwise), echo its output and raise
+    on a non-zero exit like subprocess.check_call did.
+    """
+    global _LOCAL
+    args = [str(a) for a in args]
+    # Gated steps (LOCAL_ENV set here) never go to the daemon
+    gated = any(os.environ.get(k) is not None for k in LOCAL_ENV)
+    if os.environ.get("NTLOTTO_DAEMON") != "0" and not gated and daemon_available():
+        params = {"module": module, "args": args, "cwd": os.getcwd()}
+        reply = _post_stream("/call", {"method": "run_cli", "params": params}, 3600.0)
+        if not reply.get("ok"):
+            raise RuntimeError(f"[데몬 오류] {reply.get('error')}")
+        res = reply["result"]
+    else:
+        # Same process: cwd and environment are already this process's own
+        if _LOCAL is None:
+            _LOCAL = CliService()
+        stdout = sys.stdout
+
+        def echo(s: str) -> None:
+            stdout.write(s)
+            stdout.flush()
+
+        res = _LOCAL.run_cli(module, args, echo=echo)
+    if res["code"] != 0:
+        raise RuntimeError(f"[실행 오류] ntlotto.cli.{module} 종료 코드 {res['code']}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("command", choices=["start", "status", "stop"])
+    ap.add_argument("--port", type=int, default=_port())
+    args = ap.parse_args()
+
+    if args.command == "start":
+        if daemon_available(args.port):
+            raise RuntimeError(f"이미 실행 중입니다: {HOST}:{args.port}")
+        server = make_server(args.port)
+        server.service.warm()
+        print(f"[daemon] {HOST}:{args.port} (pid {os.getpid()}, token {server.token_file})")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+    elif args.command == "status":
+        print("running" if daemon_available(args.port) else "stopped")
+    elif daemon_available(args.port):
+        _post("/shutdown", {}, 5.0, args.port)
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,14 @@ from __future__ import annotations
 import argparse
 import os
 import re
-import subprocess
 from pathlib import Path
 
+from ntlotto.bot.daemon import run_cli
 from ntlotto.bot.session_state import load_state, save_state, SessionState
 
-def _run(cmd: list[str]) -> None:
-    subprocess.check_call(cmd)
+def _run(module: str, args: list[str]) -> None:
+    # 데몬(있으면) 또는 현재 프로세스에서 실행: 단계마다 인터프리터를 새로 띄우지 않음
+    run_cli(module, args)
 
 def _require_project_root() -> None:
     if not Path("data/ssot_sorted.csv").exists() or not Path("data/ssot_ordered.csv").exists():
@@ -44,8 +45,8 @@ def main():
         # - make_reports로 WHY/엔진 리포트 생성(분석)
         # - eval_k_cli로 엔진 평가 리포트 생성(학습 근거)
         # ※ 여기서 조합 생성은 절대 하지 않음
-        _run(["python","-m","ntlotto.cli.make_reports","--round",str(R),"--long","100","--short","5,10,15,20,25,30"])
-        _run(["python","-m","ntlotto.cli.eval_k_cli","--k","20","--n","100"])
+        _run("make_reports", ["--round",str(R),"--long","100","--short","5,10,15,20,25,30"])
+        _run("eval_k_cli", ["--k","20","--n","100"])
 
         st.analyzed_up_to_round = R
         # 리포트 대상은 기본적으로 "다음 회차"를 가정(운영 루프)
@@ -59,7 +60,7 @@ def main():
         if st.report_round is None:
             raise RuntimeError("[상태 오류] 먼저 '<회차>회차까지 데이터들을 분석/학습해' 를 실행하세요.")
         R = st.report_round
-        _run(["python","-m","ntlotto.cli.make_reports","--round",str(R),"--long","100","--short","5,10,15,20,25,30"])
+        _run("make_reports", ["--round",str(R),"--long","100","--short","5,10,15,20,25,30"])
         save_state(st)
         _print_done("리포트생성완료")
         return
@@ -80,8 +81,7 @@ def main():
         quota_text = re.sub(r"(로\s*)?(생성해|만들어|뽑아).*?$", "", quota_text).strip()
 
         selection_path = f"docs/reports/latest/ENGINE_SELECTION_R{R}_M50.json"
-        _run([
-            "python","-m","ntlotto.cli.set_strategy_cli",
+        _run("set_strategy_cli", [
             "--round",str(R),
             "--M","50",
             "--seed","20260222",
@@ -93,8 +93,7 @@ def main():
             "--out",selection_path
         ])
 
-        _run([
-            "python","-m","ntlotto.cli.generate_combos_cli",
+        _run("generate_combos_cli", [
             "--round",str(R),
             "--selection",selection_path,
             "--i_understand_and_allow_generation"
@@ -118,8 +117,7 @@ def main():
             raise ValueError("[입력 오류] 당첨번호는 6개(추첨순서)여야 합니다. 예: 당첨번호 8 25 44 31 5 41 보너스 45 채점해")
 
         R = st.predicted_round
-        _run([
-            "python","-m","ntlotto.cli.score_round_cli",
+        _run("score_round_cli", [
             "--round",str(R),
             "--combos",st.predicted_csv,
             "--ordered"," ".join(map(str, ordered_nums)),
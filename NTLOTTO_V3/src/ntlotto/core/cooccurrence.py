@@ -0,0 +1,124 @@
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Optional
+import numpy as np
+import pandas as pd
+
+"""
+Co-occurrence
+Role: Dense 45x45 pair statistics from one-hot draw rows.
+
+    counts[i, j] = rounds in which i+1 and j+1 were both drawn (diagonal = single counts)
+    lift[i, j]   = p(i,j) / (p(i) * p(j))
+    pmi[i, j]    = log(lift[i, j])
+
+Counts come from one matrix product (X^T X over a (W,45) one-hot window). Matrices are
+float32 by default; pair_table() lists the co-occurring pairs in float64.
+"""
+
+N_NUMBERS = 45
+
+def pair_counts(onehot: np.ndarray) -> np.ndarray:
+    """(W,45) one-hot rows -> (45,45) float32 counts (exact below 2**24 rows)."""
+    x = np.asarray(onehot, dtype=np.float32).reshape(-1, N_NUMBERS)
+    return x.T @ x
+
+def pair_prefix(onehot: np.ndarray) -> np.ndarray:
+    """
+    (T,45) one-hot rows -> (T+1,45,45) int32 cumulative counts,
+    so counts over rows [a, b) = prefix[b] - prefix[a].
+    """
+    x = np.asarray(onehot, dtype=np.int32).reshape(-1, N_NUMBERS)
+    out = np.zeros((x.shape[0] + 1, N_NUMBERS, N_NUMBERS), dtype=np.int32)
+    np.cumsum(x[:, :, None] * x[:, None, :], axis=0, out=out[1:])
+    return out
+
+def lift_matrix(counts: np.ndarray, n_rows: int, eps: float = 0.0, dtype=np.float32) -> np.ndarray:
+    """lift = (c_ij / n) / (p_i * p_j + eps); 0 where the denominator is 0."""
+    c = np.asarray(counts, dtype=dtype)
+    n = max(1, n_rows)
+    p = np.diagonal(c) / n
+    denom = np.outer(p, p) + eps
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lift = (c / n) / denom
+    lift[denom == 0] = 0.0
+    return lift.astype(dtype, copy=False)
+
+def pmi_matrix(counts: np.ndarray, n_rows: int, eps: float = 0.0, base: float = 2.0, floor: float = -10.0, dtype=np.float32) -> np.ndarray:
+    """pmi = log_base(lift) for co-occurring pairs, floor where the pair never occurred."""
+    lift = lift_matrix(counts, n_rows, eps=eps, dtype=dtype)
+    seen = (np.asarray(counts) > 0) & (lift > 0)
+    out = np.full(lift.shape, floor, dtype=dtype)
+    with np.errstate(divide="ignore"):
+        if base == 2.0:
+            logs = np.log2(lift[seen])
+        elif base == np.e:
+            logs = np.log(lift[seen])
+        else:
+            logs = np.log(lift[seen]) / np.log(base)
+    out[seen] = logs
+    return out
+
+def pair_table(counts: np.ndarray, n_rows: int) -> pd.DataFrame:
+    """
+    Co-occurring pairs (n1 < n2) as a DataFrame: n1, n2, count, lift, pmi.
+    Float64, ordered by (n1, n2).
+    """
+    c = np.rint(np.asarray(counts)).astype(np.int64)
+    iu, ju = np.triu_indices(N_NUMBERS, k=1)
+    c_pair = c[iu, ju]
+    keep = c_pair > 0
+    if not keep.any():
+        return pd.DataFrame()
+    iu, ju, c_pair = iu[keep], ju[keep], c_pair[keep]
+    N = max(1, n_rows)
+    single = np.diagonal(c)
+    p_n1 = single[iu] / N
+    p_n2 = single[ju] / N
+    p_pair = c_pair / N
+    lift = p_pair / (p_n1 * p_n2)
+    pmi = np.log2(lift)
+    return pd.DataFrame({'n1': iu + 1, 'n2': ju + 1, 'count': c_pair, 'lift': lift, 'pmi': pmi})
+
+class CooccurrenceWindow:
+    """
+    Incrementally maintained pair counts.
+    add()/remove() apply one draw (numbers 1..45) as a 6x6 block update; with size set,
+    push() also drops the oldest draw once the window is full.
+    """
+    def __init__(self, size: Optional[int] = None):
+        self.size = size
+        self.counts = np.zeros((N_NUMBERS, N_NUMBERS), dtype=np.int64)
+        self.n_rows = 0
+        self._rows: Deque[np.ndarray] = deque()
+
+    def add(self, numbers) -> None:
+        idx = _index_of(numbers)
+        self.counts[np.ix_(idx, idx)] += 1
+        self.n_rows += 1
+
+    def remove(self, numbers) -> None:
+        idx = _index_of(numbers)
+        self.counts[np.ix_(idx, idx)] -= 1
+        self.n_rows -= 1
+
+    def push(self, numbers) -> None:
+        idx = _index_of(numbers)
+        self.add(idx + 1)
+        if self.size is not None:
+            self._rows.append(idx)
+            if len(self._rows) > self.size:
+                self.remove(self._rows.popleft() + 1)
+
+    def lift(self, **kwargs) -> np.ndarray:
+        return lift_matrix(self.counts, self.n_rows, **kwargs)
+
+    def pmi(self, **kwargs) -> np.ndarray:
+        return pmi_matrix(self.counts, self.n_rows, **kwargs)
+
+    def table(self) -> pd.DataFrame:
+        return pair_table(self.counts, self.n_rows)
+
+def _index_of(numbers) -> np.ndarray:
+    idx = np.asarray(numbers, dtype=np.intp).ravel() - 1
+    return idx[(idx >= 0) & (idx < N_NUMBERS)]
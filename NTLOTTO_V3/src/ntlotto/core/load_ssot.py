@@ -1,12 +1,14 @@
 from __future__ import annotations
 import pandas as pd
 
+from .ssot_cache import load_ssot_frame
+
 SORTED_COLS = ["round","date","n1","n2","n3","n4","n5","n6","bonus"]
 ORDERED_COLS = ["round","date","b1","b2","b3","b4","b5","b6","bonus"]
 
 def load_ssot(sorted_path: str, ordered_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    df_s = pd.read_csv(sorted_path).dropna()
-    df_o = pd.read_csv(ordered_path).dropna()
+    df_s = load_ssot_frame(sorted_path).dropna()
+    df_o = load_ssot_frame(ordered_path).dropna()
 
     if list(df_s.columns) != SORTED_COLS:
         raise ValueError(f"ssot_sorted.csv columns must be {SORTED_COLS}, got {list(df_s.columns)}")
@@ -0,0 +1,189 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+"""
+SSOT Binary Sidecar Cache
+Role: Parse ssot_*.csv once, then memory-map a compact columnar copy.
+
+Layout (next to the CSV):
+    .ssot_cache/<name>.npy        structured array (round:int32, date:U*, n*/b*/bonus:int8)
+    .ssot_cache/<name>.meta.json  CSV fingerprint (size, mtime_ns, sha256) + column order
+
+The sidecar is rebuilt only when the CSV's size, mtime or content hash changes.
+"""
+
+CACHE_DIRNAME = ".ssot_cache"
+CACHE_VERSION = 1
+
+ROUND_COL = "round"
+DATE_COL = "date"
+NUMBER_COLS = ["n1", "n2", "n3", "n4", "n5", "n6", "b1", "b2", "b3", "b4", "b5", "b6", "bonus"]
+
+# In-process memo: csv path -> (size, mtime_ns, table)
+_TABLES: Dict[str, Tuple[int, int, np.ndarray]] = {}
+
+def sidecar_paths(csv_path: str) -> Tuple[str, str]:
+    """Return (npy_path, meta_path) of the sidecar belonging to csv_path."""
+    base = os.path.basename(csv_path)
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIRNAME)
+    return os.path.join(cache_dir, base + ".npy"), os.path.join(cache_dir, base + ".meta.json")
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_draw_table(csv_path: str) -> np.ndarray:
+    """
+    Load the SSOT CSV as a structured NumPy array.
+
+    Returns a read-only memory-mapped array when the sidecar is usable,
+    otherwise the freshly parsed in-memory table.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"SSOT CSV not found: {csv_path}")
+
+    key = os.path.abspath(csv_path)
+    st = os.stat(key)
+    memo = _TABLES.get(key)
+    if memo is not None and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+        return memo[2]
+
+    npy_path, meta_path = sidecar_paths(key)
+    meta = _read_meta(meta_path)
+    table = None
+
+    if meta is not None and os.path.exists(npy_path):
+        if meta["size"] == st.st_size and meta["mtime_ns"] == st.st_mtime_ns:
+            table = _open_sidecar(npy_path)
+        elif meta["size"] == st.st_size and meta["sha256"] == file_sha256(key):
+            # Touched but unchanged (e.g. re-checkout): refresh the fingerprint only
+            meta["mtime_ns"] = st.st_mtime_ns
+            _write_meta(meta_path, meta)
+            table = _open_sidecar(npy_path)
+
+    if table is None:
+        table = build_draw_table(key)
+        if _write_sidecar(key, table, st):
+            table = _open_sidecar(npy_path)
+
+    _TABLES[key] = (st.st_size, st.st_mtime_ns, table)
+    return table
+
+def build_draw_table(csv_path: str) -> np.ndarray:
+    """
+    Parse the CSV into a structured array.
+    Rows with a missing round or number (e.g. a broken trailing line) are dropped.
+    """
+    df = pd.read_csv(csv_path)
+    unknown = [c for c in df.columns if c not in [ROUND_COL, DATE_COL] + NUMBER_COLS]
+    if ROUND_COL not in df.columns or unknown:
+        raise ValueError(f"Unsupported SSOT columns in {csv_path}: {list(df.columns)}")
+
+    num_cols = [c for c in df.columns if c in NUMBER_COLS]
+    df = df.dropna(subset=[ROUND_COL] + num_cols)
+
+    values = df[[ROUND_COL] + num_cols].to_numpy()
+    if len(values) and (not np.all(values == np.round(values)) or values[:, 1:].min() < 0 or values[:, 1:].max() > 127):
+        raise ValueError(f"SSOT values in {csv_path} are not int8 draw numbers")
+
+    fields = []
+    for c in df.columns:
+        if c == ROUND_COL:
+            fields.append((c, "<i4"))
+        elif c == DATE_COL:
+            dates = df[DATE_COL].fillna("").astype(str)
+            width = max(1, int(dates.str.len().max()) if len(dates) else 1)
+            fields.append((c, f"<U{width}"))
+        else:
+            fields.append((c, "i1"))
+
+    table = np.empty(len(df), dtype=fields)
+    for c in df.columns:
+        if c == DATE_COL:
+            table[c] = df[DATE_COL].fillna("").astype(str).to_numpy()
+        else:
+            table[c] = df[c].to_numpy().astype(table.dtype[c])
+    return table
+
+def table_to_frame(table: np.ndarray) -> pd.DataFrame:
+    """
+    Materialize a draw table as the DataFrame shape the loaders always returned
+    (round/numbers as int64, date as str).
+    """
+    cols = {}
+    for c in table.dtype.names:
+        if c == DATE_COL:
+            cols[c] = np.asarray(table[c]).astype(str).astype(object)
+        else:
+            cols[c] = np.asarray(table[c], dtype=np.int64)
+    return pd.DataFrame(cols, columns=list(table.dtype.names))
+
+def load_ssot_frame(csv_path: str) -> pd.DataFrame:
+    """Cached replacement for pd.read_csv(ssot_csv)."""
+    try:
+        table = load_draw_table(csv_path)
+    except ValueError:
+        # Not representable as a compact table; keep the plain CSV semantics
+        return pd.read_csv(csv_path)
+    return table_to_frame(table)
+
+def clear_memo() -> None:
+    _TABLES.clear()
+
+# ---------------------------------------------------------------------------
+
+def _open_sidecar(npy_path: str) -> np.ndarray:
+    return np.load(npy_path, mmap_mode="r", allow_pickle=False)
+
+def _read_meta(meta_path: str) -> Optional[dict]:
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    return meta
+
+def _write_meta(meta_path: str, meta: dict) -> None:
+    try:
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, meta_path)
+    except OSError:
+        pass
+
+def _write_sidecar(csv_path: str, table: np.ndarray, st: os.stat_result) -> bool:
+    npy_path, meta_path = sidecar_paths(csv_path)
+    try:
+        os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+        tmp = npy_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, table, allow_pickle=False)
+        os.replace(tmp, npy_path)
+    except OSError:
+        # Read-only data dir: serve from memory, no sidecar
+        return False
+
+    meta = {
+        "version": CACHE_VERSION,
+        "csv": os.path.basename(csv_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_sha256(csv_path),
+        "columns": list(table.dtype.names),
+        "rows": int(len(table)),
+    }
+    _write_meta(meta_path, meta)
+    return True
@@ -1,12 +1,18 @@
 from __future__ import annotations
-from collections import Counter
+import numpy as np
 import pandas as pd
 
+from .cooccurrence import pair_counts
+from .draw_matrix import DrawMatrix
+
 def top_pairs(df_s: pd.DataFrame, k: int = 15) -> list[tuple[tuple[int,int], int]]:
-    c=Counter()
-    for _, r in df_s.iterrows():
-        nums = sorted([int(r[f"n{i}"]) for i in range(1,7)])
-        for i in range(len(nums)):
-            for j in range(i+1, len(nums)):
-                c[(nums[i], nums[j])] += 1
-    return sorted(c.items(), key=lambda x: (-x[1], x[0][0], x[0][1]))[:k]
+    if df_s.empty:
+        return []
+    counts = pair_counts(DrawMatrix.from_frames(df_s).onehot)
+    iu, ju = np.triu_indices(45, k=1)
+    c = np.rint(counts[iu, ju]).astype(np.int64)
+    keep = c > 0
+    iu, ju, c = iu[keep], ju[keep], c[keep]
+    # count DESC, then (a, b) ASC
+    order = np.lexsort((ju, iu, -c))[:k]
+    return [((int(iu[i]) + 1, int(ju[i]) + 1), int(c[i])) for i in order]
@@ -1,14 +1,34 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
+from typing import Sequence
 
 class EngineBase(ABC):
     def __init__(self, name: str):
         self.name = name
     
     @abstractmethod
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
         """
-        1부터 45까지 각 번호별 선호도/가중치를 반환
+        1부터 45까지 각 번호별 선호도/가중치를 (45,) 배열로 반환 (index = 번호 - 1)
         """
         pass
+
+    def score_matrix(self, df_s: pd.DataFrame, df_o: pd.DataFrame, prefix_ends: Sequence[int]) -> np.ndarray:
+        """
+        회차 오름차순 df_s의 앞 e행(df_s.iloc[:e], df_o.iloc[:e])만 본 score_vector를
+        prefix_ends의 각 e마다 계산해 (R,45)로 반환.
+        기본 구현은 prefix마다 score_vector 호출; 누적 카운트 기반 엔진은 한 번에 계산하도록 재정의
+        """
+        out = np.zeros((len(prefix_ends), 45))
+        for r, e in enumerate(prefix_ends):
+            out[r] = self.score_vector(df_s.iloc[:e], df_o.iloc[:e])
+        return out
+
+    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
+        """
+        score_vector의 dict 어댑터 {번호: 점수}
+        """
+        vec = self.score_vector(df_s, df_o)
+        return {i + 1: float(vec[i]) for i in range(45)}
@@ -7,6 +7,7 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
 
@@ -14,6 +15,6 @@ class EngineLL(EngineBase):
     def __init__(self):
         super().__init__("LL")
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
         # drift 기반 스터브
-        return {i: 0.5 for i in range(1, 46)}
+        return np.full(45, 0.5)
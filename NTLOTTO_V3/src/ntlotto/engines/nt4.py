@@ -7,21 +7,24 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
+from ..core.draw_matrix import DrawMatrix
 
 class EngineNT4(EngineBase):
     def __init__(self):
         super().__init__("NT4")
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
         # 장기 빈도
-        counts = {i: 0.1 for i in range(1, 46)}
-        n_rows = len(df_s)
-        if n_rows > 0:
-            for _, r in df_s.iterrows():
-                for j in range(1,7):
-                    counts[int(r[f"n{j}"])] += 1
-            mx = max(counts.values())
-            return {k: v/mx for k,v in counts.items()}
-        return counts
+        if len(df_s) > 0:
+            c = 0.1 + DrawMatrix.from_frames(df_s).onehot.sum(axis=0)
+            return c / c.max()
+        return np.full(45, 0.1)
+
+    def score_matrix(self, df_s: pd.DataFrame, df_o: pd.DataFrame, prefix_ends) -> np.ndarray:
+        # prefix e의 장기 빈도 = 누적 카운트 cum[e]
+        ends = np.asarray(prefix_ends, dtype=np.intp)
+        c = 0.1 + DrawMatrix.from_frames(df_s).prefix_counts()[ends]
+        return np.where((ends > 0)[:, None], c / c.max(axis=1, keepdims=True), 0.1)
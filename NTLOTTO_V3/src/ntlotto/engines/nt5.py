@@ -7,20 +7,27 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
+from ..core.draw_matrix import DrawMatrix
+
+WINDOW = 10
 
 class EngineNT5(EngineBase):
     def __init__(self):
         super().__init__("NT5")
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
-        w10 = df_s.tail(10)
-        counts = {i: 0.1 for i in range(1, 46)}
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
+        w10 = df_s.tail(WINDOW)
         if len(w10) > 0:
-            for _, r in w10.iterrows():
-                for j in range(1,7):
-                    counts[int(r[f"n{j}"])] += 1
-            mx = max(counts.values())
-            return {k: v/mx for k,v in counts.items()}
-        return counts
+            c = 0.1 + DrawMatrix.from_frames(w10).onehot.sum(axis=0)
+            return c / c.max()
+        return np.full(45, 0.1)
+
+    def score_matrix(self, df_s: pd.DataFrame, df_o: pd.DataFrame, prefix_ends) -> np.ndarray:
+        # 최근 10회 카운트 = cum[e] - cum[e-10]
+        ends = np.asarray(prefix_ends, dtype=np.intp)
+        cum = DrawMatrix.from_frames(df_s).prefix_counts()
+        c = 0.1 + (cum[ends] - cum[np.maximum(ends - WINDOW, 0)])
+        return np.where((ends > 0)[:, None], c / c.max(axis=1, keepdims=True), 0.1)
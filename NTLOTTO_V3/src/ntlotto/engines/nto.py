@@ -7,6 +7,7 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
 from .nt4 import EngineNT4
@@ -20,14 +21,19 @@ class EngineNTO(EngineBase):
         self.e5 = EngineNT5()
         self.e_om = EngineOmega()
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
-        s4 = self.e4.score_map(df_s, df_o)
-        s5 = self.e5.score_map(df_s, df_o)
-        so = self.e_om.score_map(df_s, df_o)
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
+        s4 = self.e4.score_vector(df_s, df_o)
+        s5 = self.e5.score_vector(df_s, df_o)
+        so = self.e_om.score_vector(df_s, df_o)
+        return _meta(s4, s5, so)
 
-        out = {}
-        for i in range(1, 46):
-            # 메타 가중합
-            out[i] = (s4[i]*0.4 + s5[i]*0.4 + so[i]*0.2)
-        mx = max(out.values()) if out else 1.0
-        return {k: v/mx for k,v in out.items()}
+    def score_matrix(self, df_s: pd.DataFrame, df_o: pd.DataFrame, prefix_ends) -> np.ndarray:
+        s4 = self.e4.score_matrix(df_s, df_o, prefix_ends)
+        s5 = self.e5.score_matrix(df_s, df_o, prefix_ends)
+        so = self.e_om.score_matrix(df_s, df_o, prefix_ends)
+        return _meta(s4, s5, so)
+
+def _meta(s4: np.ndarray, s5: np.ndarray, so: np.ndarray) -> np.ndarray:
+    # 메타 가중합 (마지막 축 = 번호)
+    out = s4*0.4 + s5*0.4 + so*0.2
+    return out / out.max(axis=-1, keepdims=True)
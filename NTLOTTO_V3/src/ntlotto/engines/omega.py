@@ -7,19 +7,30 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
+from ..core.draw_matrix import DrawMatrix
 
 class EngineOmega(EngineBase):
     def __init__(self):
         super().__init__("Omega")
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
-        counts = {i: 0.1 for i in range(1, 46)}
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
+        counts = np.full(45, 0.1)
         if len(df_s) > 0:
             # 이월 후보군 점수 높임
             for j in range(1,7):
-                counts[int(df_s.iloc[-1][f"n{j}"])] += 1.0
-            mx = max(counts.values())
-            return {k: v/mx for k,v in counts.items()}
+                counts[int(df_s.iloc[-1][f"n{j}"]) - 1] += 1.0
+            return counts / counts.max()
+        return counts
+
+    def score_matrix(self, df_s: pd.DataFrame, df_o: pd.DataFrame, prefix_ends) -> np.ndarray:
+        # prefix e의 직전 회차(e-1행) 번호에 +1.0
+        ends = np.asarray(prefix_ends, dtype=np.intp)
+        counts = np.full((len(ends), 45), 0.1)
+        live = ends > 0
+        last = DrawMatrix.from_frames(df_s).onehot[ends[live] - 1]
+        counts[live] += last
+        counts[live] /= counts[live].max(axis=1, keepdims=True)
         return counts
@@ -8,6 +8,7 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
 
@@ -15,6 +16,6 @@ class EnginePAT(EngineBase):
     def __init__(self):
         super().__init__("PAT")
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
         # 보조 힌트 전용 스터브 (모두 0)
-        return {i: 0.0 for i in range(1, 46)}
+        return np.zeros(45)
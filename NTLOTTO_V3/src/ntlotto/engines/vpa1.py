@@ -7,6 +7,7 @@
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from .base import EngineBase
 
@@ -14,7 +15,7 @@ class EngineVPA1(EngineBase):
     def __init__(self):
         super().__init__("VPA1")
     
-    def score_map(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> dict[int,float]:
-        out = {i: 0.5 for i in range(1, 46)}
+    def score_vector(self, df_s: pd.DataFrame, df_o: pd.DataFrame) -> np.ndarray:
+        out = np.full(45, 0.5)
         # 약한 밴드 앵커 점수화 스터브
         return out
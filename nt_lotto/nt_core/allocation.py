@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .backtest import topk_masks
+
+"""
+Allocation Plan Evaluator
+Role: Score any number of engine allocation plans on the same walk-forward rounds at once.
+
+Engine score maps are precomputed once into a normalized (R,E,45) tensor (0 where an engine
+leaves a number out). A (P,E) weight matrix is applied engine by engine in column order, so
+each portfolio score is accumulated exactly as a per-plan dict loop over the same engine order
+would, and Top-K is taken in one batch (ties go to the lower numbers, like a stable
+descending sort of the 45 numbers).
+
+search_plans() samples Dirichlet allocations, refines the best ones locally and reports
+their fold statistics.
+"""
+
+# Plans evaluated per batch ((chunk,R,45) portfolio scores are held in memory)
+PLAN_CHUNK = 256
+
+def plan_matrix(plans: Dict[str, Dict[str, float]], engines: Sequence[str]) -> np.ndarray:
+    """(P,E) weights of named plans in `engines` column order; engines a plan omits get 0."""
+    return np.array([[float(w.get(en, 0.0)) for en in engines] for w in plans.values()], dtype=np.float64).reshape(len(plans), len(engines))
+
+def portfolio_scores(S: np.ndarray, W: np.ndarray) -> np.ndarray:
+    """(R,E,45) engine scores x (P,E) weights -> (P,R,45) portfolio scores."""
+    out = np.zeros((W.shape[0], S.shape[0], S.shape[2]))
+    for e in range(S.shape[1]):
+        out += W[:, e, None, None] * S[None, :, e, :]
+    return out
+
+def evaluate_plans(S: np.ndarray, W: np.ndarray, winners: np.ndarray, bonus: np.ndarray, k: int = 20,
+                   chunk: int = PLAN_CHUNK) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hits and bonus hits of every plan on every round.
+    winners: (R,45) bool winning numbers, bonus: (R,) bonus numbers (1..45).
+    Returns (P,R) int64 |Top-K ∩ Win| and (P,R) int64 bonus-in-Top-K.
+    """
+    W = np.atleast_2d(np.asarray(W, dtype=np.float64))
+    P, R = W.shape[0], S.shape[0]
+    hits = np.zeros((P, R), dtype=np.int64)
+    bonus_hit = np.zeros((P, R), dtype=np.int64)
+    b = np.asarray(bonus, dtype=np.int64) - 1
+    for p0 in range(0, P, max(1, int(chunk))):
+        port = portfolio_scores(S, W[p0:p0 + chunk])
+        mask = topk_masks(port.reshape(-1, port.shape[2]), k).reshape(port.shape)
+        hits[p0:p0 + chunk] = (mask & winners[None]).sum(axis=2)
+        bonus_hit[p0:p0 + chunk] = mask[:, np.arange(R), b]
+    return hits, bonus_hit
+
+def plan_metrics(hits: np.ndarray, bonus_hit: np.ndarray, folds: int, fold_size: int) -> Dict[str, np.ndarray]:
+    """
+    Per-plan statistics of (P,R) hits / bonus hits: mean_recall, std_recall, mean_bonus, sharpe
+    (mean / std, the mean when std is 0) and (P,folds) fold means. Fold i covers rounds
+    [i*fold_size, (i+1)*fold_size), the last fold runs to the end.
+    """
+    P, R = hits.shape
+    rm = hits.mean(axis=1) if R else np.zeros(P)
+    rs = hits.std(axis=1) if R else np.zeros(P)
+    fold_means = np.zeros((P, folds))
+    for i in range(folds):
+        f_end = (i + 1) * fold_size if i < folds - 1 else R
+        f_slice = hits[:, i * fold_size:f_end]
+        if f_slice.shape[1]:
+            fold_means[:, i] = f_slice.mean(axis=1)
+    return {
+        "mean_recall": rm,
+        "std_recall": rs,
+        "mean_bonus": bonus_hit.mean(axis=1) if R else np.zeros(P),
+        "sharpe": np.where(rs > 0, rm / np.where(rs > 0, rs, 1.0), rm),
+        "folds": fold_means,
+    }
+
+def rank_plans(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    """Plan indices best first: higher mean recall, then higher mean bonus, then lower std."""
+    return np.lexsort((metrics["std_recall"], -metrics["mean_bonus"], -metrics["mean_recall"]))
+
+def search_plans(S: np.ndarray, engines: Sequence[str], winners: np.ndarray, bonus: np.ndarray, k: int,
+                 folds: int, fold_size: int, n_samples: int = 20000, seed: int = 0, alpha: float = 1.0,
+                 elite: int = 32, refine_steps: int = 5, n_local: int = 64, concentration: float = 200.0,
+                 start: Optional[np.ndarray] = None, top: int = 10) -> Dict[str, object]:
+    """
+    Allocation search: n_samples Dirichlet(alpha) plans (plus the `start` plans), then
+    refine_steps rounds of local refinement, where each of the `elite` best plans draws n_local
+    neighbours from Dirichlet(concentration * w) and the best plans overall are kept.
+    Deterministic for a seed. Returns {"n_evaluated", "plans": the `top` best plans with
+    weights and fold statistics}.
+    """
+    rng = np.random.default_rng(seed)
+    E = len(engines)
+    cand = rng.dirichlet(np.full(E, alpha), size=int(n_samples)) if n_samples > 0 else np.zeros((0, E))
+    if start is not None:
+        cand = np.vstack([np.atleast_2d(start), cand])
+
+    def run(W):
+        hits, bonus_hit = evaluate_plans(S, W, winners, bonus, k)
+        return plan_metrics(hits, bonus_hit, folds, fold_size)
+
+    def best(W, m, n):
+        idx = rank_plans(m)[:n]
+        return W[idx], {key: v[idx] for key, v in m.items()}
+
+    keep = max(int(elite), int(top))
+    W, m = best(cand, run(cand), keep)
+    n_evaluated = len(cand)
+    for _ in range(int(refine_steps)):
+        # Zero weights get a small floor so a neighbour can move an engine back in
+        local = np.vstack([rng.dirichlet(concentration * w + 1e-2, size=int(n_local)) for w in W[:elite]])
+        ml = run(local)
+        n_evaluated += len(local)
+        W, m = best(np.vstack([W, local]), {key: np.concatenate([m[key], ml[key]]) for key in m}, keep)
+
+    plans: List[dict] = []
+    for i in range(min(int(top), len(W))):
+        f = m["folds"][i]
+        plans.append({
+            "weights": {en: float(w) for en, w in zip(engines, W[i])},
+            "mean_recall": float(m["mean_recall"][i]),
+            "std_recall": float(m["std_recall"][i]),
+            "mean_bonus": float(m["mean_bonus"][i]),
+            "sharpe": float(m["sharpe"][i]),
+            "folds": [float(x) for x in f],
+            "fold_min": float(f.min()) if len(f) else 0.0,
+            "fold_std": float(f.std()) if len(f) else 0.0,
+        })
+    return {"n_evaluated": int(n_evaluated), "plans": plans}
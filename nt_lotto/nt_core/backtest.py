@@ -2,66 +2,125 @@ from __future__ import annotations
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any
-from .schema import SSOT, BacktestResult, EngineOutput, BacktestRoundResult
-from .features import build_feature_pack
+from .schema import SSOT, BacktestResult, EngineOutput, BacktestRoundResult, FEATURE_GROUPS
+from .feature_builder import FeaturePackBuilder
+from .feature_tensor import build_feature_tensor
+from .feature_cache import get_feature_cache
+from .draw_matrix import draw_matrix_of, mask_of_onehot, popcount
 from .metrics import recall_at_k
+from .constants import WINDOWS_DEFAULT, EW_ALPHA_DEFAULT, PAIR_WINDOW_DEFAULT
 
 def run_backtest(ssot: SSOT, engine_inst: Any, rounds: List[int], k: int = 20) -> BacktestResult:
     """
     Standard Walk-Forward Backtest (Contract 2.3)
+    Scores of every t_end are collected into one (R,45) matrix and evaluated by backtest_scores.
     """
-    results_list = []
-    sorted_df = ssot.sorted_df.set_index("round")
     
     # Engine requires either sorted or ordered via Contract flags
     # We pass BOTH in SSOT to engine_inst.score_numbers(ssot, ...)
     
+    # engines might use different state modes, but for backtest we use a stable default or engine-specific one
+    # For simplicity, we use the engine's preferred mode if it has one
+    state_mode = getattr(engine_inst, 'preferred_state_mode', 'band_parity')
+    # Only the feature groups the engine declares are maintained (all of them if it declares none)
+    requires = getattr(engine_inst, 'requires', None)
+    # Cached packs are reused; groups missing from the cache go through the builder
+    cache = get_feature_cache()
+    walk: Dict[str, FeaturePackBuilder] = {}
+
+    def builder() -> FeaturePackBuilder:
+        if not walk:
+            # Walk-forward: the builder advances one draw at a time instead of rebuilding per round
+            # num_features for every t_end comes from one (T,45,F) tensor pass
+            tensor = build_feature_tensor(ssot, rounds[:-1])
+            walk["b"] = FeaturePackBuilder(ssot, use_state=state_mode, tensor=tensor, requires=requires)
+        return walk["b"]
+
+    # Engines with score_batch(ssot, t_ends, state_mode) score every t_end in one pass, no packs
+    score_batch = getattr(engine_inst, 'score_batch', None)
+    if score_batch is not None and len(rounds) > 1:
+        return backtest_scores(ssot, score_batch(ssot, rounds[:-1], state_mode=state_mode), rounds, k, engine=engine_inst.name)
+
+    # Numbers an engine does not score stay NaN (ranked last)
+    scores = np.full((max(0, len(rounds) - 1), 45), np.nan)
     for i, t_end in enumerate(rounds[:-1]):
-        t_test = rounds[i+1]
-        
-        # 1. Build Features up to t_end
-        # engines might use different state modes, but for backtest we use a stable default or engine-specific one
-        # For simplicity, we use the engine's preferred mode if it has one
-        state_mode = getattr(engine_inst, 'preferred_state_mode', 'band_parity')
-        feats = build_feature_pack(ssot, t_end=t_end, use_state=state_mode)
+        # 1. Build Features up to t_end (lazy: groups are emitted when the engine reads them)
+        if cache is None:
+            feats = builder().feature_pack(t_end)
+        else:
+            key = cache.key(ssot, t_end, WINDOWS_DEFAULT, EW_ALPHA_DEFAULT, 200, state_mode, PAIR_WINDOW_DEFAULT, source="tensor")
+            loaders = {g: (lambda g=g, t=t_end: builder().group_at(t, g)) for g in FEATURE_GROUPS}
+            feats = cache.lazy_pack(key, t_end, loaders, state_mode=state_mode)
         
         # 2. Score
         out: EngineOutput = engine_inst.score_numbers(ssot, feats, t_end=t_end)
+        ok = (out.numbers >= 1) & (out.numbers <= 45)
+        scores[i, out.numbers[ok] - 1] = out.values[ok]
         
-        # 3. Top K
-        topk = out.scores.sort_values("score", ascending=False).index[:k].tolist()
-        
-        # 4. Evaluate
-        truth = set(sorted_df.loc[t_test, ["n1","n2","n3","n4","n5","n6"]].astype(int).tolist())
-        hits = len(set(topk) & truth)
-        recall = hits / 6.0
-        
-        results_list.append({
-            'round': t_test,
-            'hits': hits,
-            'recall_at_k': recall,
-            'topk': topk
-        })
-        
-    per_round = pd.DataFrame(results_list)
-    
-    if per_round.empty:
+    # 3. Top K, 4. Evaluate
+    return backtest_scores(ssot, scores, rounds, k, engine=engine_inst.name)
+
+def topk_masks(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    (R,45) scores -> (R,45) bool Top-K masks via argpartition.
+    Ties at the K-th score go to the lower numbers and NaN ranks last, so every row selects
+    the same numbers as EngineOutput.topk(k) (one stable argsort).
+    """
+    s = np.asarray(scores, dtype=float)
+    k = min(int(k), s.shape[1])
+    if k <= 0:
+        return np.zeros(s.shape, dtype=bool)
+    valid = ~np.isnan(s)
+    key = np.where(valid, -s, np.inf)
+    kth = np.take_along_axis(key, np.argpartition(key, k - 1, axis=1)[:, k - 1:k], axis=1)
+    mask = valid & (key < kth)
+    # Remaining slots in number order: ties at the K-th score first, then NaN
+    for tier in (valid & (key == kth), ~valid):
+        need = k - mask.sum(axis=1, keepdims=True)
+        mask |= tier & (np.cumsum(tier, axis=1) <= need)
+    return mask
+
+def backtest_scores(ssot: SSOT, scores: np.ndarray, rounds: List[int], k: int = 20, engine: str = "") -> BacktestResult:
+    """
+    Walk-forward evaluation of precomputed scores: row i of the (R,45) matrix is the engine's
+    score at t_end = rounds[i], judged against the draw of rounds[i+1].
+    Hits are popcounts of (Top-K mask & truth mask); per_round matches run_backtest.
+    """
+    scores = np.asarray(scores, dtype=float).reshape(-1, 45)
+    tests = np.asarray(rounds[1:len(scores) + 1], dtype=np.int64)
+    if len(tests) == 0:
         return BacktestResult(
-            engine=engine_inst.name, k=k, per_round=per_round,
+            engine=engine, k=k, per_round=pd.DataFrame(),
             mean_all=0.0, mean_last10=0.0, mean_last20=0.0, mean_last30=0.0
         )
     
-    mean_all = float(per_round['recall_at_k'].mean())
-    mean_l10 = float(per_round['recall_at_k'].tail(10).mean())
-    mean_l20 = float(per_round['recall_at_k'].tail(20).mean())
-    mean_l30 = float(per_round['recall_at_k'].tail(30).mean())
+    dm = draw_matrix_of(ssot)
+    rows = np.array([dm.row_of(int(t)) for t in tests], dtype=np.intp)
+    if (rows < 0).any():
+        raise KeyError(int(tests[rows < 0][0]))
+    
+    mask = topk_masks(scores, k)
+    hits = popcount(mask_of_onehot(mask) & dm.mask[rows])
+    
+    # Ranked Top-K lists: selected numbers (number order) sorted by score DESC, stable
+    sel = np.nonzero(mask)[1].reshape(len(mask), -1)
+    order = np.argsort(-np.take_along_axis(scores, sel, axis=1), axis=1, kind="stable")
+    topk = (np.take_along_axis(sel, order, axis=1) + 1).tolist()
+    
+    per_round = pd.DataFrame({
+        'round': tests,
+        'hits': hits,
+        'recall_at_k': hits / 6.0,
+        'topk': topk
+    })
+    recall = per_round['recall_at_k']
     
     return BacktestResult(
-        engine=engine_inst.name,
+        engine=engine,
         k=k,
         per_round=per_round,
-        mean_all=mean_all,
-        mean_last10=mean_l10,
-        mean_last20=mean_l20,
-        mean_last30=mean_l30
+        mean_all=float(recall.mean()),
+        mean_last10=float(recall.tail(10).mean()),
+        mean_last20=float(recall.tail(20).mean()),
+        mean_last30=float(recall.tail(30).mean())
     )
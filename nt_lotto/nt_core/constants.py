@@ -13,6 +13,12 @@ SSOT_SORTED = os.path.join(DATA_DIR, "ssot_sorted.csv")
 SSOT_ORDERED = os.path.join(DATA_DIR, "ssot_ordered.csv")
 EXCLUDE_CSV = os.path.join(DATA_DIR, "exclude_rounds.csv")
 CONFLICT_CSV = os.path.join(DATA_DIR, "ssot_conflicts.csv")
+FEATURE_CACHE_DIR = os.path.join(DATA_DIR, ".feature_cache")
+RESULT_STORE_DIR = os.path.join(DATA_DIR, ".result_store")
+
+# Local engine daemon (nt_engines/daemon.py)
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
 
 # Aliases for compatibility
 SORTED_CSV = SSOT_SORTED
@@ -0,0 +1,170 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+from .frame_memo import FrameMemo
+from .schema import SSOT
+
+"""
+DrawMatrix
+Role: Canonical NumPy view of the draw history, built once per SSOT.
+
+Views (T = number of rounds, row order = ascending round):
+    rounds   (T,)    int32   round number
+    numbers  (T,6)   uint8   sorted winning numbers (n1..n6)
+    onehot   (T,45)  bool    onehot[t, n-1] == n drawn in round t
+    mask     (T,)    uint64  bit (n-1) set == n drawn in round t
+    ordered  (T,6)   uint8   draw-order numbers (b1..b6), 0 if unknown
+    bonus    (T,)    uint8   bonus number, 0 if unknown
+"""
+
+N_NUMBERS = 45
+SORTED_COLS = ["n1", "n2", "n3", "n4", "n5", "n6"]
+ORDERED_COLS = ["b1", "b2", "b3", "b4", "b5", "b6"]
+
+@dataclass(frozen=True)
+class DrawMatrix:
+    rounds: np.ndarray
+    numbers: np.ndarray
+    onehot: np.ndarray
+    mask: np.ndarray
+    ordered: np.ndarray
+    bonus: np.ndarray
+    bonus_onehot: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.rounds.shape[0])
+
+    @classmethod
+    def from_arrays(cls, rounds, numbers, ordered=None, bonus=None) -> "DrawMatrix":
+        rounds = np.asarray(rounds, dtype=np.int32)
+        numbers = np.asarray(numbers, dtype=np.uint8).reshape(-1, 6)
+        T = len(rounds)
+        if numbers.shape[0] != T:
+            raise ValueError(f"rounds/numbers length mismatch: {T} vs {numbers.shape[0]}")
+        if T and (numbers.min() < 1 or numbers.max() > N_NUMBERS):
+            raise ValueError("draw numbers must be in 1..45")
+
+        ordered = np.zeros((T, 6), dtype=np.uint8) if ordered is None else np.asarray(ordered, dtype=np.uint8).reshape(-1, 6)
+        bonus = np.zeros(T, dtype=np.uint8) if bonus is None else np.asarray(bonus, dtype=np.uint8)
+
+        onehot = onehot_of(numbers)
+        bonus_onehot = np.zeros((T, N_NUMBERS), dtype=bool)
+        valid = (bonus >= 1) & (bonus <= N_NUMBERS)
+        bonus_onehot[np.nonzero(valid)[0], bonus[valid].astype(np.intp) - 1] = True
+
+        views = (rounds, numbers, onehot, mask_of(numbers), ordered, bonus, bonus_onehot)
+        for a in views:
+            a.setflags(write=False)
+        return cls(*views)
+
+    @classmethod
+    def from_frames(cls, sorted_df: pd.DataFrame, ordered_df: Optional[pd.DataFrame] = None) -> "DrawMatrix":
+        """
+        Build from the SSOT frames. The ordered frame is aligned on round;
+        rounds missing from it keep zero draw-order numbers.
+        """
+        df = sorted_df.sort_values("round")
+        rounds = df["round"].to_numpy(dtype=np.int64)
+        numbers = df[SORTED_COLS].to_numpy(dtype=np.int64)
+        bonus = df["bonus"].to_numpy(dtype=np.int64) if "bonus" in df.columns else None
+
+        ordered = None
+        if ordered_df is not None and not ordered_df.empty:
+            o = ordered_df.drop_duplicates("round", keep="last").set_index("round")
+            o = o.reindex(rounds)[ORDERED_COLS].fillna(0)
+            ordered = o.to_numpy(dtype=np.int64)
+        return cls.from_arrays(rounds, numbers, ordered=ordered, bonus=bonus)
+
+    @classmethod
+    def from_ssot(cls, ssot: SSOT) -> "DrawMatrix":
+        return cls.from_frames(ssot.sorted_df, ssot.ordered_df)
+
+    @cached_property
+    def window_index(self):
+        """Prefix-count index over these rows (see window_index.py)."""
+        from .window_index import WindowIndex
+        return WindowIndex.from_draw_matrix(self)
+
+    @cached_property
+    def prefix_hashes(self) -> Tuple[str, ...]:
+        """
+        Content hash of rows [0, t) for every t = 0..T (sha256 chain over round,
+        numbers, ordered, bonus). Appending a draw leaves earlier hashes unchanged.
+        """
+        rows = np.concatenate([
+            self.rounds.astype("<i4").view(np.uint8).reshape(len(self), 4),
+            self.numbers, self.ordered, self.bonus.reshape(-1, 1),
+        ], axis=1)
+        h = hashlib.sha256(b"DrawMatrix/1").digest()
+        out = [h.hex()]
+        for row in rows:
+            h = hashlib.sha256(h + row.tobytes()).digest()
+            out.append(h.hex())
+        return tuple(out)
+
+    def end_index(self, t_end: int) -> int:
+        """Number of leading rows with round <= t_end."""
+        return int(np.searchsorted(self.rounds, t_end, side="right"))
+
+    def upto(self, t_end: int) -> "DrawMatrix":
+        """Prefix view of all rounds <= t_end (no copy)."""
+        return self.head(self.end_index(t_end))
+
+    def head(self, n: int) -> "DrawMatrix":
+        return DrawMatrix(*(a[:n] for a in self._views()))
+
+    def tail(self, n: int) -> "DrawMatrix":
+        start = max(0, len(self) - n)
+        return DrawMatrix(*(a[start:] for a in self._views()))
+
+    def row_of(self, round_no: int) -> int:
+        """Row index of a round, -1 if absent."""
+        i = int(np.searchsorted(self.rounds, round_no))
+        if i < len(self) and self.rounds[i] == round_no:
+            return i
+        return -1
+
+    def _views(self) -> Tuple[np.ndarray, ...]:
+        return (self.rounds, self.numbers, self.onehot, self.mask, self.ordered, self.bonus, self.bonus_onehot)
+
+def onehot_of(numbers: np.ndarray) -> np.ndarray:
+    """(T,6) numbers in 1..45 -> (T,45) bool."""
+    numbers = np.asarray(numbers)
+    T = numbers.shape[0]
+    out = np.zeros((T, N_NUMBERS), dtype=bool)
+    out[np.repeat(np.arange(T), numbers.shape[1]), numbers.ravel().astype(np.intp) - 1] = True
+    return out
+
+def mask_of(numbers: np.ndarray) -> np.ndarray:
+    """(T,k) numbers in 1..45 -> (T,) uint64 bitmask, bit n-1 per number."""
+    numbers = np.asarray(numbers, dtype=np.uint64)
+    if numbers.ndim == 1:
+        numbers = numbers.reshape(1, -1)
+    bits = np.left_shift(np.uint64(1), numbers - np.uint64(1))
+    return np.bitwise_or.reduce(bits, axis=1) if numbers.shape[1] else np.zeros(numbers.shape[0], dtype=np.uint64)
+
+def mask_of_onehot(onehot: np.ndarray) -> np.ndarray:
+    """(T,45) bool rows -> (T,) uint64 bitmask, bit n-1 per selected number."""
+    bits = np.left_shift(np.uint64(1), np.arange(N_NUMBERS, dtype=np.uint64))
+    return np.bitwise_or.reduce(np.where(np.asarray(onehot, dtype=bool), bits, np.uint64(0)), axis=1)
+
+def popcount(masks: np.ndarray) -> np.ndarray:
+    """Set bits per uint64 mask."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(np.int64)
+    return np.unpackbits(masks.reshape(-1, 1).view(np.uint8), axis=1).sum(axis=1).reshape(masks.shape).astype(np.int64)
+
+def numbers_of_mask(mask: int) -> list:
+    mask = int(mask)
+    return [n for n in range(1, N_NUMBERS + 1) if mask >> (n - 1) & 1]
+
+_MATRICES = FrameMemo(maxsize=8)
+
+def draw_matrix_of(ssot: SSOT) -> DrawMatrix:
+    """DrawMatrix for an SSOT, built once and reused while its frames' content is unchanged."""
+    return _MATRICES.get([ssot.sorted_df, ssot.ordered_df], lambda: DrawMatrix.from_ssot(ssot))
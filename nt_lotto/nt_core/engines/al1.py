@@ -1,9 +1,11 @@
 # nt_core/engines/al1.py
 from __future__ import annotations
+import numpy as np
 import pandas as pd
-from .base import Engine
+from .base import Engine, _z_rows
 from ..schema import SSOT, FeaturePack, EngineOutput
-from ..features import band_of
+from ..features import state_codes, row_probs
+from ..order_tensor import build_order_tensor
 
 def _z(s: pd.Series) -> pd.Series:
     m, sd = s.mean(), s.std()
@@ -16,36 +18,40 @@ class AL1SlotEngine(Engine):
     AL1 = 추첨순서 '슬롯(1~6구)'에서 상태(state)가 얼마나 자주 나오는지에만 기반
     """
     name = "AL1"
+    requires = {"num", "order"}
 
     def __init__(self, use_state="band_parity", slot_weights=None):
         self.use_state = use_state
         self.slot_weights = slot_weights or {"slot1":1, "slot2":1, "slot3":1, "slot4":1, "slot5":1, "slot6":1}
 
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
-        if feats.slot_state_probs is None:
-            raise ValueError("FeaturePack.slot_state_probs missing")
+        if feats.slot_counts is None:
+            raise ValueError("FeaturePack.slot_counts missing")
 
-        slot_df = feats.slot_state_probs
         idx = feats.num_features.index.astype(int)
-        states = [self._state(n) for n in idx]
-
-        scores = []
-        for st in states:
-            if st in slot_df.index:
-                val = 0.0
-                for col, w in self.slot_weights.items():
-                    val += float(slot_df.loc[st, col]) * float(w)
-                scores.append(val)
-            else:
-                scores.append(0.0)
+        scores = np.zeros(len(idx), dtype=float)
+        # States of another mode never match the pack's states
+        if feats.state_mode == self.use_state:
+            probs = row_probs(feats.slot_counts)
+            codes = state_codes(idx, self.use_state)
+            for col, w in self.slot_weights.items():
+                j = int(col[len("slot"):]) - 1
+                scores += probs[j, codes] * float(w)
 
         s = pd.Series(scores, index=idx, dtype=float)
         out = pd.DataFrame({"score": _z(s)}, index=idx)
         return EngineOutput(scores=out)
 
-    def _state(self, n: int) -> str:
-        b = band_of(n)
-        if self.use_state == "band": return f"B{b}"
-        if self.use_state == "band_parity": return f"B{b}_{'O' if n%2 else 'E'}"
-        if self.use_state == "band_tail": return f"B{b}_T{n%10}"
-        return f"B{b}"
+    def score_batch(self, ssot: SSOT, t_ends, state_mode: str = "band_parity") -> np.ndarray:
+        """(R,45) scores for every t_end (same rows as score_numbers with a state_mode pack)."""
+        ot = build_order_tensor(ssot, t_ends, self.use_state)
+        if (ot.ends == 0).any():
+            raise ValueError("FeaturePack.slot_counts missing")
+        scores = np.zeros((len(ot.ends), 45), dtype=float)
+        if state_mode == self.use_state:
+            probs = row_probs(ot.slots)
+            codes = state_codes(np.arange(1, 46), self.use_state)
+            for col, w in self.slot_weights.items():
+                j = int(col[len("slot"):]) - 1
+                scores += probs[:, j, codes] * float(w)
+        return _z_rows(scores)
@@ -1,9 +1,11 @@
 # nt_core/engines/al2.py
 from __future__ import annotations
+import numpy as np
 import pandas as pd
-from .base import Engine
+from .base import Engine, _z_rows
 from ..schema import SSOT, FeaturePack, EngineOutput
-from ..features import band_of
+from ..features import state_codes, row_probs
+from ..order_tensor import build_order_tensor
 
 def _z(s: pd.Series) -> pd.Series:
     m, sd = s.mean(), s.std()
@@ -16,27 +18,33 @@ class AL2MarkovEngine(Engine):
     AL2 = 추첨순서 '전이(마코프)'만 기반
     """
     name = "AL2"
+    requires = {"num", "order"}
 
     def __init__(self, use_state="band_parity"):
         self.use_state = use_state
 
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
-        if feats.markov_state is None:
-            raise ValueError("FeaturePack.markov_state missing")
-
-        mk = feats.markov_state
-        to_mass = mk.groupby("to")["p"].sum() if not mk.empty else pd.Series()
+        if feats.markov_counts is None:
+            raise ValueError("FeaturePack.markov_counts missing")
 
         idx = feats.num_features.index.astype(int)
-        states = [self._state(n) for n in idx]
-        s = pd.Series([float(to_mass.get(st, 0.0)) for st in states], index=idx, dtype=float)
+        if feats.state_mode == self.use_state:
+            # Incoming probability mass per state: column sums of the transition matrix
+            to_mass = row_probs(feats.markov_counts).sum(axis=0)
+            vals = to_mass[state_codes(idx, self.use_state)]
+        else:
+            vals = np.zeros(len(idx), dtype=float)
+        s = pd.Series(vals, index=idx, dtype=float)
 
         out = pd.DataFrame({"score": _z(s)}, index=idx)
         return EngineOutput(scores=out)
 
-    def _state(self, n: int) -> str:
-        b = band_of(n)
-        if self.use_state == "band": return f"B{b}"
-        if self.use_state == "band_parity": return f"B{b}_{'O' if n%2 else 'E'}"
-        if self.use_state == "band_tail": return f"B{b}_T{n%10}"
-        return f"B{b}"
+    def score_batch(self, ssot: SSOT, t_ends, state_mode: str = "band_parity") -> np.ndarray:
+        """(R,45) scores for every t_end (same rows as score_numbers with a state_mode pack)."""
+        ot = build_order_tensor(ssot, t_ends, self.use_state)
+        if (ot.ends == 0).any():
+            raise ValueError("FeaturePack.markov_counts missing")
+        if state_mode != self.use_state:
+            return np.zeros((len(ot.ends), 45), dtype=float)
+        to_mass = row_probs(ot.trans).sum(axis=1)
+        return _z_rows(to_mass[:, state_codes(np.arange(1, 46), self.use_state)])
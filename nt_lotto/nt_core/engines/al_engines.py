@@ -1,56 +1,83 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from .base import Engine
+from .base import Engine, _z_rows
 from ..schema import SSOT, FeaturePack, EngineOutput
-from ..features import band_of
+from ..features import state_codes, row_probs
+from ..order_tensor import build_order_tensor
+
+AL_STATE = "band_parity"
+NUMBERS = np.arange(1, 46)
+
+# score_batch(ssot, t_ends, state_mode): (R,45) scores of every t_end from one OrderTensor,
+# row r equal to score_numbers(...).scores at t_ends[r] with a FeaturePack of state_mode
 
 class AL1(Engine):
     name = "AL1"
     uses_sorted = False
     uses_ordered = True
+    requires = {"order"}
     def score_numbers(self, ssot, feats, t_end):
-        slot_df = feats.slot_state_probs
-        if slot_df is None: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
-        def get_st(n):
-            b = band_of(n)
-            return f"B{b}_{'O' if n%2 else 'E'}"
+        slots = feats.slot_counts
+        if slots is None: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
         num_scores = pd.Series(0.0, index=range(1, 46))
-        for n in num_scores.index:
-            st = get_st(n)
-            if st in slot_df.index: num_scores[n] = slot_df.loc[st].sum()
+        if feats.state_mode == AL_STATE:
+            codes = state_codes(num_scores.index, AL_STATE)
+            num_scores[:] = row_probs(slots)[:, codes].sum(axis=0)
         return EngineOutput(self.name, pd.DataFrame({"score": _z(num_scores)}, index=num_scores.index), {}, {})
 
+    def score_batch(self, ssot, t_ends, state_mode=AL_STATE):
+        ot = build_order_tensor(ssot, t_ends, AL_STATE)
+        out = np.zeros((len(ot.ends), 45))
+        if state_mode == AL_STATE:
+            out = row_probs(ot.slots)[:, :, state_codes(NUMBERS, AL_STATE)].sum(axis=1)
+        return _z_rows(out)
+
 class AL2(Engine):
     name = "AL2"
     uses_sorted = False
     uses_ordered = True
+    requires = {"order"}
     def score_numbers(self, ssot, feats, t_end):
-        markov_df = feats.markov_state
-        if markov_df is None or markov_df.empty: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
+        trans = feats.markov_counts
+        if trans is None or not trans.any(): return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
         last_row = ssot.ordered_df[ssot.ordered_df["round"] == t_end]
         if last_row.empty: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
         last_nums = last_row[["b1","b2","b3","b4","b5","b6"]].values[0]
-        def get_st(n): b = band_of(n); return f"B{b}_{'O' if n%2 else 'E'}"
-        last_states = [get_st(n) for n in last_nums]
         num_scores = pd.Series(0.0, index=range(1, 46))
-        for n in num_scores.index:
-            target_st = get_st(n)
-            for start_st in last_states:
-                match = markov_df[(markov_df["from"] == start_st) & (markov_df["to"] == target_st)]
-                if not match.empty: num_scores[n] += match["p"].values[0]
-        return EngineOutput(self.name, pd.DataFrame({"score": _z(num_scores)}, index=num_scores.index), {'transitions': len(markov_df)}, {})
+        if feats.state_mode == AL_STATE:
+            P = row_probs(trans)
+            last_codes = state_codes(last_nums, AL_STATE)
+            # sum over the 6 last-draw states of P[from, to(n)]
+            num_scores[:] = P[last_codes][:, state_codes(num_scores.index, AL_STATE)].sum(axis=0)
+        return EngineOutput(self.name, pd.DataFrame({"score": _z(num_scores)}, index=num_scores.index), {'transitions': int(np.count_nonzero(trans))}, {})
+
+    def score_batch(self, ssot, t_ends, state_mode=AL_STATE):
+        ot = build_order_tensor(ssot, t_ends, AL_STATE)
+        out = np.zeros((len(ot.ends), 45))
+        # Rounds without transitions or without their own ordered draw score 0
+        live = ot.trans.any(axis=(1, 2)) & (ot.last[:, 0] >= 0)
+        if state_mode == AL_STATE and live.any():
+            P = row_probs(ot.trans[live])
+            # (R,6,S) rows of the 6 last-draw states, gathered at to(n) and summed over the states
+            rows = P[np.arange(len(P))[:, None], ot.last[live]]
+            out[live] = rows[:, :, state_codes(NUMBERS, AL_STATE)].sum(axis=1)
+        return _z_rows(out)
 
 class ALX(Engine):
     name = "ALX"
     uses_sorted = True
     uses_ordered = True
+    requires = {"order"}
     def score_numbers(self, ssot, feats, t_end):
         o1 = AL1().score_numbers(ssot, feats, t_end)
         o2 = AL2().score_numbers(ssot, feats, t_end)
         score = (o1.scores["score"] + o2.scores["score"]) / 2.0
         return EngineOutput(self.name, pd.DataFrame({"score": score}, index=score.index), {'components': ['AL1', 'AL2']}, {})
 
+    def score_batch(self, ssot, t_ends, state_mode=AL_STATE):
+        return (AL1().score_batch(ssot, t_ends, state_mode) + AL2().score_batch(ssot, t_ends, state_mode)) / 2.0
+
 def _z(s):
     if s.std() == 0: return s * 0.0
     return (s - s.mean()) / s.std()
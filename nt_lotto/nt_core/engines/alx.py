@@ -1,7 +1,8 @@
 # nt_core/engines/alx.py
 from __future__ import annotations
+import numpy as np
 import pandas as pd
-from .base import Engine
+from .base import Engine, _z_rows
 from ..schema import SSOT, FeaturePack, EngineOutput
 
 def _z(s: pd.Series) -> pd.Series:
@@ -21,6 +22,7 @@ class ALXHybridEngine(Engine):
         self.al2 = al2_engine
         self.w1 = w1
         self.w2 = w2
+        self.requires = set(al1_engine.requires) | set(al2_engine.requires)
 
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
         out1 = self.al1.score_numbers(ssot, feats, t_end=t_end).scores["score"]
@@ -29,3 +31,9 @@ class ALXHybridEngine(Engine):
         s = self.w1 * _z(out1) + self.w2 * _z(out2)
         df = pd.DataFrame({"score": _z(s)}, index=s.index.astype(int))
         return EngineOutput(scores=df)
+
+    def score_batch(self, ssot: SSOT, t_ends, state_mode: str = "band_parity") -> np.ndarray:
+        """(R,45) scores for every t_end from the components' batch scores."""
+        out1 = self.al1.score_batch(ssot, t_ends, state_mode)
+        out2 = self.al2.score_batch(ssot, t_ends, state_mode)
+        return _z_rows(self.w1 * _z_rows(out1) + self.w2 * _z_rows(out2))
@@ -1,8 +1,9 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
-from typing import List
-from ..schema import SSOT, FeaturePack, EngineOutput
+from typing import List, Set
+from ..schema import SSOT, FeaturePack, EngineOutput, FEATURE_GROUPS
 
 from ..constants import K_DIAG, K_EVAL
 
@@ -10,6 +11,8 @@ class Engine(ABC):
     name: str
     uses_sorted: bool = True
     uses_ordered: bool = False 
+    # FeaturePack groups read in score_numbers (schema.FEATURE_GROUPS); backtests only build these
+    requires: Set[str] = set(FEATURE_GROUPS)
 
     @abstractmethod
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
@@ -17,14 +20,15 @@ class Engine(ABC):
 
     def get_output(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
         out = self.score_numbers(ssot, feats, t_end)
-        # Add TopK Diag
-        topk_diag = {}
-        for k in K_DIAG + [K_EVAL]:
-            topk_diag[k] = out.scores.sort_values("score", ascending=False).index[:k].tolist()
-        
-        return EngineOutput(
-            engine=self.name,
-            scores=out.scores,
-            meta=out.meta,
-            topk_diag=topk_diag
-        )
+        # Add TopK Diag (slices of one stable argsort)
+        out.engine = self.name
+        out.topk_diag = {k: out.topk(k) for k in K_DIAG + [K_EVAL]}
+        return out
+
+def _z_rows(x: np.ndarray) -> np.ndarray:
+    """_z of every row of an (R,45) array (pandas mean / sample std arithmetic)."""
+    # Contiguous rows keep numpy's pairwise row sums, as in the 1-D Series reductions
+    x = np.ascontiguousarray(x, dtype=float)
+    m = x.sum(axis=1, keepdims=True) / x.shape[1]
+    sd = np.sqrt(((m - x) ** 2).sum(axis=1, keepdims=True) / (x.shape[1] - 1))
+    return np.where(sd == 0, 0.0, (x - m) / np.where(sd == 0, 1.0, sd))
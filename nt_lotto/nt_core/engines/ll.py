@@ -6,6 +6,7 @@ from ..features import band_of
 
 class NTLL_ProxyEngine(Engine):
     name = "NT-LL"
+    requires = {"num"}
     def __init__(self, band_target=(2,1,1,2,0.5)):
         self.band_target = band_target
 
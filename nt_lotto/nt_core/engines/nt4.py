@@ -1,8 +1,12 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from .base import Engine
+from .base import Engine, _z_rows
 from ..schema import SSOT, FeaturePack, EngineOutput
+from ..feature_tensor import build_feature_tensor
+from ..noise import round_noise, batch_noise
+
+NOISE_SCALE = 0.05
 
 class NT4ExplorationEngine(Engine):
     """
@@ -12,6 +16,7 @@ class NT4ExplorationEngine(Engine):
     name = "NT4"
     uses_sorted = True
     uses_ordered = False
+    requires = {"num"}
 
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
         df = feats.num_features.copy()
@@ -23,9 +28,8 @@ class NT4ExplorationEngine(Engine):
         f20 = df.get("freq_20", 0.0)
         expl_bonus = (f20 == 0).astype(float) * 1.5
         
-        # Random noise for tie-breaking (reproducible)
-        np.random.seed(t_end)
-        noise = np.random.normal(0, 0.05, size=len(df))
+        # Random noise for tie-breaking (reproducible: private stream of round t_end)
+        noise = round_noise(t_end, NOISE_SCALE, size=len(df))
         
         score = base + expl_bonus + noise
         
@@ -36,6 +40,16 @@ class NT4ExplorationEngine(Engine):
             topk_diag={}
         )
 
+    def score_batch(self, ssot: SSOT, t_ends, state_mode: str = "band_parity") -> np.ndarray:
+        """(R,45) scores for every t_end (same rows as score_numbers on backtest packs), noise drawn at once."""
+        tensor = build_feature_tensor(ssot, t_ends)
+        if (tensor.ends == 0).any():
+            raise ValueError("num_features missing: no history at some t_end")
+        gap_z = tensor.column("gap_z")
+        base = _z_rows(tensor.column("ew_freq")) + 0.5 * _z_rows(np.where(np.isnan(gap_z), 0.0, gap_z))
+        expl_bonus = (tensor.column("freq_20") == 0).astype(float) * 1.5
+        return base + expl_bonus + batch_noise(t_ends, NOISE_SCALE)
+
 def _z(s: pd.Series) -> pd.Series:
     if s.std() == 0: return s * 0.0
     return (s - s.mean()) / s.std()
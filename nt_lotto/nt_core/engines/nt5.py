@@ -11,6 +11,7 @@ class NT5Engine(Engine):
     name = "NT5"
     uses_sorted = True
     uses_ordered = False
+    requires = {"num"}
 
     def __init__(self, wL=0.10, w20=0.15, w10=0.25, w5=0.35, wg=0.15):
         self.wL, self.w20, self.w10, self.w5, self.wg = wL, w20, w10, w5, wg
@@ -3,6 +3,10 @@ import pandas as pd
 import numpy as np
 from .base import Engine
 from ..schema import SSOT, FeaturePack, EngineOutput
+from ..noise import round_noise, batch_noise
+from ..feature_tensor import build_feature_tensor
+
+NOISE_SCALE = 0.1
 
 class NTExplorationEngine(Engine):
     """
@@ -12,6 +16,7 @@ class NTExplorationEngine(Engine):
     name = "NT-EXP"
     uses_sorted = True
     uses_ordered = False
+    requires = {"num"}
 
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
         df = feats.num_features.copy()
@@ -24,8 +29,8 @@ class NTExplorationEngine(Engine):
         gap_score = df["gap_z"].fillna(0.0)
         
         # 3. Add some randomness/exploration noise
-        np.random.seed(t_end) # deterministic noise for backtest reproducibility
-        noise = np.random.normal(0, 0.1, size=len(df))
+        # deterministic noise for backtest reproducibility (private stream of round t_end)
+        noise = round_noise(t_end, NOISE_SCALE, size=len(df))
         
         # Score = high if zero_freq + high_gap
         score = zero_mask * 2.0 + gap_score + noise
@@ -36,3 +41,12 @@ class NTExplorationEngine(Engine):
             meta={'n_zeros': int(zero_mask.sum())},
             topk_diag={}
         )
+
+    def score_batch(self, ssot: SSOT, t_ends, state_mode: str = "band_parity") -> np.ndarray:
+        """(R,45) scores for every t_end (same rows as score_numbers on backtest packs), noise drawn at once."""
+        tensor = build_feature_tensor(ssot, t_ends)
+        if (tensor.ends == 0).any():
+            raise ValueError("num_features missing: no history at some t_end")
+        zero_mask = (tensor.column("freq_10") == 0).astype(float)
+        gap_score = np.where(np.isnan(tensor.column("gap_z")), 0.0, tensor.column("gap_z"))
+        return zero_mask * 2.0 + gap_score + batch_noise(t_ends, NOISE_SCALE)
@@ -11,6 +11,7 @@ class NTOEngine(Engine):
     name = "NTO"
     uses_sorted = True
     uses_ordered = False
+    requires = {"num"}
 
     def __init__(self, p_trend=0.5, lam=0.7):
         # p_trend: weight for trend vs revert. lam: penalty for high-freq numbers in reversion.
@@ -6,6 +6,7 @@ from ..schema import SSOT, FeaturePack, EngineOutput
 
 class OmegaEngine(Engine):
     name = "NT-Ω"
+    requires = set()  # combines engine_outputs only
     def __init__(self, weights: Dict[str, float]):
         self.weights = weights
 
@@ -7,6 +7,7 @@ from ..schema import SSOT, FeaturePack, EngineOutput
 class NTLL(Engine):
     name = "NT-LL"
     uses_sorted = True
+    requires = {"shape"}
     def score_numbers(self, ssot, feats, t_end):
         shape = feats.shape_stats
         if not shape: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
@@ -23,6 +24,7 @@ class NTLL(Engine):
 class NTPAT(Engine):
     name = "NT-PAT"
     uses_sorted = True
+    requires = set()
     def score_numbers(self, ssot, feats, t_end):
         # Repetition pattern from last 3 rounds
         last3 = ssot.sorted_df[ssot.sorted_df["round"] > t_end - 3]
@@ -36,6 +38,7 @@ class NTPAT(Engine):
 class NTHCE(Engine):
     name = "NT-HCE"
     uses_sorted = True
+    requires = {"num"}
     def score_numbers(self, ssot, feats, t_end):
         df = feats.num_features
         mid = df["ew_freq"].mean()
@@ -46,6 +49,7 @@ class NTHCE(Engine):
 class NTDPP(Engine):
     name = "NT-DPP"
     uses_sorted = True
+    requires = {"num"}
     def score_numbers(self, ssot, feats, t_end):
         # Diversity: Smoothing density
         f5 = feats.num_features.get("freq_5", 0.0)
@@ -1,42 +1,35 @@
 from __future__ import annotations
-import itertools
+import numpy as np
 import pandas as pd
-import math
 from .base import Engine
 from ..schema import SSOT, FeaturePack, EngineOutput
+from ..draw_matrix import draw_matrix_of
+from ..cooccurrence import pair_counts, pmi_matrix
 
 class VPAEngine(Engine):
     name = "VPA"
+    requires = set()  # pair counts come straight from the draw matrix
     def __init__(self, W=300, min_pair_count=3):
         self.W, self.min_pair_count = W, min_pair_count
 
     def score_numbers(self, ssot: SSOT, feats: FeaturePack, t_end: int) -> EngineOutput:
         # Use a larger window (300-600) as recommended for stability
-        s = ssot.sorted_df[ssot.sorted_df["round"] <= t_end].tail(self.W)
-        wins = s[["n1","n2","n3","n4","n5","n6"]].values.tolist()
+        dm = draw_matrix_of(ssot)
+        end = dm.end_index(t_end)
+        recent = dm.onehot[max(0, end - self.W):end]
         
-        single = {i:0 for i in range(1,46)}; pair = {}
-        for row in wins:
-            for i in row: single[i] += 1
-            for a,b in itertools.combinations(sorted(row),2):
-                pair[(a,b)] = pair.get((a,b),0) + 1
+        counts = pair_counts(recent)
+        denom = max(1, len(recent))
+        # Lift/PMI calculation for stability: pmi = ln((c/n) / (pa*pb + 1e-12))
+        pmi = pmi_matrix(counts, denom, eps=1e-12, base=np.e)
         
-        denom = max(1, len(wins)); p = {i: single[i]/denom for i in single}
-        score = {i:0.0 for i in range(1,46)}
+        # Apply Filter: count(i,j) >= min_pair_count (off-diagonal pairs only)
+        keep = counts >= self.min_pair_count
+        np.fill_diagonal(keep, False)
         
-        for (a,b), c in pair.items():
-            # Apply Filter: count(i,j) >= min_pair_count
-            if c < self.min_pair_count: continue
-            
-            pa, pb = p[a], p[b]
-            # Lift/PMI calculation for stability
-            lift = (c/denom) / (pa*pb + 1e-12)
-            pmi = math.log(max(lift, 1e-12))
-            
-            # Aggregate PMI to number level as centralized signal
-            score[a] += pmi; score[b] += pmi
-            
-        out = pd.Series(score).sort_index()
+        # Aggregate PMI to number level as centralized signal
+        score = np.where(keep, pmi, 0.0).sum(axis=1, dtype=np.float64)
+        out = pd.Series(score, index=range(1, 46))
         # Scale for cross-engine comparison
         out = (out - out.mean()) / (out.std() + 1e-9)
         return EngineOutput(scores=pd.DataFrame({"score": out}))
@@ -1,40 +1,136 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from .base import Engine
+from .base import Engine, _z_rows
 from ..schema import SSOT, FeaturePack, EngineOutput
+from ..cooccurrence import N_NUMBERS, pair_prefix
+from ..draw_matrix import draw_matrix_of
+from ..constants import PAIR_WINDOW_DEFAULT
+
+LIFT_THRESHOLD = 1.2
+N_ANCHORS = 5
+
+# Both engines score a row sum of a dense pair matrix over their anchor set:
+#     score[n] = sum_a anchors[a] * M[a, n]    M: pair counts (VPA) or lift masked at > 1.2 (NT-VPA-1)
+# score_batch(ssot, t_ends, state_mode, anchors=None) takes an (R,45) 0/1 anchor matrix (default:
+# the engine's own anchors); row r equals score_numbers(...).scores at t_ends[r]
 
 class VPA(Engine):
     name = "VPA"
     uses_sorted = True
+    requires = {"num", "pair"}
     def score_numbers(self, ssot, feats, t_end):
         pair_df = feats.pair_stats
         if pair_df is None or pair_df.empty: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
         # Use simple pair counts for VPA
         f10 = feats.num_features.get("freq_10", 0.0)
-        anchors = f10.sort_values(ascending=False).index[:5].tolist()
-        num_scores = pd.Series(0.0, index=range(1, 46))
-        for anc in anchors:
-            matches = pair_df[(pair_df["n1"] == anc) | (pair_df["n2"] == anc)]
-            for _, row in matches.iterrows():
-                other = int(row["n2"] if row["n1"] == anc else row["n1"])
-                if 1 <= other <= 45: num_scores[other] += row["count"]
+        anchors = f10.sort_values(ascending=False).index[:N_ANCHORS].tolist()
+        counts, _ = pair_matrices(pair_df)
+        num_scores = pd.Series(anchor_scores(counts, anchor_rows([anchors]))[0], index=range(1, 46))
         return EngineOutput(self.name, pd.DataFrame({"score": _z(num_scores)}, index=num_scores.index), {'anchors': anchors}, {})
 
+    def score_batch(self, ssot, t_ends, state_mode="band_parity", anchors=None):
+        dm = draw_matrix_of(ssot)
+        ends = np.searchsorted(dm.rounds, np.asarray(list(t_ends), dtype=np.int64), side="right")
+        counts, _ = window_pair_counts(dm, ends)
+        if anchors is None:
+            # Top freq_10 numbers, ties broken as Series.sort_values(ascending=False) does
+            f10 = np.array([dm.window_index.tail_count(e, 10) / max(1, min(10, e)) for e in ends]).reshape(-1, N_NUMBERS)
+            anchors = top_anchor_rows(f10, N_ANCHORS)
+        return _z_rows(anchor_scores(_off_diagonal(counts), anchors))
+
 class NTVPA1(Engine):
     name = "NT-VPA-1"
     uses_sorted = True
+    requires = {"pair"}
     def score_numbers(self, ssot, feats, t_end):
         pair_df = feats.pair_stats # Use lift/pmi for "strong signal"
         if pair_df is None or pair_df.empty: return EngineOutput(self.name, pd.DataFrame({"score": 0.0}, index=range(1,46)), {}, {})
         latest_win = ssot.sorted_df[ssot.sorted_df["round"] == t_end][["n1","n2","n3","n4","n5","n6"]].values.flatten()
-        num_scores = pd.Series(0.0, index=range(1, 46))
-        for anc in latest_win:
-            matches = pair_df[((pair_df["n1"] == anc) | (pair_df["n2"] == anc)) & (pair_df["lift"] > 1.2)]
-            for _, row in matches.iterrows():
-                other = int(row["n2"] if row["n1"] == anc else row["n1"])
-                if 1 <= other <= 45: num_scores[other] += row["lift"]
-        return EngineOutput(self.name, pd.DataFrame({"score": _z(num_scores)}, index=num_scores.index), {'threshold': 1.2}, {})
+        _, lift = pair_matrices(pair_df)
+        num_scores = pd.Series(anchor_scores(_strong(lift), anchor_rows([latest_win]))[0], index=range(1, 46))
+        return EngineOutput(self.name, pd.DataFrame({"score": _z(num_scores)}, index=num_scores.index), {'threshold': LIFT_THRESHOLD}, {})
+
+    def score_batch(self, ssot, t_ends, state_mode="band_parity", anchors=None):
+        dm = draw_matrix_of(ssot)
+        t_ends = np.asarray(list(t_ends), dtype=np.int64)
+        ends = np.searchsorted(dm.rounds, t_ends, side="right")
+        counts, n_rows = window_pair_counts(dm, ends)
+        if anchors is None:
+            # The draw of round t_end itself (no anchors when the round is missing)
+            rows = np.array([dm.row_of(int(t)) for t in t_ends], dtype=np.intp).reshape(-1)
+            anchors = np.zeros((len(rows), N_NUMBERS))
+            anchors[rows >= 0] = dm.onehot[rows[rows >= 0]]
+        return _z_rows(anchor_scores(_strong(lift_matrices(counts, n_rows)), anchors))
+
+# --- dense pair matrices ---
+
+def pair_matrices(pair_df: pd.DataFrame):
+    """FeaturePack.pair_stats -> symmetric (45,45) float64 count and lift matrices, 0 on the diagonal and for absent pairs."""
+    i = pair_df["n1"].to_numpy(dtype=np.intp) - 1
+    j = pair_df["n2"].to_numpy(dtype=np.intp) - 1
+    counts = np.zeros((N_NUMBERS, N_NUMBERS))
+    lift = np.zeros((N_NUMBERS, N_NUMBERS))
+    counts[i, j] = counts[j, i] = pair_df["count"].to_numpy(dtype=float)
+    lift[i, j] = lift[j, i] = pair_df["lift"].to_numpy(dtype=float)
+    return counts, lift
+
+def window_pair_counts(dm, ends: np.ndarray, window: int = PAIR_WINDOW_DEFAULT):
+    """
+    (R,45,45) float64 pair counts over the last `window` rows before every end (diagonal = single
+    counts, as in FeaturePack.pair_stats) and the (R,) number of rows in each window.
+    """
+    prefix = pair_prefix(dm.onehot)
+    start = np.maximum(ends - window, 0)
+    return (prefix[ends] - prefix[start]).astype(float), ends - start
+
+def lift_matrices(counts: np.ndarray, n_rows: np.ndarray) -> np.ndarray:
+    """(R,45,45) lifts with the pair_table arithmetic, 0 on the diagonal and for absent pairs."""
+    N = np.maximum(1, n_rows).astype(float)[:, None]
+    p = np.diagonal(counts, axis1=1, axis2=2) / N
+    denom = p[:, :, None] * p[:, None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lift = (counts / N[:, :, None]) / denom
+    return _off_diagonal(np.where(counts > 0, lift, 0.0))
+
+def _off_diagonal(m: np.ndarray) -> np.ndarray:
+    out = np.array(m, dtype=float)
+    idx = np.arange(N_NUMBERS)
+    out[..., idx, idx] = 0.0
+    return out
+
+def _strong(lift: np.ndarray) -> np.ndarray:
+    return np.where(lift > LIFT_THRESHOLD, lift, 0.0)
+
+def anchor_rows(anchors) -> np.ndarray:
+    """Anchor number lists -> (R,45) 0/1 rows."""
+    out = np.zeros((len(anchors), N_NUMBERS))
+    for r, nums in enumerate(anchors):
+        nums = np.asarray(nums, dtype=np.intp)
+        out[r, nums[(nums >= 1) & (nums <= N_NUMBERS)] - 1] = 1.0
+    return out
+
+def top_anchor_rows(values: np.ndarray, k: int) -> np.ndarray:
+    """(R,45) values -> (R,45) 0/1 rows of the k largest per row (pandas descending quicksort order)."""
+    order = np.argsort(values[:, ::-1], axis=1, kind="quicksort")
+    top = (N_NUMBERS - 1 - order)[:, ::-1][:, :k]
+    out = np.zeros(values.shape)
+    np.put_along_axis(out, top, 1.0, axis=1)
+    return out
+
+def anchor_scores(matrix: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+    """
+    Row sums of matrix over the anchors: (45,45) or (R,45,45) matrix, (R,45) anchor rows -> (R,45).
+    Anchors are accumulated in number order, one row at a time.
+    """
+    anchors = np.asarray(anchors, dtype=float)
+    m = np.broadcast_to(matrix, (len(anchors), N_NUMBERS, N_NUMBERS))
+    out = np.zeros((len(anchors), N_NUMBERS))
+    for a in range(N_NUMBERS):
+        hit = anchors[:, a] != 0
+        if hit.any():
+            out[hit] += anchors[hit, a, None] * m[hit, a]
+    return out
 
 def _z(s):
     if s.std() == 0: return s * 0.0
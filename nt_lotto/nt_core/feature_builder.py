@@ -0,0 +1,217 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .schema import SSOT, FeaturePack, LazyFeaturePack, StateMode, FEATURE_GROUPS
+from .constants import WINDOWS_DEFAULT, EW_ALPHA_DEFAULT, PAIR_WINDOW_DEFAULT
+from .draw_matrix import draw_matrix_of
+from .features import _zscore, state_codes, state_labels, feature_group, order_fields
+from .cooccurrence import pair_table
+from .cooccurrence import CooccurrenceWindow
+from .feature_tensor import FeatureTensor
+
+"""
+Incremental FeaturePack Builder
+Role: Walk-forward feature state that advances t_end one draw at a time.
+
+Each new draw costs O(45 + 15 pairs): windowed counts, EW recursion, last-seen,
+windowed pair counts (CooccurrenceWindow), shape tallies and slot/Markov
+counts are updated in place. feature_pack() emits the same FeaturePack as
+build_feature_pack(ssot, t_end, ...) for the same parameters; ew_freq agrees to
+float rounding (recursion instead of re-weighting), everything else is identical.
+
+requires limits the groups (schema.FEATURE_GROUPS) kept up to date; packs are lazy,
+build() only snapshots the running counts and a group is emitted on first access.
+Groups outside requires fall back to the batch computation if they are read anyway.
+"""
+
+class FeaturePackBuilder:
+    def __init__(self, ssot: SSOT, windows=WINDOWS_DEFAULT, ew_alpha=EW_ALPHA_DEFAULT, ew_k=200, use_state: StateMode = "band_parity", pair_window=PAIR_WINDOW_DEFAULT, tensor: Optional[FeatureTensor] = None, requires: Optional[Iterable[str]] = None):
+        self.ssot = ssot
+        self.requires = frozenset(FEATURE_GROUPS if requires is None else requires)
+        # Optional precomputed num_features for the walk-forward range (see feature_tensor.py)
+        self.tensor = tensor if tensor is not None and tensor.matches(windows, ew_alpha, ew_k) else None
+        self.windows = list(windows)
+        self.ew_alpha = ew_alpha
+        self.ew_k = ew_k
+        self.use_state = use_state
+        self.pair_window = pair_window
+
+        dm = draw_matrix_of(ssot)
+        self._rounds = dm.rounds
+        self._numbers = dm.numbers.astype(np.intp)
+        self._bonus = dm.bonus.astype(np.intp)
+
+        o = ssot.ordered_df.sort_values("round", kind="stable")
+        self._o_rounds = o["round"].to_numpy()
+        self._o_codes = state_codes(o[["b1","b2","b3","b4","b5","b6"]].to_numpy(), use_state)
+        self._n_states = len(state_labels(use_state))
+        self.reset()
+
+    def reset(self) -> None:
+        self.t_end: Optional[int] = None
+        self._n = 0      # sorted rows applied
+        self._no = 0     # ordered rows applied
+
+        self._win_counts = {W: np.zeros(45, dtype=np.int64) for W in self.windows}
+        self._bonus_counts = np.zeros(45, dtype=np.int64)
+        self._last_seen = np.zeros(45, dtype=np.int64)
+        self._t_now = 0
+
+        # EW: S = sum_i alpha^(age_i) * onehot_i over the last ew_k rows
+        self._ew = np.zeros(45, dtype=float)
+        self._ew_counts = np.zeros(45, dtype=np.int64)
+        self._ew_tail = self.ew_alpha ** self.ew_k
+
+        # Pairs over the last pair_window rows
+        self._pairs = CooccurrenceWindow(size=self.pair_window)
+
+        # Shape: per-round sums and (odd, high) tallies in first-appearance order
+        self._sums = np.zeros(len(self._rounds), dtype=np.int64)
+        self._patterns: Dict[Tuple[int, int], int] = {}
+
+        # Order: (6,S) per-slot state counts and (S,S) transition counts
+        self._slots = np.zeros((6, self._n_states), dtype=np.int64)
+        self._trans = np.zeros((self._n_states, self._n_states), dtype=np.int64)
+
+    def feature_pack(self, t_end: int) -> FeaturePack:
+        """Advance to t_end (rewinding via reset if needed) and emit its FeaturePack."""
+        self.advance_to(t_end)
+        return self.build()
+
+    def advance_to(self, t_end: int) -> None:
+        if self.t_end is not None and t_end < self.t_end:
+            self.reset()
+        while self._n < len(self._rounds) and self._rounds[self._n] <= t_end:
+            self._push_sorted(self._n)
+        while self._no < len(self._o_rounds) and self._o_rounds[self._no] <= t_end:
+            self._push_ordered(self._no)
+        self.t_end = t_end
+
+    # --- updates ---
+
+    def _push_sorted(self, i: int) -> None:
+        row = self._numbers[i]
+        cols = row - 1
+        if "num" in self.requires:
+            self._push_num(i, row, cols)
+        if "pair" in self.requires:
+            self._pairs.push(row)
+        if "shape" in self.requires:
+            self._sums[i] = int(row.sum())
+            key = (int((row % 2 != 0).sum()), int((row >= 23).sum()))
+            self._patterns[key] = self._patterns.get(key, 0) + 1
+        self._n = i + 1
+
+    def _push_num(self, i: int, row: np.ndarray, cols: np.ndarray) -> None:
+        for W, counts in self._win_counts.items():
+            counts[cols] += 1
+            if i - W >= 0:
+                counts[self._numbers[i - W] - 1] -= 1
+        b = self._bonus[i]
+        if 1 <= b <= 45:
+            self._bonus_counts[b - 1] += 1
+        if i - 50 >= 0:
+            ob = self._bonus[i - 50]
+            if 1 <= ob <= 45:
+                self._bonus_counts[ob - 1] -= 1
+
+        r = int(self._rounds[i])
+        self._last_seen[cols] = r
+        self._t_now = max(self._t_now, r)
+
+        self._ew *= self.ew_alpha
+        self._ew[cols] += 1.0
+        self._ew_counts[cols] += 1
+        if i - self.ew_k >= 0:
+            old = self._numbers[i - self.ew_k] - 1
+            self._ew[old] -= self._ew_tail
+            self._ew_counts[old] -= 1
+            # Numbers that left the window entirely are exactly zero, as in the batch sum
+            self._ew[self._ew_counts == 0] = 0.0
+
+    def _push_ordered(self, i: int) -> None:
+        if "order" in self.requires:
+            codes = self._o_codes[i]
+            self._slots[np.arange(6), codes] += 1
+            np.add.at(self._trans, (codes[:-1], codes[1:]), 1)
+        self._no = i + 1
+
+    # --- emit ---
+
+    def build(self) -> FeaturePack:
+        if self.t_end is None:
+            raise ValueError("FeaturePackBuilder.build() before advance_to()")
+        loaders = {g: self._loader(g) for g in FEATURE_GROUPS}
+        return LazyFeaturePack(self.t_end, loaders, state_mode=self.use_state)
+
+    def group_at(self, t_end: int, group: str) -> Dict[str, Any]:
+        """Fields of one group at t_end (advancing or rewinding the builder)."""
+        self.advance_to(t_end)
+        return self._loader(group)()
+
+    def _loader(self, group: str):
+        if group in self.requires:
+            return getattr(self, f"_snapshot_{group}")()
+        t_end = self.t_end
+        params = dict(windows=self.windows, ew_alpha=self.ew_alpha, ew_k=self.ew_k, use_state=self.use_state, pair_window=self.pair_window, tensor=self.tensor)
+        return lambda: feature_group(self.ssot, t_end, group, **params)
+
+    # --- snapshots: copy the running counts now, emit frames on first access ---
+
+    def _snapshot_num(self):
+        t_end, tensor = self.t_end, self.tensor
+        if tensor is not None and tensor.index_of(t_end) >= 0:
+            return lambda: {"num_features": tensor.num_features(t_end)}
+        n = self._n
+        if n == 0:
+            return lambda: {"num_features": pd.DataFrame(index=range(1,46))}
+        freqs = {f"freq_{W}": self._win_counts[W].astype(float) / max(1, min(W, n)) for W in self.windows}
+        m = min(self.ew_k, n)
+        wsum = sum(self.ew_alpha**k for k in range(m))
+        ew = self._ew / wsum
+        gap = np.where(self._last_seen > 0, self._t_now - self._last_seen, self._t_now)
+        bonus = self._bonus_counts.astype(float) / max(1, min(50, n))
+
+        def emit():
+            feats = dict(freqs)
+            feats["ew_freq"] = ew
+            feats["gap"] = gap
+            feats["gap_z"] = _zscore(gap)
+            feats["bonus_freq_50"] = bonus
+            return {"num_features": pd.DataFrame(feats, index=np.arange(1, 46))}
+        return emit
+
+    def _snapshot_pair(self):
+        if self._n == 0:
+            return lambda: {"pair_stats": pd.DataFrame()}
+        counts, n_rows = self._pairs.counts.copy(), self._pairs.n_rows
+        return lambda: {"pair_stats": pair_table(counts, n_rows)}
+
+    def _snapshot_shape(self):
+        if self._n == 0:
+            return lambda: {"shape_stats": {}}
+        # rows < n of _sums are never rewritten (reset() allocates a new array)
+        sums = self._sums[:self._n]
+        patterns = dict(self._patterns)
+
+        def emit():
+            counts = pd.Series(
+                list(patterns.values()),
+                index=pd.MultiIndex.from_tuples(list(patterns.keys()), names=['odd_count', 'high_count']),
+                dtype=np.int64,
+            )
+            counts = counts.sort_values(ascending=False, kind="stable")
+            counts /= counts.sum()
+            return {"shape_stats": {
+                'sum_stats': pd.Series(sums).describe().to_dict(),
+                'pattern_counts': counts.to_frame(name='prob').reset_index().to_dict('records')
+            }}
+        return emit
+
+    def _snapshot_order(self):
+        use_state = self.use_state
+        if self._no == 0:
+            return lambda: order_fields(None, None, use_state)
+        slots, trans = self._slots.copy(), self._trans.copy()
+        return lambda: order_fields(slots, trans, use_state)
@@ -0,0 +1,283 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .schema import SSOT, FeaturePack, LazyFeaturePack, FEATURE_GROUPS, loaded_groups
+from .constants import FEATURE_CACHE_DIR
+from .draw_matrix import draw_matrix_of
+from .frame_memo import FrameMemo
+
+"""
+FeaturePack Cache
+Role: Two-level (in-memory LRU + on-disk npz) store of built FeaturePacks.
+
+Key = sha256 of (feature code hash, content hash of the draws <= t_end, hash of the ordered
+rows <= t_end, t_end, windows, ew_alpha, ew_k, use_state, pair_window, num source). The
+content hashes only cover rounds up to t_end, so appending a new draw keeps every earlier
+round's entry valid; the code hash covers the source of the feature modules, so editing
+them never serves packs built by the old code.
+
+Only the field groups a pack has actually computed are written; lazy_pack() hands out a
+LazyFeaturePack seeded with the stored groups that writes itself back as more are loaded.
+
+NT_FEATURE_CACHE=0 disables the cache; NT_FEATURE_CACHE_DIR moves the disk store.
+"""
+
+# Bump when the npz layout changes (feature code changes are covered by feature_code_hash())
+FEATURE_CACHE_VERSION = 3
+
+# Modules whose source FeaturePack values depend on
+_FEATURE_MODULES = (
+    "nt_lotto.nt_core.features",
+    "nt_lotto.nt_core.feature_tensor",
+    "nt_lotto.nt_core.feature_builder",
+    "nt_lotto.nt_core.cooccurrence",
+    "nt_lotto.nt_core.window_index",
+    "nt_lotto.nt_core.draw_matrix",
+)
+_CODE_HASH: Optional[str] = None
+
+def feature_code_hash() -> str:
+    """sha256 over the source of the feature modules."""
+    global _CODE_HASH
+    if _CODE_HASH is None:
+        h = hashlib.sha256()
+        for name in _FEATURE_MODULES:
+            __import__(name)
+            with open(sys.modules[name].__file__, "rb") as f:
+                h.update(name.encode("utf-8") + b"\0" + f.read())
+        _CODE_HASH = h.hexdigest()
+    return _CODE_HASH
+
+# ordered_df content -> (rounds, per-row hashes) in frame order
+_ORDERED_ROWS = FrameMemo(maxsize=8)
+
+def _ordered_rows(ordered_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    rounds = ordered_df["round"].to_numpy(dtype=np.int64)
+    return rounds, pd.util.hash_pandas_object(ordered_df, index=False).to_numpy()
+
+def ordered_hash(ordered_df: Optional[pd.DataFrame], t_end: int) -> str:
+    """
+    sha256 of the ordered rows with round <= t_end, as the order features read them (frame
+    order, duplicates and rounds missing from sorted_df included).
+    """
+    if ordered_df is None or ordered_df.empty:
+        return ""
+    rounds, rows = _ORDERED_ROWS.get([ordered_df], lambda: _ordered_rows(ordered_df))
+    h = hashlib.sha256(json.dumps([str(c) for c in ordered_df.columns]).encode("utf-8"))
+    h.update(np.ascontiguousarray(rows[rounds <= t_end]).tobytes())
+    return h.hexdigest()
+
+class FeatureCache:
+    def __init__(self, root: Optional[str] = FEATURE_CACHE_DIR, max_items: int = 256, max_bytes: int = 256 * 1024 * 1024):
+        self.root = root
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[str, FeaturePack]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None
+
+    def key(self, ssot: SSOT, t_end: int, windows, ew_alpha, ew_k, use_state, pair_window, source: str = "exact") -> str:
+        """source: 'exact' (float64 num_features) or 'tensor' (FeatureTensor slice)."""
+        dm = draw_matrix_of(ssot)
+        parts = {
+            "v": FEATURE_CACHE_VERSION,
+            "code": feature_code_hash(),
+            "draws": dm.prefix_hashes[dm.end_index(t_end)],
+            "ordered": ordered_hash(ssot.ordered_df, t_end),
+            "t_end": int(t_end),
+            "windows": [int(w) for w in windows],
+            "ew_alpha": float(ew_alpha),
+            "ew_k": int(ew_k),
+            "use_state": str(use_state),
+            "pair_window": int(pair_window),
+            "source": source,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[FeaturePack]:
+        pack = self._lru.get(key)
+        if pack is not None:
+            self._lru.move_to_end(key)
+            return pack
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                pack = _pack_from_arrays(z)
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        self._remember(key, pack)
+        return pack
+
+    def lazy_pack(self, key: str, t_end: int, loaders, state_mode=None) -> FeaturePack:
+        """
+        Cached pack for key, able to compute any group: groups missing from the cached
+        entry come from loaders, and the pack is written back whenever one is loaded.
+        """
+        hit = self.get(key)
+        if hit is not None and (not isinstance(hit, LazyFeaturePack) or hit.available_groups() >= set(FEATURE_GROUPS)):
+            return hit
+        values = hit.loaded_values() if hit is not None else None
+        pack = LazyFeaturePack(t_end, loaders, values=values, state_mode=state_mode, on_load=lambda p: self.put(key, p))
+        self._remember(key, pack)
+        return pack
+
+    def put(self, key: str, pack: FeaturePack) -> None:
+        self._remember(key, pack)
+        path = self._path(key)
+        if path is None or not loaded_groups(pack):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp.npz"
+            np.savez(tmp, **_pack_to_arrays(pack))
+            os.replace(tmp, path)
+        except OSError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes += os.path.getsize(path)
+        self._evict_disk()
+
+    def clear(self, disk: bool = False) -> None:
+        self._lru.clear()
+        if disk and self.root and os.path.isdir(self.root):
+            for path, _, _ in self._disk_files():
+                os.remove(path)
+            self._disk_bytes = 0
+
+    # ---------------------------------------------------------------------------
+
+    def _remember(self, key: str, pack: FeaturePack) -> None:
+        self._lru[key] = pack
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.root:
+            return None
+        return os.path.join(self.root, key[:2], key + ".npz")
+
+    def _disk_files(self):
+        files = []
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for f in os.scandir(sub.path):
+                if f.name.endswith(".npz"):
+                    st = f.stat()
+                    files.append((f.path, st.st_mtime_ns, st.st_size))
+        return files
+
+    def _evict_disk(self) -> None:
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, _, size in self._disk_files())
+        if self._disk_bytes <= self.max_bytes:
+            return
+        # Oldest-used first (get() refreshes mtime) until 90% of the budget
+        files = sorted(self._disk_files(), key=lambda f: f[1])
+        total = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+_DEFAULT: Optional[FeatureCache] = None
+_DEFAULT_INIT = False
+
+def get_feature_cache() -> Optional[FeatureCache]:
+    """Process-wide cache used by build_feature_pack/run_backtest (None when disabled)."""
+    global _DEFAULT, _DEFAULT_INIT
+    if not _DEFAULT_INIT:
+        _DEFAULT_INIT = True
+        if os.environ.get("NT_FEATURE_CACHE") != "0":
+            _DEFAULT = FeatureCache(root=os.environ.get("NT_FEATURE_CACHE_DIR", FEATURE_CACHE_DIR))
+    return _DEFAULT
+
+def set_feature_cache(cache: Optional[FeatureCache]) -> None:
+    global _DEFAULT, _DEFAULT_INIT
+    _DEFAULT, _DEFAULT_INIT = cache, True
+
+# --- npz (de)serialization, no pickles ---
+
+def _pack_to_arrays(pack: FeaturePack) -> Dict[str, np.ndarray]:
+    groups = sorted(loaded_groups(pack))
+    out: Dict[str, np.ndarray] = {"t_end": np.array(int(pack.t_end)), "groups": np.array(groups, dtype=str)}
+    out["state_mode"] = np.array("" if pack.state_mode is None else pack.state_mode)
+    if "num" in groups:
+        _put_frame(out, "num", pack.num_features)
+    if "pair" in groups:
+        _put_frame(out, "pair", pack.pair_stats)
+    if "shape" in groups:
+        shape = pack.shape_stats
+        out["shape"] = np.array("null" if shape is None else json.dumps(shape, default=_json_default))
+    # Order features are stored as count matrices; the labelled frames are rebuilt on load
+    if "order" in groups and pack.slot_counts is not None:
+        out["slot_counts"] = pack.slot_counts
+        out["markov_counts"] = pack.markov_counts
+    return out
+
+def _pack_from_arrays(z) -> LazyFeaturePack:
+    from .features import order_fields  # features imports this module
+    state_mode = str(z["state_mode"]) or None
+    groups = {str(g) for g in z["groups"]}
+    values: Dict[str, Any] = {}
+    if "num" in groups:
+        values["num_features"] = _get_frame(z, "num")
+    if "pair" in groups:
+        values["pair_stats"] = _get_frame(z, "pair")
+    if "shape" in groups:
+        values["shape_stats"] = json.loads(str(z["shape"]))
+    if "order" in groups:
+        slots = z["slot_counts"] if "slot_counts" in z.files else None
+        trans = z["markov_counts"] if "markov_counts" in z.files else None
+        values.update(order_fields(slots, trans, state_mode))
+    return LazyFeaturePack(int(z["t_end"]), {}, values=values, state_mode=state_mode)
+
+def _put_frame(out: Dict[str, np.ndarray], name: str, df: Optional[pd.DataFrame]) -> None:
+    if df is None:
+        out[f"{name}__none"] = np.array(1)
+        return
+    if isinstance(df.index, pd.RangeIndex):
+        out[f"{name}__range"] = np.array([df.index.start, df.index.stop, df.index.step])
+    else:
+        out[f"{name}__index"] = _plain(df.index.to_numpy())
+    out[f"{name}__columns"] = np.array([str(c) for c in df.columns], dtype=str)
+    for i, c in enumerate(df.columns):
+        out[f"{name}__c{i}"] = _plain(df[c].to_numpy())
+
+def _get_frame(z, name: str) -> Optional[pd.DataFrame]:
+    if f"{name}__none" in z.files:
+        return None
+    if f"{name}__range" in z.files:
+        start, stop, step = (int(v) for v in z[f"{name}__range"])
+        index = pd.RangeIndex(start, stop, step)
+    else:
+        index = pd.Index(z[f"{name}__index"])
+    columns = [str(c) for c in z[f"{name}__columns"]]
+    if not columns:
+        # Column-less frames (no history yet) keep pandas' default empty columns
+        return pd.DataFrame(index=index)
+    data = {c: z[f"{name}__c{i}"] for i, c in enumerate(columns)}
+    return pd.DataFrame(data, index=index, columns=columns)
+
+def _plain(a: np.ndarray) -> np.ndarray:
+    """Object (string) arrays -> fixed-width unicode so np.savez needs no pickle."""
+    return a.astype(str) if a.dtype == object or a.dtype.kind in ("O", "T") else np.asarray(a)
+
+def _json_default(o: Any):
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"not JSON serializable: {type(o)}")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .schema import SSOT
+from .constants import WINDOWS_DEFAULT, EW_ALPHA_DEFAULT
+from .draw_matrix import draw_matrix_of
+
+"""
+Feature Tensor
+Role: FeaturePack.num_features for a whole range of t_end in one pass.
+
+    values[r, n-1, f] = feature f of number n at t_end = t_ends[r]    (R,45,F) float32
+
+Windowed frequencies and bonus frequency come from the prefix-count index, ew_freq
+from one exponential-decay scan over the history, gap/gap_z from the running
+last-seen rows. num_features(t_end) returns the same columns as build_feature_pack.
+"""
+
+BONUS_WINDOW = 50
+
+def feature_columns(windows=WINDOWS_DEFAULT) -> List[str]:
+    return [f"freq_{W}" for W in windows] + ["ew_freq", "gap", "gap_z", f"bonus_freq_{BONUS_WINDOW}"]
+
+@dataclass(frozen=True)
+class FeatureTensor:
+    t_ends: np.ndarray          # (R,) requested t_end
+    ends: np.ndarray            # (R,) history rows <= t_end
+    columns: Tuple[str, ...]
+    values: np.ndarray          # (R,45,F) float32
+    windows: Tuple[int, ...]
+    ew_alpha: float
+    ew_k: int
+
+    def index_of(self, t_end: int) -> int:
+        """Row of t_end in the tensor, -1 if it was not computed."""
+        hit = np.nonzero(self.t_ends == t_end)[0]
+        return int(hit[0]) if len(hit) else -1
+
+    def matches(self, windows, ew_alpha, ew_k) -> bool:
+        return tuple(windows) == self.windows and ew_alpha == self.ew_alpha and ew_k == self.ew_k
+
+    def column(self, name: str) -> np.ndarray:
+        """(R,45) float64 values of one num_features column for every t_end."""
+        return self.values[:, :, self.columns.index(name)].astype(float)
+
+    def num_features(self, t_end: int) -> pd.DataFrame:
+        """num_features slice for one t_end (same layout as build_feature_pack)."""
+        r = self.index_of(t_end)
+        if r < 0:
+            raise KeyError(f"t_end {t_end} not in feature tensor")
+        if self.ends[r] == 0:
+            return pd.DataFrame(index=range(1,46))
+        return pd.DataFrame(self.values[r].astype(float), index=np.arange(1, 46), columns=list(self.columns))
+
+def build_feature_tensor(ssot: SSOT, t_ends: Sequence[int], windows=WINDOWS_DEFAULT, ew_alpha=EW_ALPHA_DEFAULT, ew_k=200) -> FeatureTensor:
+    dm = draw_matrix_of(ssot)
+    widx = dm.window_index
+    t_ends = np.asarray(list(t_ends), dtype=np.int64)
+    ends = np.searchsorted(dm.rounds, t_ends, side="right").astype(np.int64)
+    cols = feature_columns(windows)
+    R = len(t_ends)
+    out = np.zeros((R, 45, len(cols)), dtype=np.float32)
+    if R == 0:
+        return FeatureTensor(t_ends, ends, tuple(cols), out, tuple(windows), ew_alpha, ew_k)
+
+    f = 0
+    for W in windows:
+        start = np.maximum(ends - W, 0)
+        denom = np.maximum(1, np.minimum(W, ends))
+        out[:, :, f] = (widx.cum[ends] - widx.cum[start]) / denom[:, None]
+        f += 1
+
+    out[:, :, f] = _ew_scan(dm.onehot, ends, ew_alpha, ew_k)
+    f += 1
+
+    # gap: t_now - last seen round (t_now when never seen)
+    last_row = widx.last_row[ends]
+    seen = last_row >= 0
+    last_round = np.where(seen, dm.rounds[np.maximum(last_row, 0)], 0).astype(np.int64)
+    t_now = np.where(ends > 0, dm.rounds[np.maximum(ends - 1, 0)], 0).astype(np.int64)
+    gap = np.where(last_round > 0, t_now[:, None] - last_round, t_now[:, None]).astype(float)
+    out[:, :, f] = gap
+    out[:, :, f + 1] = _row_zscore(gap)
+    f += 2
+
+    start = np.maximum(ends - BONUS_WINDOW, 0)
+    denom = np.maximum(1, np.minimum(BONUS_WINDOW, ends))
+    out[:, :, f] = (widx.bonus_cum[ends] - widx.bonus_cum[start]) / denom[:, None]
+    return FeatureTensor(t_ends, ends, tuple(cols), out, tuple(windows), ew_alpha, ew_k)
+
+def _ew_scan(onehot: np.ndarray, ends: np.ndarray, alpha: float, k: int) -> np.ndarray:
+    """
+    Normalized EW frequency over the last k rows for every end:
+        S_e = alpha * S_(e-1) + x_(e-1) - alpha^k * x_(e-1-k),  ew = S_e / sum_{a<min(k,e)} alpha^a
+    """
+    T = int(ends.max()) if len(ends) else 0
+    x = onehot[:T].astype(float)
+    counts = np.zeros(45, dtype=np.int64)
+    S = np.zeros(45, dtype=float)
+    tail = alpha ** k
+    at_end = np.zeros((T + 1, 45), dtype=float)
+    for e in range(1, T + 1):
+        S *= alpha
+        S += x[e - 1]
+        counts += onehot[e - 1]
+        if e - 1 - k >= 0:
+            S -= tail * x[e - 1 - k]
+            counts -= onehot[e - 1 - k]
+            S[counts == 0] = 0.0
+        at_end[e] = S
+    m = np.minimum(k, ends)
+    powers = np.concatenate([[0.0], np.cumsum(alpha ** np.arange(max(1, k)))])
+    wsum = np.where(m > 0, powers[m], 1.0)
+    return at_end[ends] / wsum[:, None]
+
+def _row_zscore(x: np.ndarray) -> np.ndarray:
+    m = x.mean(axis=1, keepdims=True)
+    s = x.std(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (x - m) / s
+    return np.where(s == 0, 0.0, z)
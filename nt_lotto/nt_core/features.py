@@ -2,7 +2,12 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 from typing import Dict, Tuple, Optional, List, Any
-from .schema import SSOT, FeaturePack, StateMode
+from .schema import SSOT, FeaturePack, LazyFeaturePack, StateMode, FEATURE_GROUPS
+from .draw_matrix import DrawMatrix, draw_matrix_of
+from .window_index import WindowIndex
+from .cooccurrence import pair_counts, pair_table
+from .feature_tensor import FeatureTensor
+from .feature_cache import get_feature_cache
 from .constants import WINDOWS_DEFAULT, EW_ALPHA_DEFAULT, PAIR_WINDOW_DEFAULT
 
 BANDS = [(1,9),(10,19),(20,29),(30,39),(40,45)]
@@ -13,76 +18,70 @@ def band_of(n: int) -> int:
             return i
     raise ValueError(n)
 
-def build_feature_pack(ssot: SSOT, t_end: int, windows=WINDOWS_DEFAULT, ew_alpha=EW_ALPHA_DEFAULT, ew_k=200, use_state: StateMode = "band_parity", pair_window=PAIR_WINDOW_DEFAULT) -> FeaturePack:
-    sorted_df = ssot.sorted_df[ssot.sorted_df["round"] <= t_end].copy()
-    ordered_df = ssot.ordered_df[ssot.ordered_df["round"] <= t_end].copy()
-    
-    num_feats = _number_features(sorted_df, windows, ew_alpha, ew_k)
-    pair_stats = _pair_features_v2(sorted_df, window=pair_window)
-    shape_stats = _shape_features(sorted_df)
-    
-    slot_probs, markov = _order_features(ordered_df, windows, use_state)
-    
-    return FeaturePack(
-        t_end=t_end,
-        num_features=num_feats,
-        pair_stats=pair_stats,
-        shape_stats=shape_stats,
-        slot_state_probs=slot_probs,
-        markov_state=markov
-    )
-
-def _number_features(sorted_df: pd.DataFrame, windows, ew_alpha, ew_k) -> pd.DataFrame:
-    if sorted_df.empty:
+def build_feature_pack(ssot: SSOT, t_end: int, windows=WINDOWS_DEFAULT, ew_alpha=EW_ALPHA_DEFAULT, ew_k=200, use_state: StateMode = "band_parity", pair_window=PAIR_WINDOW_DEFAULT, tensor: Optional[FeatureTensor] = None) -> FeaturePack:
+    """
+    tensor: precomputed build_feature_tensor() for a t_end range; when it covers t_end with the
+    same windows/ew params, num_features is its (float32) slice instead of being recomputed.
+    The pack is lazy: each field group (num/pair/shape/order) is computed on first access.
+    Packs are memoized in the FeaturePack cache (see feature_cache.py).
+    """
+    use_tensor = tensor is not None and tensor.matches(windows, ew_alpha, ew_k) and tensor.index_of(t_end) >= 0
+    params = dict(windows=windows, ew_alpha=ew_alpha, ew_k=ew_k, use_state=use_state, pair_window=pair_window, tensor=tensor if use_tensor else None)
+    loaders = {g: (lambda g=g: feature_group(ssot, t_end, g, **params)) for g in FEATURE_GROUPS}
+    cache = get_feature_cache()
+    if cache is None:
+        return LazyFeaturePack(t_end, loaders, state_mode=use_state)
+    key = cache.key(ssot, t_end, windows, ew_alpha, ew_k, use_state, pair_window, source="tensor" if use_tensor else "exact")
+    return cache.lazy_pack(key, t_end, loaders, state_mode=use_state)
+
+def feature_group(ssot: SSOT, t_end: int, group: str, windows=WINDOWS_DEFAULT, ew_alpha=EW_ALPHA_DEFAULT, ew_k=200, use_state: StateMode = "band_parity", pair_window=PAIR_WINDOW_DEFAULT, tensor: Optional[FeatureTensor] = None) -> Dict[str, Any]:
+    """Fields of one FeaturePack group (see schema.FEATURE_GROUPS) at t_end."""
+    dm = draw_matrix_of(ssot)
+    if group == "num":
+        if tensor is not None and tensor.matches(windows, ew_alpha, ew_k) and tensor.index_of(t_end) >= 0:
+            return {"num_features": tensor.num_features(t_end)}
+        return {"num_features": _number_features(dm, dm.end_index(t_end), windows, ew_alpha, ew_k)}
+    if group == "pair":
+        return {"pair_stats": _pair_features_v2(dm, dm.end_index(t_end), window=pair_window)}
+    if group == "shape":
+        return {"shape_stats": _shape_features(ssot.sorted_df[ssot.sorted_df["round"] <= t_end])}
+    if group == "order":
+        slots, trans = _order_features(ssot.ordered_df[ssot.ordered_df["round"] <= t_end], windows, use_state)
+        return order_fields(slots, trans, use_state)
+    raise ValueError(f"unknown feature group: {group}")
+
+def order_fields(slots: Optional[np.ndarray], trans: Optional[np.ndarray], use_state: StateMode) -> Dict[str, Any]:
+    return {
+        "slot_counts": slots,
+        "markov_counts": trans,
+        "slot_state_probs": slot_probs_frame(slots, use_state),
+        "markov_state": markov_frame(trans, use_state),
+    }
+
+def _number_features(dm: DrawMatrix, end: int, windows, ew_alpha, ew_k) -> pd.DataFrame:
+    # rows [0, end) of dm are the rounds <= t_end
+    if end == 0:
         return pd.DataFrame(index=range(1,46))
-    rounds = sorted_df["round"].tolist()
-    wins = sorted_df[["n1","n2","n3","n4","n5","n6"]].values.tolist()
-    bonuses = sorted_df["bonus"].tolist()
+    widx = dm.window_index
     idx = np.arange(1, 46)
     feats = {}
     for W in windows:
-        feats[f"freq_{W}"] = _freq_window(idx, wins, W)
-    feats["ew_freq"] = _freq_ew(idx, wins, alpha=ew_alpha, k=ew_k)
-    last_seen = _last_seen(idx, rounds, wins)
-    t_now = max(rounds) if rounds else 0
+        feats[f"freq_{W}"] = _freq_window(widx, end, W)
+    feats["ew_freq"] = _freq_ew(idx, dm.numbers[:end], alpha=ew_alpha, k=ew_k)
+    last_seen = _last_seen(widx, end)
+    t_now = int(dm.rounds[:end].max())
     gap = np.where(last_seen > 0, t_now - last_seen, t_now) 
     feats["gap"] = gap
     feats["gap_z"] = _zscore(gap)
-    feats["bonus_freq_50"] = _bonus_freq_window(idx, bonuses, W=50)
+    feats["bonus_freq_50"] = _bonus_freq_window(widx, end, W=50)
     df = pd.DataFrame(feats, index=idx)
     return df
 
-def _pair_features_v2(sorted_df: pd.DataFrame, window: int) -> pd.DataFrame:
-    recent_df = sorted_df.tail(window)
-    if recent_df.empty: return pd.DataFrame()
-    
-    from itertools import combinations
-    pair_counts = {}
-    indiv_counts = {}
-    N = len(recent_df)
-    
-    wins = recent_df[["n1","n2","n3","n4","n5","n6"]].values
-    for row in wins:
-        for n in row:
-            indiv_counts[n] = indiv_counts.get(n, 0) + 1
-        for p in combinations(sorted(row), 2):
-            pair_counts[p] = pair_counts.get(p, 0) + 1
-            
-    rows = []
-    for (n1, n2), c_pair in pair_counts.items():
-        p_n1 = indiv_counts[n1] / N
-        p_n2 = indiv_counts[n2] / N
-        p_pair = c_pair / N
-        
-        lift = p_pair / (p_n1 * p_n2) if (p_n1 * p_n2) > 0 else 0
-        try:
-            pmi = np.log2(p_pair / (p_n1 * p_n2)) if p_pair > 0 else -10.0
-        except:
-            pmi = -10.0
-        
-        rows.append({'n1': n1, 'n2': n2, 'count': c_pair, 'lift': lift, 'pmi': pmi})
-        
-    return pd.DataFrame(rows)
+def _pair_features_v2(dm: DrawMatrix, end: int, window: int) -> pd.DataFrame:
+    # Last `window` rounds <= t_end: one X^T X product over the one-hot rows
+    recent = dm.onehot[max(0, end - window):end]
+    if len(recent) == 0: return pd.DataFrame()
+    return pair_table(pair_counts(recent), len(recent))
 
 def _shape_features(sorted_df: pd.DataFrame) -> Dict[str, Any]:
     if sorted_df.empty: return {}
@@ -108,11 +107,9 @@ def _shape_features(sorted_df: pd.DataFrame) -> Dict[str, Any]:
 def _order_features(ordered_df: pd.DataFrame, windows, use_state: StateMode):
     if ordered_df.empty: return None, None
     bcols = ["b1","b2","b3","b4","b5","b6"]
-    arr = ordered_df[bcols].values
-    states = np.vectorize(lambda n: _state(n, use_state))(arr)
-    slot_probs = _slot_state_probs(states)
-    markov = _markov_transition(states)
-    return slot_probs, markov
+    codes = state_codes(ordered_df[bcols].to_numpy(), use_state)
+    S = len(state_labels(use_state))
+    return slot_counts(codes, S), transition_counts(codes, S)
 
 def _state(n: int, use_state: StateMode):
     b = band_of(n)
@@ -123,62 +120,89 @@ def _state(n: int, use_state: StateMode):
         return f"B{b}_T{tail}"
     return f"B{b}"
 
-def _slot_state_probs(states: np.ndarray) -> pd.DataFrame:
-    slots = {}
-    for j in range(6):
-        col = states[:, j]
-        vc = pd.Series(col).value_counts(normalize=True)
-        slots[f"slot{j+1}"] = vc
-    return pd.DataFrame(slots).fillna(0.0)
-
-def _markov_transition(states: np.ndarray) -> pd.DataFrame:
-    pairs = []
-    for row in range(len(states)):
-        for j in range(5):
-            pairs.append((states[row, j], states[row, j+1]))
-    if not pairs: return pd.DataFrame()
-    s = pd.Series(pairs)
-    counts = s.value_counts()
-    from_counts = {}
-    for (a,b), c in counts.items():
-        from_counts[a] = from_counts.get(a, 0) + c
-    rows = []
-    for (a,b), c in counts.items():
-        p = c / from_counts[a]
-        rows.append((a,b,p,c))
-    return pd.DataFrame(rows, columns=["from","to","p","count"])
-
-def _freq_window(idx, wins, W: int) -> np.ndarray:
-    recent = wins[-W:] if len(wins) >= W else wins
-    denom = max(1, len(recent))
-    counts = np.zeros(45, dtype=float)
-    for row in recent:
-        for n in row: counts[n-1] += 1.0
-    return counts / denom
+# --- Integer state codes ---
+# code = position of _state(n) in state_labels(mode); labels only appear when reporting
+
+def state_labels(use_state: StateMode) -> Tuple[str, ...]:
+    if use_state == "band_parity":
+        return tuple(f"B{b}_{p}" for b in range(1, len(BANDS) + 1) for p in ("E", "O"))
+    if use_state == "band_tail":
+        return tuple(f"B{b}_T{t}" for b in range(1, len(BANDS) + 1) for t in range(10))
+    return tuple(f"B{b}" for b in range(1, len(BANDS) + 1))
+
+_STATE_LUT: Dict[str, np.ndarray] = {}
+
+def state_lut(use_state: StateMode) -> np.ndarray:
+    """(46,) int code per number (index 0 unused, -1)."""
+    lut = _STATE_LUT.get(use_state)
+    if lut is None:
+        pos = {lab: i for i, lab in enumerate(state_labels(use_state))}
+        lut = np.array([-1] + [pos[_state(n, use_state)] for n in range(1, 46)], dtype=np.intp)
+        lut.setflags(write=False)
+        _STATE_LUT[use_state] = lut
+    return lut
+
+def state_codes(numbers, use_state: StateMode) -> np.ndarray:
+    return state_lut(use_state)[np.asarray(numbers, dtype=np.intp)]
+
+def slot_counts(codes: np.ndarray, S: int) -> np.ndarray:
+    """(T,6) codes -> (6,S) int64 per-slot state counts."""
+    codes = np.asarray(codes, dtype=np.intp).reshape(-1, 6)
+    flat = (np.arange(6) * S)[None, :] + codes
+    return np.bincount(flat.ravel(), minlength=6 * S).reshape(6, S)
+
+def transition_counts(codes: np.ndarray, S: int) -> np.ndarray:
+    """(T,6) codes -> (S,S) int64 counts of slot j -> slot j+1 transitions."""
+    codes = np.asarray(codes, dtype=np.intp).reshape(-1, 6)
+    flat = codes[:, :-1] * S + codes[:, 1:]
+    return np.bincount(flat.ravel(), minlength=S * S).reshape(S, S)
+
+def row_probs(counts: np.ndarray) -> np.ndarray:
+    """Row-normalized probabilities (last axis, so stacks of matrices work too); all-zero rows stay 0."""
+    c = np.asarray(counts, dtype=float)
+    tot = c.sum(axis=-1, keepdims=True)
+    return np.divide(c, tot, out=np.zeros_like(c), where=tot > 0)
+
+def slot_probs_frame(counts: Optional[np.ndarray], use_state: StateMode) -> Optional[pd.DataFrame]:
+    """Reporting view of slot_counts: index=state label (observed states), cols=slot1..slot6."""
+    if counts is None: return None
+    labels = np.array(state_labels(use_state))
+    seen = counts.sum(axis=0) > 0
+    probs = row_probs(counts)[:, seen]
+    return pd.DataFrame({f"slot{j+1}": probs[j] for j in range(6)}, index=labels[seen])
+
+def markov_frame(counts: Optional[np.ndarray], use_state: StateMode) -> Optional[pd.DataFrame]:
+    """Reporting view of transition_counts: from, to, p, count (count desc, then code order)."""
+    if counts is None: return None
+    labels = np.array(state_labels(use_state), dtype=object)
+    a, b = np.nonzero(counts)
+    if len(a) == 0: return pd.DataFrame()
+    c = counts[a, b]
+    order = np.argsort(-c, kind="stable")
+    a, b, c = a[order], b[order], c[order]
+    p = row_probs(counts)[a, b]
+    return pd.DataFrame({"from": labels[a], "to": labels[b], "p": p, "count": c.astype(np.int64)})
+
+def _freq_window(widx: WindowIndex, end: int, W: int) -> np.ndarray:
+    denom = max(1, min(W, end))
+    return widx.tail_count(end, W).astype(float) / denom
 
 def _freq_ew(idx, wins, alpha=0.93, k=200) -> np.ndarray:
     recent = wins[-k:] if len(wins) >= k else wins
     weights = np.array([alpha**i for i in range(len(recent))][::-1], dtype=float)
     weights = weights / weights.sum() if weights.sum() > 0 else weights
     counts = np.zeros(45, dtype=float)
-    for w, row in zip(weights, recent):
-        for n in row: counts[n-1] += w
+    # np.add.at accumulates in row order, same sums as the per-row loop
+    recent = np.asarray(recent, dtype=np.intp)
+    np.add.at(counts, recent.ravel() - 1, np.repeat(weights, recent.shape[1]))
     return counts
 
-def _last_seen(idx, rounds, wins) -> np.ndarray:
-    last = np.zeros(45, dtype=int)
-    for r, row in zip(rounds, wins):
-        for n in row:
-            if n > 0 and n <= 45: last[n-1] = r
-    return last
+def _last_seen(widx: WindowIndex, end: int) -> np.ndarray:
+    return widx.last_seen(end)
 
-def _bonus_freq_window(idx, bonuses, W=50) -> np.ndarray:
-    recent = bonuses[-W:] if len(bonuses) >= W else bonuses
-    denom = max(1, len(recent))
-    counts = np.zeros(45, dtype=float)
-    for b in recent:
-        if b > 0 and b <= 45: counts[b-1] += 1.0
-    return counts / denom
+def _bonus_freq_window(widx: WindowIndex, end: int, W=50) -> np.ndarray:
+    denom = max(1, min(W, end))
+    return widx.bonus_tail_count(end, W).astype(float) / denom
 
 def _zscore(x: np.ndarray) -> np.ndarray:
     x = x.astype(float)
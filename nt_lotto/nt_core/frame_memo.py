@@ -0,0 +1,82 @@
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, Optional, Sequence, TypeVar
+import pandas as pd
+
+"""
+Frame Memo
+Role: In-process memo of values derived from draws frames, keyed by frame content.
+
+A frame is identified by its fingerprint (column names and row values in row order, through
+pd.util.hash_pandas_object), not by the object: a frame edited in place gets a new key, and
+an equal copy reuses the entry. Fingerprinting is linear in the frame (~0.3 ms for 1,200
+draws), far below rebuilding the derived value.
+
+pinned_fingerprint(df) fingerprints a frame once for the duration of a call that does not
+modify it (the engine executor pins the draws of each request), so the nested lookups of
+composite engines and their sub-engines skip re-hashing.
+"""
+
+T = TypeVar("T")
+
+# Per-thread pins: id(df) -> (df, fingerprint), only while a pinned_fingerprint block is open
+_PINS = threading.local()
+
+def frame_fingerprint(df: Optional[pd.DataFrame]) -> str:
+    """sha256 of a frame's column names and row values in row order ('' for None)."""
+    if df is None:
+        return ""
+    pins = getattr(_PINS, "frames", None)
+    if pins:
+        hit = pins.get(id(df))
+        if hit is not None and hit[0] is df:
+            return hit[1]
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+@contextmanager
+def pinned_fingerprint(df: pd.DataFrame) -> Iterator[str]:
+    """
+    Fingerprint df once for the block: frame_fingerprint(df) returns it without re-hashing
+    until the block exits. The caller must not modify df inside the block.
+    """
+    pins = getattr(_PINS, "frames", None)
+    if pins is None:
+        pins = _PINS.frames = {}
+    hit = pins.get(id(df))
+    if hit is not None and hit[0] is df:
+        yield hit[1]
+        return
+    fp = frame_fingerprint(df)
+    pins[id(df)] = (df, fp)
+    try:
+        yield fp
+    finally:
+        pins.pop(id(df), None)
+
+class FrameMemo:
+    """Bounded LRU memo: (fingerprints of frames, key) -> value built on a miss."""
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self._memo: "OrderedDict[tuple, Any]" = OrderedDict()
+
+    def get(self, frames: Sequence[Optional[pd.DataFrame]], build: Callable[[], T], key: Hashable = ()) -> T:
+        """Memoized build() for the current content of frames (and key)."""
+        k = (tuple(frame_fingerprint(f) for f in frames), key)
+        if k in self._memo:
+            self._memo.move_to_end(k)
+            return self._memo[k]
+        value = build()
+        self._memo[k] = value
+        while len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._memo.clear()
@@ -3,10 +3,11 @@ import os
 from typing import Optional
 from .schema import SSOT
 from .constants import EXCLUDE_CSV
+from .ssot_cache import load_ssot_frame
 
 def load_ssot(draws_sorted_csv: str, draws_ordered_csv: str) -> SSOT:
-    s = pd.read_csv(draws_sorted_csv)
-    o = pd.read_csv(draws_ordered_csv)
+    s = load_ssot_frame(draws_sorted_csv)
+    o = load_ssot_frame(draws_ordered_csv)
     
     # Filter Exclusions
     if os.path.exists(EXCLUDE_CSV):
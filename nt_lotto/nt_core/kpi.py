@@ -1,9 +1,18 @@
-from typing import Dict, List, Set, Tuple, Optional
+import hashlib
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Set, Tuple, Optional
 import pandas as pd
-import numpy as np
 from .constants import EXCLUDE_CSV, K_EVAL
 from .ssot import load_exclude_rounds
 
+# Bump when the checkpoint layout or the recall definition changes
+KPI_STATE_VERSION = 2
+# Recent-recall windows (recent10 / recent20 / recent30)
+KPI_WINDOWS = (10, 20, 30)
+
 def compute_recall_at_k(topk: List[int], winning_six: Set[int]) -> float:
     """
     Calculate Recall@K = |TopK ∩ Win| / 6
@@ -13,13 +22,115 @@ def compute_recall_at_k(topk: List[int], winning_six: Set[int]) -> float:
     common = set(topk).intersection(winning_six)
     return len(common) / 6.0
 
+@dataclass
+class EngineKPIState:
+    """
+    Checkpointed Recall@K aggregate of one engine.
+    Hits (|TopK ∩ Win|, recall * 6) are kept as integers, so the running sum is exact and an
+    incremental update gives the same KPI as a rebuild. `recent` is a ring buffer of the hits
+    of the last max(windows) evaluated rounds; `digest` is the topk_digest() of the Top-K
+    history the aggregate was built from (update_engine_kpi), "" when not tracked.
+    """
+    engine_id: str
+    ring: int = 30
+    last_round: int = -1
+    n: int = 0
+    hit_sum: int = 0
+    recent: Deque[int] = field(default_factory=deque)
+    digest: str = ""
+
+    def __post_init__(self):
+        self.recent = deque(self.recent, maxlen=self.ring)
+
+    def add(self, round_num: int, hits: int) -> None:
+        self.last_round = int(round_num)
+        self.n += 1
+        self.hit_sum += int(hits)
+        self.recent.append(int(hits))
+
+    def kpi_row(self, windows: Tuple[int, int, int] = KPI_WINDOWS) -> dict:
+        if self.n == 0:
+            return {
+                "engine_id": self.engine_id, 
+                "status": "STUB",
+                "overall": 0.0, 
+                "recent10": 0.0, 
+                "recent20": 0.0, 
+                "recent30": 0.0, 
+                "n_eval_rounds": 0
+            }
+        recent = list(self.recent)
+        tail = lambda w: recent[-w:]
+        return {
+            "engine_id": self.engine_id,
+            "status": "ACTIVE",
+            "overall": self.hit_sum / (6.0 * self.n),
+            "recent10": sum(tail(windows[0])) / (6.0 * len(tail(windows[0]))),
+            "recent20": sum(tail(windows[1])) / (6.0 * len(tail(windows[1]))),
+            "recent30": sum(tail(windows[2])) / (6.0 * len(tail(windows[2]))),
+            "n_eval_rounds": self.n
+        }
+
+def topk_digest(history: Dict[int, List[int]], upto: int, k_eval: int, exclusions: Set[int]) -> str:
+    """sha256 of an engine's Top-k sets of the rounds <= upto (excluded rounds left out)."""
+    h = hashlib.sha256()
+    for r in sorted(int(r) for r in history if r <= upto and r not in exclusions):
+        h.update(json.dumps([r, sorted(int(n) for n in history[r][:k_eval])]).encode("utf-8"))
+    return h.hexdigest()
+
+def _state_meta(k_eval: int, windows: Tuple[int, int, int], exclusions: Set[int], scope: Optional[dict]) -> dict:
+    return {
+        "version": KPI_STATE_VERSION,
+        "k_eval": int(k_eval),
+        "windows": [int(w) for w in windows],
+        "exclusions": sorted(int(r) for r in exclusions),
+        "scope": scope or {},
+    }
+
+def load_kpi_state(path: str, k_eval: int, windows: Tuple[int, int, int], exclusions: Set[int],
+                   scope: Optional[dict] = None) -> Dict[str, EngineKPIState]:
+    """
+    Per-engine checkpoints from a state JSON. Returns {} (full rebuild) when the file is missing,
+    unreadable or was written for another k_eval / windows / exclusion set / caller scope
+    (e.g. the first round of an evaluation range).
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("meta") != _state_meta(k_eval, windows, exclusions, scope):
+        return {}
+    ring = max(windows)
+    return {
+        eng: EngineKPIState(eng, ring, int(s["last_round"]), int(s["n"]), int(s["hit_sum"]), deque(s["recent"]), s.get("digest", ""))
+        for eng, s in data.get("engines", {}).items()
+    }
+
+def save_kpi_state(path: str, states: Dict[str, EngineKPIState], k_eval: int, windows: Tuple[int, int, int],
+                   exclusions: Set[int], scope: Optional[dict] = None) -> None:
+    data = {
+        "meta": _state_meta(k_eval, windows, exclusions, scope),
+        "engines": {
+            eng: {"last_round": s.last_round, "n": s.n, "hit_sum": s.hit_sum, "recent": list(s.recent), "digest": s.digest}
+            for eng, s in states.items()
+        },
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
 def update_engine_kpi(
     kpi_csv_path: str,
     engine_topk_by_round: Dict[str, Dict[int, List[int]]], 
     ssot_sorted_df: pd.DataFrame,
     exclusions: Set[int],
     k_eval: int = 20,
-    windows: Tuple[int, int, int] = (10, 20, 30)
+    windows: Tuple[int, int, int] = KPI_WINDOWS,
+    state_path: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Update Engine KPI (Recall@K) for all engines.
@@ -31,68 +142,56 @@ def update_engine_kpi(
         engine_topk_by_round: { 'NT4': { 1200: [..], 1201: [..], ... }, ... }
         ssot_sorted_df: SSOT DataFrame (for winning numbers).
         exclusions: Set of round numbers to exclude from KPI aggregation.
+        state_path: Checkpoint JSON (EngineKPIState per engine). When given, only rounds after an
+                    engine's last evaluated round are scored and the checkpoint is rewritten.
+                    An engine whose Top-K history up to its checkpoint no longer matches the
+                    checkpoint's digest (e.g. an older round was backfilled) is rebuilt from
+                    its full history.
         
     Returns:
         DataFrame with columns: engine_id, overall, recent10, recent20, recent30, n_eval_rounds
     """
     
-    # 1. Build Round-Wise Recall History per Engine
-    # Map: Engine -> [(Round, Recall), ...]
-    engine_recalls: Dict[str, List[float]] = {eng: [] for eng in engine_topk_by_round.keys()}
+    ring = max(windows)
+    checkpoints = load_kpi_state(state_path, k_eval, windows, exclusions) if state_path else {}
+    
+    # 1. Resume each engine from its checkpoint (or from scratch) and collect the delta rounds
+    # Map: Engine -> [Round, ...] still to be scored, in round order
+    states: Dict[str, EngineKPIState] = {}
+    todo: Dict[str, List[int]] = {}
+    for engine, history in engine_topk_by_round.items():
+        state = checkpoints.get(engine)
+        if state is None or state.digest != topk_digest(history, state.last_round, k_eval, exclusions):
+            state = EngineKPIState(engine, ring)
+        states[engine] = state
+        # Skip excluded rounds for KPI stats
+        todo[engine] = sorted(r for r in history.keys() if r > state.last_round and r not in exclusions)
     
-    # Convert SSOT to dict for fast lookup: Round -> Set(Winning 6)
-    # Filter SSOT to only rounds relevant (we might have topk for future rounds? No, only past).
-    ssot_valid = ssot_sorted_df[~ssot_sorted_df['round'].isin(exclusions)]
+    # Convert SSOT to dict for fast lookup: Round -> Set(Winning 6), only for the delta rounds
+    need = set(r for rounds in todo.values() for r in rounds)
+    ssot_valid = ssot_sorted_df[ssot_sorted_df['round'].isin(need) & ~ssot_sorted_df['round'].isin(exclusions)]
     winning_map = {
         row['round']: set([row['n1'], row['n2'], row['n3'], row['n4'], row['n5'], row['n6']])
         for _, row in ssot_valid.iterrows()
     }
+    last_drawn = ssot_sorted_df['round'].max() if len(ssot_sorted_df) else -1
 
-    # Iterate engines
-    for engine, history in engine_topk_by_round.items():
-        # history is Round -> TopK List
-        # Sort rounds
-        sorted_rounds = sorted(history.keys())
-        
-        for r_num in sorted_rounds:
-            if r_num in exclusions:
-                continue # Skip excluded rounds for KPI stats
-            
+    # 2. Score the delta rounds
+    for engine, rounds in todo.items():
+        history = engine_topk_by_round[engine]
+        for r_num in rounds:
+            if r_num > last_drawn:
+                break # Future round: scored (and checkpointed) once its draw is in the SSOT
             if r_num not in winning_map:
-                continue # Can't score if no winning numbers (e.g. future round)
+                continue # Can't score if no winning numbers
                 
-            win_set = winning_map[r_num]
-            topk = history[r_num]
+            hits = len(set(history[r_num][:k_eval]).intersection(winning_map[r_num]))
+            states[engine].add(r_num, hits)
             
-            recall = compute_recall_at_k(topk[:k_eval], win_set)
-            engine_recalls[engine].append(recall)
+    if state_path:
+        for engine, state in states.items():
+            state.digest = topk_digest(engine_topk_by_round[engine], state.last_round, k_eval, exclusions)
+        save_kpi_state(state_path, states, k_eval, windows, exclusions)
             
-    # 2. aggregating
-    rows = []
-    
-    for engine, recalls in engine_recalls.items():
-        n = len(recalls)
-        if n == 0:
-            row = {
-                "engine_id": engine, 
-                "status": "STUB",
-                "overall": 0.0, 
-                "recent10": 0.0, 
-                "recent20": 0.0, 
-                "recent30": 0.0, 
-                "n_eval_rounds": 0
-            }
-        else:
-            rec_arr = np.array(recalls)
-            row = {
-                "engine_id": engine,
-                "status": "ACTIVE",
-                "overall": float(np.mean(rec_arr)),
-                "recent10": float(np.mean(rec_arr[-windows[0]:])),
-                "recent20": float(np.mean(rec_arr[-windows[1]:])),
-                "recent30": float(np.mean(rec_arr[-windows[2]:])),
-                "n_eval_rounds": n
-            }
-        rows.append(row)
-        
-    return pd.DataFrame(rows)
+    # 3. aggregating
+    return pd.DataFrame([state.kpi_row(windows) for state in states.values()])
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Sequence, Tuple
+import numpy as np
+
+"""
+Deterministic Noise
+Role: Per-round noise streams for the exploration engines (NT4, NT-EXP).
+
+Round t_end draws from its own RandomState(t_end): the same MT19937 sequence the engines
+used to get from np.random.seed(t_end) on the global RNG, so every score is unchanged, but
+the global state is never touched and results no longer depend on call order or threads.
+
+Legacy normal(0, scale) is scale * standard_normal(), so the standard draws are memoized
+per round and standard_normals(t_ends) returns the (R,size) table for a batch at once.
+"""
+
+_MEMO: "OrderedDict[Tuple[int, int], np.ndarray]" = OrderedDict()
+_MEMO_LIMIT = 4096
+
+def round_stream(t_end: int) -> np.random.RandomState:
+    """Private generator of round t_end (legacy np.random.seed(t_end) sequence)."""
+    return np.random.RandomState(int(t_end))
+
+def standard_normals(t_ends: Sequence[int], size: int = 45) -> np.ndarray:
+    """(R,size) float64: row r = the first `size` standard normal draws of round_stream(t_ends[r])."""
+    out = np.empty((len(t_ends), size))
+    for r, t in enumerate(t_ends):
+        key = (int(t), int(size))
+        z = _MEMO.get(key)
+        if z is None:
+            z = round_stream(t).standard_normal(size)
+            z.setflags(write=False)
+            _MEMO[key] = z
+            while len(_MEMO) > _MEMO_LIMIT:
+                _MEMO.popitem(last=False)
+        out[r] = z
+    return out
+
+def round_noise(t_end: int, scale: float, size: int = 45) -> np.ndarray:
+    """normal(0, scale, size) of round t_end."""
+    return scale * standard_normals([t_end], size)[0]
+
+def batch_noise(t_ends: Sequence[int], scale: float, size: int = 45) -> np.ndarray:
+    """(R,size) normal(0, scale) noise, row r equal to round_noise(t_ends[r], scale, size)."""
+    return scale * standard_normals(t_ends, size)
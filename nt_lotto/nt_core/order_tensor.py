@@ -0,0 +1,56 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Sequence
+import numpy as np
+from .schema import SSOT, StateMode
+from .features import state_codes, state_labels
+
+"""
+Order Tensor
+Role: The "order" FeaturePack group (slot / Markov counts) for a whole range of t_end in one pass.
+
+    slots[r]  (6,S) per-slot state counts over ordered rows with round <= t_ends[r]
+    trans[r]  (S,S) slot j -> j+1 transition counts over the same rows
+    last[r]   (6,)  state codes of the draw of round t_ends[r], -1 if it has no ordered row
+
+Counts are prefix sums of per-draw one-hot rows, so every t_end costs one gather; the
+values equal features._order_features on ordered_df[round <= t_end].
+"""
+
+BCOLS = ["b1", "b2", "b3", "b4", "b5", "b6"]
+
+@dataclass(frozen=True)
+class OrderTensor:
+    t_ends: np.ndarray          # (R,) requested t_end
+    ends: np.ndarray            # (R,) ordered rows <= t_end
+    slots: np.ndarray           # (R,6,S) int64
+    trans: np.ndarray           # (R,S,S) int64
+    last: np.ndarray            # (R,6) intp, -1 when round t_end is missing
+    use_state: str
+
+def build_order_tensor(ssot: SSOT, t_ends: Sequence[int], use_state: StateMode = "band_parity") -> OrderTensor:
+    o = ssot.ordered_df.sort_values("round", kind="stable")
+    rounds = o["round"].to_numpy()
+    codes = state_codes(o[BCOLS].to_numpy(), use_state).reshape(-1, 6)
+    S = len(state_labels(use_state))
+    T = len(codes)
+    t_ends = np.asarray(list(t_ends), dtype=np.int64)
+    ends = np.searchsorted(rounds, t_ends, side="right").astype(np.int64)
+
+    rows = np.arange(T)[:, None]
+    slot_flat = rows * (6 * S) + (np.arange(6) * S)[None, :] + codes
+    trans_flat = rows * (S * S) + codes[:, :-1] * S + codes[:, 1:]
+    slots = _prefix_at(np.bincount(slot_flat.ravel(), minlength=T * 6 * S).reshape(T, 6 * S), ends)
+    trans = _prefix_at(np.bincount(trans_flat.ravel(), minlength=T * S * S).reshape(T, S * S), ends)
+
+    # The t_end draw is the last row <= t_end when its round matches
+    at = np.maximum(ends - 1, 0)
+    has_last = (ends > 0) & (rounds[at] == t_ends) if T else np.zeros(len(t_ends), dtype=bool)
+    last = np.where(has_last[:, None], codes[at] if T else -1, -1).astype(np.intp)
+    return OrderTensor(t_ends, ends, slots.reshape(-1, 6, S), trans.reshape(-1, S, S), last, use_state)
+
+def _prefix_at(per_row: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Sums of per_row[:e] for every e in ends (int64)."""
+    cum = np.zeros((len(per_row) + 1, per_row.shape[1]), dtype=np.int64)
+    np.cumsum(per_row, axis=0, out=cum[1:])
+    return cum[ends]
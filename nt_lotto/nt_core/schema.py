@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Literal
+from typing import Any, Callable, Dict, List, Optional, Literal, Set
+import numpy as np
 import pandas as pd
 
 Round = int
@@ -21,13 +22,120 @@ class FeaturePack:
     shape_stats: Optional[Dict[str, Any]] = None # band, odd_even, high_low, sum, run_len
     slot_state_probs: Optional[pd.DataFrame] = None
     markov_state: Optional[pd.DataFrame] = None
+    # Integer-coded order features (codes: features.state_labels(state_mode))
+    state_mode: Optional[StateMode] = None
+    slot_counts: Optional[np.ndarray] = None    # (6,S) per-slot state counts
+    markov_counts: Optional[np.ndarray] = None  # (S,S) slot j -> j+1 transition counts
+
+# Feature groups an engine can declare in Engine.requires, and the fields each one fills
+FEATURE_GROUPS: Dict[str, tuple] = {
+    "num": ("num_features",),
+    "pair": ("pair_stats",),
+    "shape": ("shape_stats",),
+    "order": ("slot_counts", "markov_counts", "slot_state_probs", "markov_state"),
+}
+GROUP_OF_FIELD = {f: g for g, fields in FEATURE_GROUPS.items() for f in fields}
+
+def _lazy_field(name: str):
+    def get(self):
+        d = self.__dict__
+        if name not in d:
+            self._load(GROUP_OF_FIELD[name])
+        return d[name]
+    return property(get)
+
+class LazyFeaturePack(FeaturePack):
+    """
+    FeaturePack whose field groups are computed on first access and memoized.
+    loaders: group -> callable returning {field: value} for that group.
+    values:  fields already known (e.g. read back from the feature cache).
+    on_load: called with the pack after each group is computed.
+    """
+    num_features = _lazy_field("num_features")
+    pair_stats = _lazy_field("pair_stats")
+    shape_stats = _lazy_field("shape_stats")
+    slot_state_probs = _lazy_field("slot_state_probs")
+    markov_state = _lazy_field("markov_state")
+    slot_counts = _lazy_field("slot_counts")
+    markov_counts = _lazy_field("markov_counts")
+
+    def __init__(self, t_end: Round, loaders: Dict[str, Callable[[], Dict[str, Any]]], values: Optional[Dict[str, Any]] = None, state_mode: Optional[StateMode] = None, on_load: Optional[Callable[["LazyFeaturePack"], None]] = None):
+        object.__setattr__(self, "t_end", t_end)
+        object.__setattr__(self, "state_mode", state_mode)
+        object.__setattr__(self, "_loaders", loaders)
+        object.__setattr__(self, "_on_load", on_load)
+        self.__dict__.update(values or {})
+
+    def _load(self, group: str) -> None:
+        loader = self._loaders.get(group)
+        if loader is None:
+            raise KeyError(f"FeaturePack group '{group}' is not available")
+        self.__dict__.update(loader())
+        if self._on_load is not None:
+            self._on_load(self)
+
+    def loaded_groups(self) -> Set[str]:
+        return {g for g, fields in FEATURE_GROUPS.items() if fields[0] in self.__dict__}
+
+    def available_groups(self) -> Set[str]:
+        return self.loaded_groups() | set(self._loaders)
+
+    def loaded_values(self) -> Dict[str, Any]:
+        return {f: self.__dict__[f] for g in self.loaded_groups() for f in FEATURE_GROUPS[g]}
+
+def loaded_groups(pack: FeaturePack) -> Set[str]:
+    """Groups whose fields are already computed (all of them for an eager FeaturePack)."""
+    if isinstance(pack, LazyFeaturePack):
+        return pack.loaded_groups()
+    return set(FEATURE_GROUPS)
 
-@dataclass(frozen=True)
 class EngineOutput:
-    engine: str
-    scores: pd.DataFrame          # index=1..45, col: 'score'
-    meta: Dict[str, Any]          # params, state_mode, window, etc.
-    topk_diag: Dict[int, List[int]] # {15: [...], 20: [...], 25: [...]}
+    """
+    Array-backed engine result.
+
+    numbers / values: scored numbers (1..45) and their float64 scores
+    order:            one stable argsort (score DESC, then input order), computed on first use;
+                      topk(k) is a slice of it
+    scores:           the historical DataFrame view (index=numbers, col 'score'), built on access
+
+    Accepts the old constructor forms: scores as a DataFrame/Series with a 'score' column,
+    or a (45,) array for numbers 1..45.
+    """
+    __slots__ = ("engine", "numbers", "values", "meta", "topk_diag", "_order", "_frame")
+
+    def __init__(self, engine: str = "", scores: Any = None, meta: Optional[Dict[str, Any]] = None,
+                 topk_diag: Optional[Dict[int, List[int]]] = None):
+        self.engine = engine
+        self._frame = None
+        if isinstance(scores, pd.DataFrame):
+            self.numbers = scores.index.to_numpy().astype(np.int64)
+            self.values = scores["score"].to_numpy(dtype=np.float64)
+            self._frame = scores
+        elif isinstance(scores, pd.Series):
+            self.numbers = scores.index.to_numpy().astype(np.int64)
+            self.values = scores.to_numpy(dtype=np.float64)
+        else:
+            self.values = np.zeros(45) if scores is None else np.asarray(scores, dtype=np.float64)
+            self.numbers = np.arange(1, len(self.values) + 1, dtype=np.int64)
+        self.meta = meta if meta is not None else {}
+        self.topk_diag = topk_diag if topk_diag is not None else {}
+        self._order = None
+
+    @property
+    def order(self) -> np.ndarray:
+        """Positions into numbers/values by score DESC (NaN last), ties in input order."""
+        if self._order is None:
+            self._order = np.argsort(-self.values, kind="stable")
+        return self._order
+
+    def topk(self, k: int) -> List[Number]:
+        return self.numbers[self.order[:k]].tolist()
+
+    @property
+    def scores(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = pd.DataFrame({"score": self.values}, index=self.numbers)
+        return self._frame
 
 @dataclass(frozen=True)
 class BacktestRoundResult:
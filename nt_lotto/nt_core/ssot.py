@@ -2,6 +2,7 @@ import pandas as pd
 import os
 from typing import Set, Tuple, Optional
 from .constants import SSOT_SORTED, SSOT_ORDERED, EXCLUDE_CSV
+from .ssot_cache import load_ssot_frame
 
 def load_exclude_rounds() -> Set[int]:
     """
@@ -29,7 +30,7 @@ def load_ssot_sorted() -> pd.DataFrame:
     if not os.path.exists(SSOT_SORTED):
         raise FileNotFoundError(f"SSOT Sorted not found: {SSOT_SORTED}")
     
-    df = pd.read_csv(SSOT_SORTED)
+    df = load_ssot_frame(SSOT_SORTED)
     required_cols = ['round', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'bonus']
     
     # Validation
@@ -48,7 +49,7 @@ def load_ssot_ordered() -> pd.DataFrame:
     if not os.path.exists(SSOT_ORDERED):
         raise FileNotFoundError(f"SSOT Ordered not found: {SSOT_ORDERED}")
         
-    df = pd.read_csv(SSOT_ORDERED)
+    df = load_ssot_frame(SSOT_ORDERED)
     # Check common columns, usually b1..b6
     return df
 
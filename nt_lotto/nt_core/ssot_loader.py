@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 from .constants import SORTED_CSV, ORDERED_CSV, EXCLUDE_CSV
+from .ssot_cache import load_ssot_frame
 
 def load_data(exclusion_mode=True):
     """
@@ -18,8 +19,8 @@ def load_data(exclusion_mode=True):
     if not os.path.exists(ORDERED_CSV):
         raise FileNotFoundError(f"SSOT Ordered not found: {ORDERED_CSV}")
         
-    df_sorted = pd.read_csv(SORTED_CSV)
-    df_ordered = pd.read_csv(ORDERED_CSV)
+    df_sorted = load_ssot_frame(SORTED_CSV)
+    df_ordered = load_ssot_frame(ORDERED_CSV)
     
     # Load Exclusions
     exclude_list = []
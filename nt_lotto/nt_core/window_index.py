@@ -0,0 +1,126 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .frame_memo import FrameMemo
+
+"""
+Window Index
+Role: Cumulative per-number counts over the draw history.
+
+    cum[t, n-1]        = appearances of n in rows [0, t)        shape (T+1,45)
+    bonus_cum[t, n-1]  = bonus appearances of n in rows [0, t)  shape (T+1,45)
+    last_row[t, n-1]   = last row < t containing n, -1 if none   shape (T+1,45)
+
+count(n, rows a..b) = cum[b] - cum[a], i.e. one subtraction per window query.
+Rows are in history order (ascending round for SSOT frames).
+"""
+
+N_NUMBERS = 45
+SORTED_COLS = ["n1", "n2", "n3", "n4", "n5", "n6"]
+
+@dataclass(frozen=True)
+class WindowIndex:
+    rounds: np.ndarray     # (T,)
+    cum: np.ndarray        # (T+1,45) int32
+    bonus_cum: np.ndarray  # (T+1,45) int32
+    last_row: np.ndarray   # (T+1,45) int32
+
+    def __len__(self) -> int:
+        return int(self.rounds.shape[0])
+
+    @classmethod
+    def from_counts(cls, rounds, counts: np.ndarray, bonus_counts: Optional[np.ndarray] = None) -> "WindowIndex":
+        """counts: (T,45) per-row appearances of each number."""
+        rounds = np.asarray(rounds)
+        counts = np.asarray(counts, dtype=np.int32)
+        T = counts.shape[0]
+        if bonus_counts is None:
+            bonus_counts = np.zeros((T, N_NUMBERS), dtype=np.int32)
+
+        cum = np.zeros((T + 1, N_NUMBERS), dtype=np.int32)
+        np.cumsum(counts, axis=0, out=cum[1:])
+        bonus_cum = np.zeros((T + 1, N_NUMBERS), dtype=np.int32)
+        np.cumsum(np.asarray(bonus_counts, dtype=np.int32), axis=0, out=bonus_cum[1:])
+
+        seen_at = np.where(counts > 0, np.arange(T, dtype=np.int32)[:, None], np.int32(-1))
+        last_row = np.full((T + 1, N_NUMBERS), -1, dtype=np.int32)
+        if T:
+            np.maximum.accumulate(seen_at, axis=0, out=last_row[1:])
+
+        for a in (rounds, cum, bonus_cum, last_row):
+            a.setflags(write=False)
+        return cls(rounds, cum, bonus_cum, last_row)
+
+    @classmethod
+    def from_draw_matrix(cls, dm) -> "WindowIndex":
+        return cls.from_counts(dm.rounds, dm.onehot, dm.bonus_onehot)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cols: Sequence[str] = SORTED_COLS, bonus_col: Optional[str] = "bonus") -> "WindowIndex":
+        """
+        Build from a draw frame in its row order.
+        Values outside 1..45 (or NaN) are ignored, as value_counts().reindex(1..45) would.
+        """
+        counts = row_counts(df[list(cols)].to_numpy()) if cols else np.zeros((len(df), N_NUMBERS), dtype=np.int32)
+        bonus = row_counts(df[[bonus_col]].to_numpy()) if bonus_col and bonus_col in df.columns else None
+        return cls.from_counts(df["round"].to_numpy(), counts, bonus)
+
+    # --- window queries (rows [start, end)) ---
+
+    def count(self, start: int, end: int) -> np.ndarray:
+        return self.cum[end] - self.cum[start]
+
+    def bonus_count(self, start: int, end: int) -> np.ndarray:
+        return self.bonus_cum[end] - self.bonus_cum[start]
+
+    def tail_count(self, end: int, W: int) -> np.ndarray:
+        """Counts over the last W rows before end (fewer if history is shorter)."""
+        return self.count(max(0, end - W), end)
+
+    def bonus_tail_count(self, end: int, W: int) -> np.ndarray:
+        return self.bonus_count(max(0, end - W), end)
+
+    def last_seen(self, end: int) -> np.ndarray:
+        """Round of the last appearance before row end, 0 if never seen."""
+        rows = self.last_row[end]
+        out = np.zeros(N_NUMBERS, dtype=np.int64)
+        hit = rows >= 0
+        out[hit] = self.rounds[rows[hit]]
+        return out
+
+def row_counts(values: np.ndarray) -> np.ndarray:
+    """(T,k) raw cell values -> (T,45) int32 appearances of each number 1..45."""
+    vals = np.asarray(values, dtype=float)
+    T = vals.shape[0]
+    out = np.zeros((T, N_NUMBERS), dtype=np.int32)
+    ok = np.isfinite(vals) & (vals >= 1) & (vals <= N_NUMBERS) & (vals == np.floor(vals))
+    r, c = np.nonzero(ok)
+    np.add.at(out, (r, vals[r, c].astype(np.intp) - 1), 1)
+    return out
+
+_INDEXES = FrameMemo(maxsize=8)
+
+def frame_index(df: pd.DataFrame, cols: Sequence[str] = SORTED_COLS) -> WindowIndex:
+    """WindowIndex for a frame, reused across calls while the frame content is unchanged."""
+    return _INDEXES.get([df], lambda: WindowIndex.from_frame(df, cols), key=tuple(cols))
+
+def history_index(df: pd.DataFrame, target_round: int, cols: Sequence[str] = SORTED_COLS) -> Tuple[WindowIndex, int]:
+    """
+    (index, end) such that rows [0, end) are exactly df[df['round'] < target_round]
+    in the original row order.
+    """
+    rounds = df["round"].to_numpy()
+    if len(rounds) < 2 or np.all(rounds[1:] >= rounds[:-1]):
+        return frame_index(df, cols), int(np.searchsorted(rounds, target_round, side="left"))
+    # Unsorted frame: the filtered history is not a prefix, index it directly
+    history = df[df["round"] < target_round]
+    return WindowIndex.from_frame(history, cols), len(history)
+
+def positional_number_cols(df: pd.DataFrame) -> List[str]:
+    """
+    Number columns among df.columns[1:7], the slice the nt_engines read with
+    iloc[:, 1:7] (n1..n6 on 'round,n1..' frames, n1..n5 when a date column follows round).
+    """
+    return [c for c in df.columns[1:7] if pd.api.types.is_numeric_dtype(df[c])]
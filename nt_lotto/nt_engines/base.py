@@ -37,3 +37,31 @@ class StubEngine:
     def topk_numbers(self, k: int) -> List[int]:
         # Return empty list to indicate no prediction
         return []
+
+class AnalyzeEngine:
+    """
+    EngineBase adapter over an implemented nt_engines engine.
+    fit() keeps the training draws; topk_numbers(k) ranks the round after them through the
+    memoized executor (the module is imported on first use).
+    """
+    def __init__(self, engine_id: str, required_ssot: str = "sorted"):
+        self.engine_id = engine_id
+        self.required_ssot = required_ssot
+        self.fitted = False
+        self.train_sorted: Optional[pd.DataFrame] = None
+        
+    def fit(self, train_sorted: pd.DataFrame, train_ordered: Optional[pd.DataFrame]) -> None:
+        self.train_sorted = train_sorted
+        self.fitted = True
+        
+    def topk_numbers(self, k: int) -> List[int]:
+        if self.train_sorted is None or self.train_sorted.empty:
+            return []
+        from .executor import get_executor
+        target = int(self.train_sorted['round'].max()) + 1
+        res = get_executor().analyze(self.engine_id, self.train_sorted, target)
+        if isinstance(res, list):
+            return [int(n) for n in res[:k]]
+        if res.get("scores"):
+            return [int(s["n"]) for s in res["scores"][:k]]
+        return [int(n) for n in res.get("topk", [])[:k]]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.window_index import WindowIndex, frame_index, history_index, SORTED_COLS
+
+"""
+Batch Scoring Helpers
+Role: Shared plumbing for the nt_engines score_batch(draws, rounds) entry points.
+
+score_batch(draws, rounds) -> float32 (R,45): row i scores numbers 1..45 for rounds[i]
+from the draws with round < rounds[i] (rows without history are all zero).
+Each engine keeps one float64 kernel over (index, ends); analyze() runs it for a
+single round and formats the per-round dict, so both paths score identically.
+"""
+
+N_NUMBERS = 45
+NUMBERS = np.arange(1, N_NUMBERS + 1)
+
+Kernel = Callable[[WindowIndex, np.ndarray], np.ndarray]
+
+def history_ends(df: pd.DataFrame, rounds: Sequence[int], cols: Sequence[str] = SORTED_COLS) -> List[Tuple[WindowIndex, np.ndarray, np.ndarray]]:
+    """
+    [(index, ends, rows)]: for rounds[rows[i]], index rows [0, ends[i]) are exactly
+    df[df['round'] < round] in df order. One index for a round-sorted frame, one per round otherwise.
+    """
+    rounds = np.asarray(rounds, dtype=np.int64).ravel()
+    r = df["round"].to_numpy()
+    if len(r) < 2 or np.all(r[1:] >= r[:-1]):
+        ends = np.searchsorted(r, rounds, side="left").astype(np.int64)
+        return [(frame_index(df, cols), ends, np.arange(len(rounds)))]
+    out = []
+    for i, t in enumerate(rounds):
+        widx, end = history_index(df, int(t), cols)
+        out.append((widx, np.array([end], dtype=np.int64), np.array([i])))
+    return out
+
+def batch_scores(df: pd.DataFrame, rounds: Sequence[int], kernel: Kernel, cols: Sequence[str] = SORTED_COLS) -> np.ndarray:
+    """float64 (R,45) kernel scores; rows whose history is empty stay zero."""
+    out = np.zeros((len(np.atleast_1d(rounds)), N_NUMBERS), dtype=float)
+    for widx, ends, rows in history_ends(df, rounds, cols):
+        has = ends > 0
+        if has.any():
+            out[rows[has]] = kernel(widx, ends[has])
+    return out
+
+def rank_order(scores: np.ndarray) -> np.ndarray:
+    """Column order per row: score DESC, number ASC (same as lexsort((numbers, -score)))."""
+    return np.argsort(-np.asarray(scores), axis=-1, kind="stable")
+
+def minmax_rows(x: np.ndarray, tol: Optional[float] = None, flat: float = 0.0, eps: float = 0.0) -> np.ndarray:
+    """
+    Row-wise (x - min) / (max - min + eps). Rows with max == min (or max - min < tol)
+    are filled with flat.
+    """
+    x = np.asarray(x)
+    mn = x.min(axis=-1, keepdims=True)
+    rng = x.max(axis=-1, keepdims=True) - mn
+    is_flat = rng == 0 if tol is None else rng < tol
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (x - mn) / (rng + eps)
+    return np.where(is_flat, flat, out)
+
+def tail_counts(widx: WindowIndex, ends: np.ndarray, W: int) -> np.ndarray:
+    """(R,45) counts over the last W rows before each end."""
+    return widx.cum[ends] - widx.cum[np.maximum(ends - W, 0)]
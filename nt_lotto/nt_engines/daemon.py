@@ -0,0 +1,280 @@
+from __future__ import annotations
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+import pandas as pd
+from nt_lotto.nt_core.constants import (
+    ARCHIVE_DIR, DAEMON_HOST, DAEMON_PORT, DATA_DIR, EXCLUDE_CSV, ORDERED_CSV, SORTED_CSV,
+)
+from nt_lotto.nt_core.ssot_loader import load_data
+from .executor import get_executor
+from .result_store import engine_results
+
+"""
+Engine Daemon
+Role: Long-running local process that keeps the SSOT, feature caches and engine memo warm.
+
+Protocol: POST http://<host>:<port>/call with {"method": str, "params": {...}}; the reply is
+{"ok": true, "result": ...} or {"ok": false, "error": str}. Only methods of EngineService are
+callable, one request at a time, and the server only binds to localhost by default.
+
+Every request (/shutdown included) must carry the token the server wrote at start to a 0600
+file (token_path(port)) in the X-NT-Daemon-Token header, Content-Type application/json and a
+localhost Host header; anything else is refused with 403/415 before the body is read. That
+keeps other local users and browser pages (cross-site text/plain POSTs, DNS rebinding) out.
+run_engines only writes under the archive root (ARCHIVE_DIR).
+
+call() is the thin client: it uses a running daemon when one answers and otherwise runs the
+method in-process on a process-wide EngineService, so callers never spawn interpreters.
+NT_DAEMON=0 skips the daemon; NT_DAEMON_HOST / NT_DAEMON_PORT move it.
+"""
+
+logger = logging.getLogger("EngineDaemon")
+
+TOKEN_HEADER = "X-NT-Daemon-Token"
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+class DaemonError(RuntimeError):
+    pass
+
+def token_path(port: int) -> str:
+    """Token file of the daemon on port (NT_DAEMON_TOKEN_DIR moves it)."""
+    return os.path.join(os.environ.get("NT_DAEMON_TOKEN_DIR", DATA_DIR), f".engine_daemon_{int(port)}.token")
+
+def write_token(path: str) -> str:
+    """New random token in a fresh owner-only (0600) file at path."""
+    token = secrets.token_hex(32)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.lexists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+def read_token(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+class EngineService:
+    """The methods the daemon serves. SSOT frames are reloaded when the CSVs change."""
+    METHODS = ("ping", "reload", "run_engines", "engine_topk")
+
+    def __init__(self, out_root: str = ARCHIVE_DIR):
+        self.out_root = out_root
+        self._lock = threading.Lock()
+        self._ssot: Dict[bool, Tuple[tuple, pd.DataFrame, pd.DataFrame]] = {}
+
+    def ssot(self, exclusion_mode: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        fp = _fingerprint()
+        hit = self._ssot.get(exclusion_mode)
+        if hit is None or hit[0] != fp:
+            df_sorted, df_ordered = load_data(exclusion_mode=exclusion_mode)
+            hit = (fp, df_sorted, df_ordered)
+            self._ssot[exclusion_mode] = hit
+        return hit[1], hit[2]
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method not in self.METHODS:
+            raise DaemonError(f"Unknown method: {method}")
+        with self._lock:
+            return getattr(self, method)(**params)
+
+    # --- methods ---
+
+    def ping(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "ssot_loaded": sorted(self._ssot)}
+
+    def reload(self) -> Dict[str, Any]:
+        """Drop the SSOT frames and the engine memo."""
+        self._ssot.clear()
+        get_executor().clear()
+        return self.ping()
+
+    def run_engines(self, target: int, out_dir: str, workers: int = 1) -> str:
+        """
+        run_engines.py for target into out_dir (relative to out_root, and resolving inside it);
+        returns the engine_topk_K20.csv path.
+        """
+        from nt_lotto.scripts import run_engines as script
+        out_dir = self._out_dir(out_dir)
+        df_sorted, _ = self.ssot(exclusion_mode=True)
+        return script.run_engines(int(target), out_dir, df_sorted=df_sorted, workers=int(workers))
+
+    def engine_topk(self, engine: str, rounds, k: int = 20, **params) -> Dict[str, list]:
+        """{round: Top-k numbers} of a batch engine through the result store."""
+        df_sorted, _ = self.ssot(exclusion_mode=True)
+        res = engine_results(engine, df_sorted, rounds, **params)
+        return {str(int(r)): res.topk(i, int(k)) for i, r in enumerate(res.rounds)}
+
+    def _out_dir(self, out_dir: str) -> str:
+        root = os.path.realpath(self.out_root)
+        path = os.path.realpath(os.path.join(root, str(out_dir)))
+        if os.path.commonpath([root, path]) != root:
+            raise DaemonError(f"out_dir outside {root}: {out_dir}")
+        return path
+
+def _fingerprint() -> tuple:
+    out = []
+    for path in (SORTED_CSV, ORDERED_CSV, EXCLUDE_CSV):
+        try:
+            st = os.stat(path)
+            out.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+# --- server ---
+
+def _host_name(host: str) -> str:
+    if host.startswith("["):
+        return host[1:host.find("]")]
+    return host.rsplit(":", 1)[0]
+
+def make_handler(service: EngineService, on_shutdown: Callable[[], None]):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            refused = self._refused()
+            if refused is not None:
+                logger.warning(f"Refused {self.path} from {self.client_address[0]}: {refused[1]}")
+                self._reply(refused[0], {"ok": False, "error": refused[1]})
+                return
+            if self.path == "/shutdown":
+                self._reply(200, {"ok": True, "result": None})
+                on_shutdown()
+                return
+            if self.path != "/call":
+                self._reply(404, {"ok": False, "error": f"Unknown path: {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                result = service.dispatch(body.get("method", ""), body.get("params") or {})
+                self._reply(200, {"ok": True, "result": result})
+            except Exception as e:
+                logger.warning(f"{type(e).__name__}: {e}")
+                self._reply(200, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+        def _refused(self) -> Optional[Tuple[int, str]]:
+            """(status, reason) unless the request is a localhost JSON call with the token."""
+            if _host_name(self.headers.get("Host", "")) not in LOCAL_HOSTS:
+                return 403, "Host must be localhost"
+            if self.headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json":
+                return 415, "Content-Type must be application/json"
+            if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode("utf-8"), self.server.token.encode("utf-8")):
+                return 403, "Bad or missing daemon token"
+            return None
+
+        def _reply(self, status: int, obj: dict):
+            data = json.dumps(obj, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return Handler
+
+class DaemonServer(HTTPServer):
+    """HTTPServer holding the request token; removes its token file on server_close()."""
+    token: str = ""
+    token_file: Optional[str] = None
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.token_file and os.path.exists(self.token_file):
+            os.remove(self.token_file)
+
+def make_server(host: str = DAEMON_HOST, port: int = DAEMON_PORT, service: Optional[EngineService] = None,
+                token_file: Optional[str] = None) -> DaemonServer:
+    """Bound server with a new token written to token_file (token_path(bound port) by default)."""
+    service = service or EngineService()
+    server: Optional[DaemonServer] = None
+
+    def shutdown():
+        # Called from the handler: stop serve_forever() from another thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    server = DaemonServer((host, port), make_handler(service, shutdown))
+    server.service = service
+    server.token_file = token_file or token_path(server.server_address[1])
+    server.token = write_token(server.token_file)
+    return server
+
+def serve(host: str = DAEMON_HOST, port: int = DAEMON_PORT, warm: bool = True) -> None:
+    server = make_server(host, port)
+    if warm:
+        server.service.ssot(exclusion_mode=True)
+    logger.info(f"Engine daemon listening on {host}:{server.server_address[1]} (pid {os.getpid()}, token {server.token_file})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+# --- client ---
+
+class DaemonClient:
+    def __init__(self, host: str = DAEMON_HOST, port: int = DAEMON_PORT, timeout: float = 600.0,
+                 token_file: Optional[str] = None):
+        self.url = f"http://{host}:{port}"
+        self.timeout = timeout
+        self.token_file = token_file or token_path(port)
+
+    def call(self, method: str, **params) -> Any:
+        reply = self._post("/call", {"method": method, "params": params}, self.timeout)
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error"))
+        return reply.get("result")
+
+    def available(self) -> bool:
+        """A daemon answers with our token (False when no token file is readable)."""
+        if read_token(self.token_file) is None:
+            return False
+        try:
+            return bool(self._post("/call", {"method": "ping", "params": {}}, 0.5).get("ok"))
+        except (OSError, ValueError):
+            return False
+
+    def shutdown(self) -> None:
+        self._post("/shutdown", {}, self.timeout)
+
+    def _post(self, path: str, obj: dict, timeout: float) -> dict:
+        req = urllib.request.Request(
+            self.url + path, data=json.dumps(obj).encode("utf-8"),
+            headers={"Content-Type": "application/json", TOKEN_HEADER: read_token(self.token_file) or ""},
+            method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            # Refusals (403/415) and unknown paths still carry a JSON {"ok": false, "error"} body
+            with e:
+                return json.loads(e.read().decode("utf-8"))
+
+_LOCAL: Optional[EngineService] = None
+
+def get_local_service() -> EngineService:
+    global _LOCAL
+    if _LOCAL is None:
+        _LOCAL = EngineService()
+    return _LOCAL
+
+def call(method: str, **params) -> Any:
+    """Run a service method on the daemon when it is up, otherwise in this process."""
+    if os.environ.get("NT_DAEMON") != "0":
+        client = DaemonClient(os.environ.get("NT_DAEMON_HOST", DAEMON_HOST), int(os.environ.get("NT_DAEMON_PORT", DAEMON_PORT)))
+        if client.available():
+            return client.call(method, **params)
+    return get_local_service().dispatch(method, params)
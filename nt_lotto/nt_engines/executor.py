@@ -0,0 +1,139 @@
+from __future__ import annotations
+import copy
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.frame_memo import frame_fingerprint, pinned_fingerprint
+from . import registry
+
+"""
+Engine Executor
+Role: Memoized engine DAG for the nt_engines.
+
+Composite engines ask the executor for their sub-engine scores instead of re-running them
+(the DAG is EngineSpec.deps in the registry):
+
+    NT-VPA-1 -> VPA
+    NTO      -> NT4, NT5, NT-LL, VPA, NT-VPA-1
+    NT-OMEGA -> NTO
+
+Score rows are memoized per (engine, round, params, SSOT version), where the SSOT version
+is a content hash of the draws frame, so every engine runs once per round per process.
+The hash is taken once per request and reused by the nested sub-engine requests.
+analyze() results are memoized the same way (callers get a copy).
+
+NT_ENGINE_MEMO=0 disables memoization (every request recomputes).
+"""
+
+logger = logging.getLogger("EngineExecutor")
+
+def dependencies(engine_id: str) -> List[str]:
+    """Transitive sub-engines of engine_id, dependencies first."""
+    out: List[str] = []
+    def visit(eid: str) -> None:
+        spec = registry.get_spec(eid)
+        for dep in (spec.deps if spec else ()):
+            visit(dep)
+            if dep not in out:
+                out.append(dep)
+    visit(engine_id.upper())
+    return out
+
+class EngineExecutor:
+    def __init__(self, max_rows: int = 100_000, max_results: int = 2_048):
+        self.max_rows = max_rows
+        self.max_results = max_results
+        self._rows: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._results: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.computed: Dict[str, int] = {}   # engine -> rounds scored (memo misses)
+
+    def scores(self, engine_id: str, draws: pd.DataFrame, rounds: Sequence[int], **params) -> np.ndarray:
+        """(R,45) float64 score_batch rows of engine_id, computing only the rounds not memoized yet."""
+        with pinned_fingerprint(draws):
+            return self._scores(engine_id, draws, rounds, **params)
+
+    def analyze(self, engine_id: str, df_sorted: pd.DataFrame, round_r: int, **kwargs) -> Any:
+        """engine_id's analyze(df_sorted, round_r, **kwargs), memoized; returns a copy."""
+        with pinned_fingerprint(df_sorted):
+            return self._analyze(engine_id, df_sorted, round_r, **kwargs)
+
+    def _scores(self, engine_id: str, draws: pd.DataFrame, rounds: Sequence[int], **params) -> np.ndarray:
+        eid = engine_id.upper()
+        rounds = [int(r) for r in np.atleast_1d(rounds)]
+        version, pkey = frame_version(draws), params_key(params)
+        keys = [(eid, r, pkey, version) for r in rounds]
+        missing = sorted({r for r, k in zip(rounds, keys) if k not in self._rows})
+        if missing:
+            if not params:
+                # Sub-engines first, so the composite's own requests are memo hits
+                # (a failing sub-engine is only logged: the composite requests it again and
+                # applies its own policy, e.g. NTO leaves it out)
+                for dep in dependencies(eid):
+                    try:
+                        self.scores(dep, draws, missing)
+                    except Exception as e:
+                        logger.warning(f"{eid}: sub-engine {dep} failed: {type(e).__name__}: {e}")
+            S = registry.get_score_batch(eid)(draws, missing, dtype=np.float64, **params)
+            self.computed[eid] = self.computed.get(eid, 0) + len(missing)
+            fresh = dict(zip(missing, S))
+            if self.max_rows <= 0:
+                return np.stack([fresh[r] for r in rounds]) if rounds else np.zeros((0, 45))
+            for r, row in fresh.items():
+                self._put(self._rows, (eid, r, pkey, version), row, self.max_rows)
+        out = np.zeros((len(rounds), 45), dtype=float)
+        for i, k in enumerate(keys):
+            out[i] = self._rows[k]
+            self._rows.move_to_end(k)
+        return out
+
+    def _analyze(self, engine_id: str, df_sorted: pd.DataFrame, round_r: int, **kwargs) -> Any:
+        eid = engine_id.upper()
+        key = (eid, int(round_r), params_key(kwargs), frame_version(df_sorted))
+        hit = self._results.get(key)
+        if hit is None:
+            hit = registry.get_analyze(eid)(df_sorted, round_r, **kwargs)
+            if self.max_results <= 0:
+                return hit
+            self._put(self._results, key, hit, self.max_results)
+        else:
+            self._results.move_to_end(key)
+        return copy.deepcopy(hit)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._results.clear()
+        self.computed.clear()
+
+    @staticmethod
+    def _put(memo: OrderedDict, key: tuple, value: Any, limit: int) -> None:
+        memo[key] = value
+        memo.move_to_end(key)
+        while len(memo) > limit:
+            memo.popitem(last=False)
+
+_DEFAULT: Optional[EngineExecutor] = None
+
+def get_executor() -> EngineExecutor:
+    """Process-wide executor used by the composite engines and the scripts."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        if os.environ.get("NT_ENGINE_MEMO") == "0":
+            _DEFAULT = EngineExecutor(max_rows=0, max_results=0)
+        else:
+            _DEFAULT = EngineExecutor()
+    return _DEFAULT
+
+def set_executor(executor: Optional[EngineExecutor]) -> None:
+    global _DEFAULT
+    _DEFAULT = executor
+
+def params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Content hash of a draws frame (values, columns and row order)."""
+    return frame_fingerprint(df)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from nt_lotto.nt_core.window_index import WindowIndex, history_index, positional_number_cols
+from .batch import batch_scores, minmax_rows, rank_order, tail_counts
 
 """
 NT4 Standard Engine
@@ -9,6 +11,17 @@ Input: ssot_sorted.csv
 Output: TopK(20) candidates
 """
 
+W_G, W_R, W_T = 0.5, 0.3, 0.2
+
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """
+    (R,45) NT4 scores for every round in rounds (history = draws with round < r).
+    kwargs w_g / w_r / w_t override the module weights (parameter sweeps).
+    """
+    weights = (kwargs.get('w_g', W_G), kwargs.get('w_r', W_R), kwargs.get('w_t', W_T))
+    kernel = lambda widx, ends: _scores(widx, ends, weights)
+    return batch_scores(draws, rounds, kernel, positional_number_cols(draws)).astype(dtype, copy=False)
+
 def analyze(df_sorted: pd.DataFrame, target_round: int) -> list[int]:
     """
     NT4 Analysis Logic
@@ -24,53 +37,33 @@ def analyze(df_sorted: pd.DataFrame, target_round: int) -> list[int]:
     
     Trend is defined as: (Freq Last 30) - (Freq Previous 30)
     """
-    # 1. Filter Data (Use only past data)
-    history = df_sorted[df_sorted['round'] < target_round]
+    # 1. Filter Data (Use only past data): rows [0, end) of the prefix index
+    # Columns are the ones iloc[:, 1:7] selects (SSOT Sorted: round, n1..n6, bonus)
+    widx, end = history_index(df_sorted, target_round, positional_number_cols(df_sorted))
     
-    if history.empty:
+    if end == 0:
         return []
 
-    # 2. Extract Features
-    # 2.1 Calculate Frequencies
-    def get_freq(data, rounds=None):
-        if rounds:
-            data = data.tail(rounds)
-        # Using columns n1..n6 (indices 1 to 6 usually, check SSOT structure)
-        # SSOT Sorted columns: round, n1, n2, n3, n4, n5, n6, bonus
-        vals = data.iloc[:, 1:7].values.flatten()
-        return pd.Series(vals).value_counts().reindex(range(1, 46), fill_value=0)
-
-    global_freq = get_freq(history)
-    recent_freq = get_freq(history, 30)
+    # 2-4. Frequencies, Min-Max normalization and weighted score
+    final_score = _scores(widx, np.array([end]))[0]
     
-    # Previous 30 for Trend
-    prev_30_data = history.iloc[-60:-30] if len(history) >= 60 else pd.DataFrame()
-    prev_freq = get_freq(prev_30_data) if not prev_30_data.empty else pd.Series(0, index=range(1, 46))
+    # 5. Deterministic Sort (Score DESC, Number ASC)
+    order = rank_order(final_score)
     
-    trend = recent_freq - prev_freq
-
-    # 3. Normalize (Min-Max Scaling to 0-1)
-    def normalize(s):
-        if s.max() == s.min():
-            return s * 0.0
-        return (s - s.min()) / (s.max() - s.min())
+    # 6. Select Top 20
+    return (order[:20] + 1).tolist()
 
-    norm_g = normalize(global_freq)
-    norm_r = normalize(recent_freq)
-    norm_t = normalize(trend)
-    
-    # 4. Compute Score
-    # Weights
-    W_G, W_R, W_T = 0.5, 0.3, 0.2
+def _scores(widx: WindowIndex, ends: np.ndarray, weights=None) -> np.ndarray:
+    """(R,45) float64 scores for history rows [0, ends[i]); weights = (w_g, w_r, w_t)."""
+    w_g, w_r, w_t = (W_G, W_R, W_T) if weights is None else weights
+    # Frequencies (cumulative-count differences)
+    global_freq = widx.cum[ends] - widx.cum[0]
+    recent_freq = tail_counts(widx, ends, 30)
     
-    final_score = (W_G * norm_g) + (W_R * norm_r) + (W_T * norm_t)
-    
-    # 5. Deterministic Sort (Score DESC, Number ASC)
-    # Create DataFrame for sorting
-    scores = pd.DataFrame({'score': final_score})
-    scores['number'] = scores.index
-    
-    scores = scores.sort_values(by=['score', 'number'], ascending=[False, True])
+    # Previous 30 for Trend (zero until 60 rows of history)
+    prev_freq = widx.cum[np.maximum(ends - 30, 0)] - widx.cum[np.maximum(ends - 60, 0)]
+    prev_freq[ends < 60] = 0
+    trend = recent_freq - prev_freq
     
-    # 6. Select Top 20
-    return scores.head(20)['number'].tolist()
+    # Normalize (Min-Max Scaling to 0-1, all-zero when flat)
+    return w_g * minmax_rows(global_freq) + w_r * minmax_rows(recent_freq) + w_t * minmax_rows(trend)
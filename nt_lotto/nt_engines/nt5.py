@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from nt_lotto.nt_core.window_index import WindowIndex, history_index, positional_number_cols
+from .batch import batch_scores, minmax_rows, rank_order, tail_counts
 
 """
 NT5 Cluster Engine
@@ -9,6 +11,20 @@ Input: ssot_sorted.csv
 Output: TopK(20) candidates
 """
 
+A1, A2, A3 = 0.30, 0.20, 0.15
+A4, A5 = 0.20, 0.15
+A6 = 0.10 # Penalty
+
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """
+    (R,45) NT5 scores for every round in rounds (history = draws with round < r).
+    kwargs a1..a6 override the module coefficients (parameter sweeps).
+    """
+    coeffs = (kwargs.get('a1', A1), kwargs.get('a2', A2), kwargs.get('a3', A3),
+              kwargs.get('a4', A4), kwargs.get('a5', A5), kwargs.get('a6', A6))
+    kernel = lambda widx, ends: _scores(widx, ends, coeffs)
+    return batch_scores(draws, rounds, kernel, positional_number_cols(draws)).astype(dtype, copy=False)
+
 def analyze(df_sorted: pd.DataFrame, target_round: int) -> list[int]:
     """
     NT5 Analysis Logic
@@ -25,71 +41,35 @@ def analyze(df_sorted: pd.DataFrame, target_round: int) -> list[int]:
     
     Tie-break: Score DESC, Number ASC
     """
-    # 1. Filter Data (Use only past data)
-    history = df_sorted[df_sorted['round'] < target_round]
+    # 1. Filter Data (Use only past data): rows [0, end) of the prefix index
+    # Columns are the ones iloc[:, 1:7] selects
+    widx, end = history_index(df_sorted, target_round, positional_number_cols(df_sorted))
     
-    if history.empty:
+    if end == 0:
         return []
 
-    # Helper to clean and reindex (1-45 counts)
-    def get_counts(data, rounds=None):
-        if rounds:
-            data = data.tail(rounds)
-        vals = data.iloc[:, 1:7].values.flatten()
-        return pd.Series(vals).value_counts().reindex(range(1, 46), fill_value=0)
-
-    # 2. Extract Features
-    # 2.1 Hot Windows
-    hot30 = get_counts(history, 30)
-    hot50 = get_counts(history, 50)
-    hot100 = get_counts(history, 100)
+    # 2-4. Hot windows, recency indicators and weighted score
+    final_score = _scores(widx, np.array([end]))[0]
     
-    # 2.2 Recency Indicators
-    # R5
-    r5_data = history.tail(5)
-    r5_vals = set(r5_data.iloc[:, 1:7].values.flatten())
-    i_r5 = pd.Series([1.0 if n in r5_vals else 0.0 for n in range(1, 46)], index=range(1, 46))
+    # 5. Deterministic Sort (Score DESC, Number ASC)
+    order = rank_order(final_score)
     
-    # R10
-    r10_data = history.tail(10)
-    r10_vals = set(r10_data.iloc[:, 1:7].values.flatten())
-    i_r10 = pd.Series([1.0 if n in r10_vals else 0.0 for n in range(1, 46)], index=range(1, 46))
-
-    # R1 (Last Round only)
-    r1_data = history.tail(1)
-    if not r1_data.empty:
-        r1_vals = set(r1_data.iloc[:, 1:7].values.flatten())
-        i_r1 = pd.Series([1.0 if n in r1_vals else 0.0 for n in range(1, 46)], index=range(1, 46))
-    else:
-        i_r1 = pd.Series(0.0, index=range(1, 46))
-
-    # 3. Normalize (MinMax)
-    def normalize(s):
-        if s.max() == s.min():
-            return s * 0.0
-        return (s - s.min()) / (s.max() - s.min())
+    # 6. Select Top 20
+    return (order[:20] + 1).tolist()
 
-    norm_h30 = normalize(hot30)
-    norm_h50 = normalize(hot50)
-    norm_h100 = normalize(hot100)
-    
-    # Recency indicators are already 0.0 or 1.0, so normalization is identity if mixed, or 0 if all 0.
-    # Strictly speaking they are binary, so they are inherently normalized in 0-1 scale.
+def _scores(widx: WindowIndex, ends: np.ndarray, coeffs=None) -> np.ndarray:
+    """(R,45) float64 scores for history rows [0, ends[i]); coeffs = (a1, ..., a6)."""
+    a1, a2, a3, a4, a5, a6 = (A1, A2, A3, A4, A5, A6) if coeffs is None else coeffs
+    # Hot Windows (1-45 counts), MinMax normalized (all-zero when flat)
+    norm_h30 = minmax_rows(tail_counts(widx, ends, 30))
+    norm_h50 = minmax_rows(tail_counts(widx, ends, 50))
+    norm_h100 = minmax_rows(tail_counts(widx, ends, 100))
     
-    # 4. Compute Score
-    # Weights
-    A1, A2, A3 = 0.30, 0.20, 0.15
-    A4, A5 = 0.20, 0.15
-    A6 = 0.10 # Penalty
+    # Recency indicators are binary, so they are inherently normalized in 0-1 scale.
+    i_r5 = (tail_counts(widx, ends, 5) > 0).astype(float)
+    i_r10 = (tail_counts(widx, ends, 10) > 0).astype(float)
+    i_r1 = (tail_counts(widx, ends, 1) > 0).astype(float)
     
-    final_score = (A1 * norm_h30) + (A2 * norm_h50) + (A3 * norm_h100) + \
-                  (A4 * i_r5) + (A5 * i_r10) - (A6 * i_r1)
-                  
-    # 5. Deterministic Sort
-    scores = pd.DataFrame({'score': final_score})
-    scores['number'] = scores.index
-    scores = scores.sort_values(by=['score', 'number'], ascending=[False, True])
-    
-    # 6. Select Top 20
-    return scores.head(20)['number'].tolist()
+    return (a1 * norm_h30) + (a2 * norm_h50) + (a3 * norm_h100) + \
+           (a4 * i_r5) + (a5 * i_r10) - (a6 * i_r1)
 
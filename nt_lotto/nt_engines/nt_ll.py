@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from nt_lotto.nt_core.window_index import WindowIndex, history_index, positional_number_cols
+from .batch import batch_scores, minmax_rows, tail_counts
 
 """
 NT-LL Local Deviation Correction Engine
@@ -13,6 +15,15 @@ B_UNDER = 1.0
 B_OVER = 0.8
 W_SIZE = 20
 
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """
+    (R,45) NT-LL scores for every round in rounds (history = draws with round < r).
+    kwargs b_under / b_over / w_size override the module constants (parameter sweeps).
+    """
+    params = (kwargs.get('b_under', B_UNDER), kwargs.get('b_over', B_OVER), int(kwargs.get('w_size', W_SIZE)))
+    kernel = lambda widx, ends: _components(widx, ends, params)[0]
+    return batch_scores(draws, rounds, kernel, positional_number_cols(draws)).astype(dtype, copy=False)
+
 def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs) -> dict:
     """
     NT-LL (Local Linear / Low-Lag Adjustment)
@@ -24,65 +35,30 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
     score(n) = b_under * max(-dev(n), 0) - b_over * max(dev(n), 0)
     """
     
-    # 1. Look-ahead Prevention
-    df_past = df_sorted[df_sorted['round'] < round_r].copy()
-    if not df_past.empty:
-        assert df_past['round'].max() < round_r, "Look-ahead detected in NT-LL window slicing"
+    # 1. Look-ahead Prevention: rows [0, end) of the prefix index are round < round_r
+    widx, end = history_index(df_sorted, round_r, positional_number_cols(df_sorted))
+    if end > 0:
+        assert widx.rounds[:end].max() < round_r, "Look-ahead detected in NT-LL window slicing"
         
-    if df_past.empty:
+    if end == 0:
         return {
             "engine": "NT-LL", "round": round_r, "k_eval": k_eval,
             "params": {"W": W_SIZE, "b_under": B_UNDER, "b_over": B_OVER},
             "scores": [], "topk": []
         }
 
-    # 2. Get counts (Numbers 1-45)
-    def get_counts(df):
-        vals = df.iloc[:, 1:7].values.flatten()
-        return pd.Series(vals).value_counts().reindex(range(1, 46), fill_value=0)
-
-    count_g = get_counts(df_past)
-    recent_window = df_past.tail(W_SIZE)
-    count_r = get_counts(recent_window)
-    
-    total_g = len(df_past)
-    total_r = len(recent_window)
-    
-    # 3. Laplace Smoothing
-    fg = (count_g + 1) / (6 * total_g + 45)
-    fr = (count_r + 1) / (6 * total_r + 45)
-    
-    # 4. Normalization (MinMax)
-    def normalize(s):
-        s_min, s_max = s.min(), s.max()
-        if s_max - s_min < 1e-12:
-            return pd.Series(0.5, index=s.index)
-        return (s - s_min) / (s_max - s_min + 1e-12)
-    
-    norm_g = normalize(fg)
-    norm_r = normalize(fr)
-    
-    # 5. Deviation and Score
-    dev = norm_r - norm_g
-    
-    scores_raw = {}
-    for n in range(1, 46):
-        d = dev[n]
-        if d < 0:
-            s = B_UNDER * (-d)
-        else:
-            s = -B_OVER * d
-        scores_raw[n] = float(s)
+    # 2-5. Smoothed frequencies, deviation and score
+    scores, dev, fr, fg = (a[0] for a in _components(widx, np.array([end])))
         
     # 6. Final Result Construction
     results = []
     for n in range(1, 46):
         results.append({
             "n": n,
-            "score": scores_raw[n],
-            "dev": float(dev[n]),
-            "f_recent": float(fr[n]),
-            "f_prev": float(fg[n]) # 'f_prev' as used in spec for global/prior
+            "score": float(scores[n - 1]),
+            "dev": float(dev[n - 1]),
+            "f_recent": float(fr[n - 1]),
+            "f_prev": float(fg[n - 1]) # 'f_prev' as used in spec for global/prior
         })
     
     # Tie-break: Score DESC, Number ASC
@@ -100,3 +76,26 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
         "topk": topk
     }
 
+def _components(widx: WindowIndex, ends: np.ndarray, params=None):
+    """
+    (score, dev, f_recent, f_global), each (R,45) float64, for history rows [0, ends[i]);
+    params = (b_under, b_over, w_size).
+    """
+    b_under, b_over, w_size = (B_UNDER, B_OVER, W_SIZE) if params is None else params
+    # Counts (Numbers 1-45, columns iloc[:, 1:7] selects)
+    count_g = widx.cum[ends] - widx.cum[0]
+    count_r = tail_counts(widx, ends, w_size)
+    
+    total_g = ends[:, None]
+    total_r = np.minimum(w_size, ends)[:, None]
+    
+    # Laplace Smoothing
+    fg = (count_g + 1) / (6 * total_g + 45)
+    fr = (count_r + 1) / (6 * total_r + 45)
+    
+    # Normalization (MinMax, 0.5 when flat) and Deviation
+    dev = minmax_rows(fr, tol=1e-12, flat=0.5, eps=1e-12) - minmax_rows(fg, tol=1e-12, flat=0.5, eps=1e-12)
+    
+    # Under-represented numbers gain, over-represented ones are shrunk
+    score = np.where(dev < 0, b_under * (-dev), -b_over * dev)
+    return score, dev, fr, fg
@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
+from nt_lotto.nt_core.window_index import SORTED_COLS
+from .batch import batch_scores, tail_counts
+from .executor import get_executor
+from . import nto
 
 """
 NT-Omega (NT-Ω) Engine
@@ -7,56 +12,35 @@ Role: Final Portfolio Selection Score Engine
 * Strictly outputs Score Map & TopK (K_pool=22). No combinations generated here.
 """
 
-def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, k_pool: int = 22, **kwargs) -> Dict[str, Any]:
+MOMENTUM_WINDOW = 10
+MOMENTUM_LAMBDA = 0.15
+
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """(R,45) NT-Omega scores for every round in rounds (history = draws with round < r)."""
+    return _components(draws, rounds, **kwargs)[0].astype(dtype, copy=False)
+
+def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, k_pool: int = 22, evidence: bool = True, **kwargs) -> Dict[str, Any]:
     # NT-Omega uses NTO as its base for integration
-    from .nto import analyze as analyze_nto
     
-    # Run NTO to get the meta score
-    nto_result = analyze_nto(df_sorted, round_r, k_eval=45, **kwargs)
-    
-    # 1. Base Score Map
-    if not nto_result.get('scores'):
+    # 1. Base Score Map (NTO meta score; no history -> fallback)
+    if not (df_sorted['round'] < round_r).any():
         return {
             "engine": "NT-OMEGA", "round": round_r, "k_eval": k_eval,
             "params": {}, "scores": [], "topk": [], "metrics": {"status": "fallback"}
         }
         
-    base_scores = {item['n']: item['score'] for item in nto_result['scores']}
-    
     # 2. Omega specific adjustments (e.g., historical hits momentum)
     # Omega must NOT just pass through NTO if it's purely a selector, to avoid 100% Jaccard overlap.
     # Add an independent short-term momentum factor (last 10 rounds frequency).
+    omega, base, adj = (a[0] for a in _components(df_sorted, [round_r], **kwargs))
     
-    df_past = df_sorted[df_sorted['round'] < round_r].tail(10)
-    freq_map = {1:0} # Fallback
-    if not df_past.empty:
-        vals = df_past[['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values.flatten()
-        freq_map = pd.Series(vals).value_counts().to_dict()
-        
-    f_max = max(freq_map.values()) if freq_map else 1.0
-    f_max = f_max if f_max > 0 else 1.0
-    
-    omega_scores = {}
-    evidence_map = {}
-    
-    for n in range(1, 46):
-        b_score = float(base_scores.get(n, 0.0))
-        freq = freq_map.get(n, 0.0)
-        norm_freq = freq / f_max
-        
-        # Apply lambda factor to momentum (e.g., 0.15)
-        adj = 0.15 * norm_freq
-        omega_scores[n] = b_score + adj
-        evidence_map[n] = f"NTO Base({b_score:.3f}) + Momentum({adj:.3f})"
-        
     # 3. Format Output
     results = []
     for n in range(1, 46):
-        results.append({
-            "n": n,
-            "score": omega_scores[n],
-            "evidence": [evidence_map[n]]
-        })
+        item = {"n": n, "score": float(omega[n - 1])}
+        if evidence:
+            item["evidence"] = [f"NTO Base({float(base[n - 1]):.3f}) + Momentum({adj[n - 1]:.3f})"]
+        results.append(item)
         
     results.sort(key=lambda x: (-x['score'], x['n']))
     
@@ -69,8 +53,21 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, k_pool:
         "round": round_r,
         "k_eval": k_eval,
         "k_pool": k_pool,
-        "params": nto_result.get('params', {}),
+        "params": {"engine_weights": kwargs.get('engine_weights', nto.default_engine_weights())},
         "scores": results,
         "topk": topk_pool,
         "metrics": {"note": "Omega selection active. K_pool=22 returned."}
     }
+
+def _components(draws: pd.DataFrame, rounds, **kwargs):
+    """(omega, nto_base, momentum), each (R,45) float64."""
+    base = get_executor().scores("NTO", draws, rounds, **kwargs)
+    
+    # Momentum: last-10 frequency relative to the most frequent number
+    freq = batch_scores(draws, rounds, lambda widx, ends: tail_counts(widx, ends, MOMENTUM_WINDOW), SORTED_COLS)
+    f_max = freq.max(axis=1, keepdims=True)
+    f_max = np.where(f_max > 0, f_max, 1.0)
+    
+    # Apply lambda factor to momentum (e.g., 0.15)
+    adj = MOMENTUM_LAMBDA * (freq / f_max)
+    return base + adj, base, adj
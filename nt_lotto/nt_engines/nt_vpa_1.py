@@ -1,57 +1,45 @@
 import pandas as pd
+import numpy as np
 from typing import Dict, Any
+from nt_lotto.nt_core.window_index import WindowIndex, history_index, SORTED_COLS
+from .batch import batch_scores, minmax_rows, tail_counts
+from .executor import get_executor
+from . import vpa
 
 """
 NT-VPA-1 Engine
 Role: Hybrid of VPA pattern aggregation + NT-LL local deviation shrinkage
 """
 
-def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs) -> Dict[str, Any]:
-    # 1. Base VPA Score
-    from .vpa import analyze as analyze_vpa
-    
-    # Exclude lookahead before calling VPA? 
-    # VPA itself has lookahead prevention, but let's pass the same df
-    df_past = df_sorted[df_sorted['round'] < round_r].copy()
-    if df_past.empty:
+W_SIZE = 20
+
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """(R,45) NT-VPA-1 scores for every round in rounds (history = draws with round < r)."""
+    alpha = kwargs.get('alpha', 0.5)
+    vpa_scores = get_executor().scores("VPA", draws, rounds, **vpa.score_params(kwargs))
+    dev = batch_scores(draws, rounds, _deviation)
+    return (vpa_scores - alpha * np.maximum(0.0, dev)).astype(dtype, copy=False)
+
+def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, evidence: bool = True, **kwargs) -> Dict[str, Any]:
+    # rows [0, end) of the prefix index are df_sorted[round < round_r]
+    widx, end = history_index(df_sorted, round_r, SORTED_COLS)
+    if end == 0:
         return {
             "engine": "NT-VPA-1", "round": round_r, "k_eval": k_eval,
             "params": {"alpha": 0.5}, "scores": [], "topk": []
         }
         
-    vpa_result = analyze_vpa(df_past, round_r, k_eval=k_eval, **kwargs)
+    # 1. Base VPA Score (VPA applies the same round < round_r filter)
+    vpa_result = get_executor().analyze("VPA", df_sorted, round_r, evidence=evidence, **vpa.score_params(kwargs))
     if not vpa_result['scores']:
         return vpa_result # fallback
         
     vpa_scores = {item['n']: item for item in vpa_result['scores']}
     
-    # 2. NT-LL Local Deviation (W=20)
-    w_size = 20
+    # 2. NT-LL Local Deviation (W=20), positive means overheated locally
+    w_size = W_SIZE
     alpha = kwargs.get('alpha', 0.5)
-    
-    def get_counts(df):
-        vals = df[['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values.flatten()
-        return pd.Series(vals).value_counts().reindex(range(1, 46), fill_value=0)
-
-    count_g = get_counts(df_past)
-    recent_window = df_past.tail(w_size)
-    count_r = get_counts(recent_window)
-    
-    total_g = max(len(df_past), 1)
-    total_r = max(len(recent_window), 1)
-    
-    fg = (count_g + 1) / (6 * total_g + 45)
-    fr = (count_r + 1) / (6 * total_r + 45)
-    
-    def normalize(s):
-        s_min, s_max = s.min(), s.max()
-        if s_max - s_min < 1e-12:
-            return pd.Series(0.5, index=s.index)
-        return (s - s_min) / (s_max - s_min + 1e-12)
-        
-    norm_g = normalize(fg)
-    norm_r = normalize(fr)
-    dev = norm_r - norm_g # positive means overheated locally
+    dev = _deviation(widx, np.array([end]))[0]
     
     # 3. Shrinkage & Stability
     final_results = []
@@ -59,7 +47,7 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
     for n in range(1, 46):
         base_item = vpa_scores[n]
         v_score = base_item['score']
-        d = dev[n]
+        d = dev[n - 1]
         
         # Shrinkage: penalize if recently overheated
         penalty = alpha * max(0.0, float(d))
@@ -68,16 +56,13 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
         # Stability: smaller absolute deviation -> more stable
         stability = 1.0 - abs(float(d))
         
-        evidence = list(base_item['evidence'])
-        if penalty > 0:
-            evidence.append(f"Penalty -{penalty:.3f} due to local over-frequency (+dev)")
+        item = {"n": n, "score": new_score, "stability": stability}
+        if evidence:
+            item["evidence"] = list(base_item['evidence'])
+            if penalty > 0:
+                item["evidence"].append(f"Penalty -{penalty:.3f} due to local over-frequency (+dev)")
             
-        final_results.append({
-            "n": n,
-            "score": new_score,
-            "stability": stability,
-            "evidence": evidence
-        })
+        final_results.append(item)
         
     # 4. Sort and TopK
     final_results.sort(key=lambda x: (-x['score'], x['n']))
@@ -91,3 +76,15 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
         "scores": final_results,
         "topk": topk
     }
+
+def _deviation(widx: WindowIndex, ends: np.ndarray) -> np.ndarray:
+    """(R,45) norm(f_recent) - norm(f_global) over history rows [0, ends[i]), W = W_SIZE."""
+    count_g = widx.cum[ends] - widx.cum[0]
+    count_r = tail_counts(widx, ends, W_SIZE)
+    
+    total_g = np.maximum(ends, 1)[:, None]
+    total_r = np.maximum(np.minimum(W_SIZE, ends), 1)[:, None]
+    
+    fg = (count_g + 1) / (6 * total_g + 45)
+    fr = (count_r + 1) / (6 * total_r + 45)
+    return minmax_rows(fr, tol=1e-12, flat=0.5, eps=1e-12) - minmax_rows(fg, tol=1e-12, flat=0.5, eps=1e-12)
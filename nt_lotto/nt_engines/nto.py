@@ -1,73 +1,58 @@
+import numpy as np
 import pandas as pd
 from nt_lotto.nt_engines import registry
+from .executor import get_executor
 from typing import Dict, Any, List
-import copy
 
 """
 NTO (Integrative Meta Optimizer)
 Role: Meta scoring aggregation based on existing engines.
 """
 
-def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs) -> Dict[str, Any]:
-    # NTO uses active implementations
-    # Target active engines
-    active_engine_names = ["NT4", "NT5", "NT-LL", "VPA", "NT-VPA-1"]
-    
-    engine_score_maps = {}
-    
-    # To prevent circular imports or huge overhead, we dynamically import the exact functions
-    import importlib
-    
-    df_past = df_sorted[df_sorted['round'] < round_r].copy()
-    if df_past.empty:
-         return {"engine": "NTO", "round": round_r, "topk": [], "scores": []}
-         
-    for en_name in active_engine_names:
-        mod_name = en_name.lower().replace("-", "_")
+# NTO uses active implementations
+ACTIVE_ENGINES = ["NT4", "NT5", "NT-LL", "VPA", "NT-VPA-1"]
+
+def default_engine_weights() -> Dict[str, float]:
+    return {"NT4": 1.0, "NT5": 1.0, "NT-LL": 1.0, "VPA": 1.0, "NT-VPA-1": 1.0}
+
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """(R,45) NTO meta scores for every round in rounds (history = draws with round < r)."""
+    weights = kwargs.get('engine_weights', default_engine_weights())
+    rounds = np.atleast_1d(rounds)
+    return _meta_scores(engine_scores(draws, rounds), weights, len(rounds)).astype(dtype, copy=False)
+
+def engine_scores(draws: pd.DataFrame, rounds) -> Dict[str, np.ndarray]:
+    """
+    {engine: (R,45) float64 scores} for the active engines NTO aggregates, in ACTIVE_ENGINES order.
+    Ranked engines (NT4/NT5: analyze() returns a plain Top-20 list without k_eval) are left out,
+    as is an engine whose scoring fails.
+    Scores come from the memoized executor, so sub-engines already run this process are reused.
+    """
+    out = {}
+    for en_name in ACTIVE_ENGINES:
         try:
-            mod = importlib.import_module(f"nt_lotto.nt_engines.{mod_name}")
-            result = mod.analyze(df_past, round_r, k_eval=k_eval)
-            if isinstance(result, dict) and 'scores' in result:
-                # Expecting score list of dicts: [{'n': 1, 'score': 0.8}, ...]
-                s_map = {item['n']: item['score'] for item in result['scores']}
-                engine_score_maps[en_name] = s_map
-            elif isinstance(result, list):
-                # Rank-based score for stub/list outputs (e.g., NT4, NT5)
-                s_map = {n: float(len(result) - i) / len(result) for i, n in enumerate(result)}
-                engine_score_maps[en_name] = s_map
-        except Exception as e:
+            if registry.get_spec(en_name).ranked:
+                continue
+            out[en_name] = get_executor().scores(en_name, draws, rounds)
+        except Exception:
             pass
+    return out
 
-    # 2. Score Aggregation (Weighted Sum)
-    weights = kwargs.get('engine_weights', {
-        "NT4": 1.0, "NT5": 1.0, "NT-LL": 1.0, "VPA": 1.0, "NT-VPA-1": 1.0
-    })
-    
-    meta_scores = {n: 0.0 for n in range(1, 46)}
-    
-    for en, smap in engine_score_maps.items():
-        w = weights.get(en, 0.0)
-        if w == 0: continue
-        
-        # Optional Calibration (MinMax)
-        vals = list(smap.values())
-        if not vals: continue
-        vmin, vmax = min(vals), max(vals)
-        
-        for n in range(1, 46):
-            raw = smap.get(n, 0.5)
-            # z-score or minmax
-            norm = (raw - vmin) / (vmax - vmin + 1e-9)
-            meta_scores[n] += w * norm
+def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, evidence: bool = True, **kwargs) -> Dict[str, Any]:
+    if not (df_sorted['round'] < round_r).any():
+         return {"engine": "NTO", "round": round_r, "topk": [], "scores": []}
+         
+    # 1. Engine scores, 2. Score Aggregation (Weighted Sum of MinMax-calibrated scores)
+    weights = kwargs.get('engine_weights', default_engine_weights())
+    meta_scores = _meta_scores(engine_scores(df_sorted, [round_r]), weights, 1)[0]
             
     # 3. Format Output
     results = []
     for n in range(1, 46):
-        results.append({
-            "n": n,
-            "score": meta_scores[n],
-            "evidence": ["NTO Aggregation"]
-        })
+        item = {"n": n, "score": float(meta_scores[n - 1])}
+        if evidence:
+            item["evidence"] = ["NTO Aggregation"]
+        results.append(item)
         
     results.sort(key=lambda x: (-x['score'], x['n']))
     topk = [r['n'] for r in results[:k_eval]]
@@ -81,3 +66,15 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
         "topk": topk,
         "engine_contributions": "Available in detailed metrics" # stub per contract
     }
+
+def _meta_scores(scores: Dict[str, np.ndarray], weights: Dict[str, float], n_rounds: int) -> np.ndarray:
+    meta_scores = np.zeros((n_rounds, 45), dtype=float)
+    for en, s in scores.items():
+        w = weights.get(en, 0.0)
+        if w == 0: continue
+        
+        # Optional Calibration (MinMax)
+        vmin = s.min(axis=1, keepdims=True)
+        vmax = s.max(axis=1, keepdims=True)
+        meta_scores += w * ((s - vmin) / (vmax - vmin + 1e-9))
+    return meta_scores
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .executor import get_executor, params_key
+
+"""
+Parallel Engine Runner
+Role: Fan engine scoring over a process pool.
+
+The draws frame is published once in multiprocessing.shared_memory (numeric columns as one
+float64 block); every worker rebuilds the same frame from it in its initializer, so tasks
+only carry (engine ids, round block, params). A task scores all requested engines for its
+block, so composite engines reuse their sub-engines through the worker's executor memo.
+Blocks are merged by position: the output is round-ordered and identical to serial scoring
+for any worker count.
+
+workers <= 1 scores in-process (no pool, no shared memory). NT_WORKERS sets the default.
+map() runs any module-level fn(draws, *task) on the same pool (e.g. parameter sweeps).
+"""
+
+DEFAULT_BLOCK = 64
+
+def default_workers() -> int:
+    try:
+        return max(1, int(os.environ.get("NT_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+class ParallelRunner:
+    def __init__(self, draws: pd.DataFrame, workers: Optional[int] = None, block: int = DEFAULT_BLOCK):
+        self.draws = draws
+        self.workers = default_workers() if workers is None else max(1, int(workers))
+        self.block = max(1, int(block))
+        self.errors: Dict[str, str] = {}
+        # (engine, params key, round) -> (45,) scores
+        self._rows: Dict[Tuple[str, str, int], np.ndarray] = {}
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParallelRunner":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def scores(self, engine_ids: Sequence[str], rounds: Sequence[int], **params) -> Dict[str, np.ndarray]:
+        """
+        {engine: (R,45) float64 scores in rounds order} for every engine that scored all its
+        blocks; failures are recorded in self.errors and the engine is left out.
+        Rows are kept for the runner's lifetime, so a batched call can prefetch what later
+        per-engine calls read.
+        """
+        engine_ids = [e.upper() for e in engine_ids]
+        rounds = [int(r) for r in np.atleast_1d(rounds)]
+        pkey = params_key(params)
+        todo = [e for e in engine_ids if any((e, pkey, r) not in self._rows for r in rounds)]
+        failed = set()
+        if todo:
+            need = list(dict.fromkeys(r for r in rounds if any((e, pkey, r) not in self._rows for e in todo)))
+            if self.workers <= 1:
+                tasks = [(todo, need)]
+                parts = [_score_block(self.draws, todo, need, params)]
+            else:
+                pool = self._ensure_pool()
+                tasks = self._tasks(todo, need)
+                futures = [pool.submit(_run_block, group, block, params) for group, block in tasks]
+                parts = [f.result() for f in futures]
+            for (group, block), part in zip(tasks, parts):
+                for eid in group:
+                    S = part[eid]
+                    if isinstance(S, str):
+                        self.errors[eid] = S
+                        failed.add(eid)
+                        continue
+                    for r, row in zip(block, S):
+                        self._rows[(eid, pkey, r)] = row
+
+        return {
+            eid: np.array([self._rows[(eid, pkey, r)] for r in rounds], dtype=np.float64).reshape(len(rounds), 45)
+            for eid in engine_ids if eid not in failed
+        }
+
+    def map(self, fn: Callable[..., Any], tasks: Sequence[tuple]) -> List[Any]:
+        """
+        [fn(draws, *task) for task in tasks], in task order. With workers > 1 the tasks run on
+        the pool against the worker's shared-memory frame (fn must be picklable).
+        """
+        if self.workers <= 1:
+            return [fn(self.draws, *task) for task in tasks]
+        pool = self._ensure_pool()
+        futures = [pool.submit(_run_task, fn, tuple(task)) for task in tasks]
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+
+    # ---------------------------------------------------------------------------
+
+    def _tasks(self, engine_ids: List[str], rounds: List[int]) -> List[Tuple[List[str], List[int]]]:
+        """
+        (engines, round block) tasks in round order. Blocks hold at most self.block rounds and
+        there is at least one per worker; when there are fewer blocks than workers (a few rounds),
+        each engine gets its own task instead.
+        """
+        size = min(self.block, -(-len(rounds) // self.workers))
+        blocks = [rounds[i:i + size] for i in range(0, len(rounds), size)]
+        if len(blocks) >= self.workers:
+            return [(engine_ids, b) for b in blocks]
+        return [([eid], b) for b in blocks for eid in engine_ids]
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            values, layout = _frame_layout(self.draws)
+            self._shm = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=self._shm.buf)[:] = values
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self._shm.name, values.shape, layout))
+        return self._pool
+
+def _score_block(draws: pd.DataFrame, engine_ids: List[str], rounds: List[int], params: dict) -> Dict[str, object]:
+    """{engine: (B,45) scores, or the error message when it failed}."""
+    out: Dict[str, object] = {}
+    for eid in engine_ids:
+        try:
+            out[eid] = get_executor().scores(eid, draws, rounds, **params)
+        except Exception as e:
+            out[eid] = f"{type(e).__name__}: {e}"
+    return out
+
+# --- shared-memory frame (columns, dtypes and order are preserved) ---
+
+Layout = List[Tuple[str, str]]   # (column, numpy dtype str or "" for non-numeric)
+
+def _frame_layout(df: pd.DataFrame) -> Tuple[np.ndarray, Layout]:
+    layout: Layout = []
+    numeric = []
+    for c in df.columns:
+        if pd.api.types.is_numeric_dtype(df[c]):
+            layout.append((c, df[c].dtype.str))
+            numeric.append(df[c].to_numpy(dtype=np.float64))
+        else:
+            # Only the dtype of non-numeric columns matters to the engines (positional columns)
+            layout.append((c, ""))
+    values = np.column_stack(numeric) if numeric else np.zeros((len(df), 0))
+    return np.ascontiguousarray(values), layout
+
+def _frame_from(values: np.ndarray, layout: Layout) -> pd.DataFrame:
+    data = {}
+    j = 0
+    for c, dtype in layout:
+        if dtype:
+            data[c] = values[:, j].astype(np.dtype(dtype))
+            j += 1
+        else:
+            data[c] = np.full(len(values), "", dtype=object)
+    return pd.DataFrame(data, columns=[c for c, _ in layout])
+
+_WORKER_DRAWS: Optional[pd.DataFrame] = None
+
+def _init_worker(name: str, shape: Tuple[int, int], layout: Layout) -> None:
+    global _WORKER_DRAWS
+    # Pool workers share the parent's resource tracker; the parent unlinks the segment in close()
+    shm = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _WORKER_DRAWS = _frame_from(values, layout)
+    shm.close()
+
+def _run_block(engine_ids: List[str], rounds: List[int], params: dict) -> Dict[str, object]:
+    return _score_block(_WORKER_DRAWS, engine_ids, rounds, params)
+
+def _run_task(fn: Callable[..., Any], task: tuple) -> Any:
+    return fn(_WORKER_DRAWS, *task)
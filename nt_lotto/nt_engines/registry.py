@@ -1,32 +1,99 @@
-from .base import EngineBase, StubEngine
-from typing import List
+from __future__ import annotations
+import importlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from .base import AnalyzeEngine, EngineBase, StubEngine
+
+"""
+Engine Registry
+Role: Single declarative table of the 14 engines; every script dispatches through it.
+
+Each EngineSpec names the module (under nt_lotto.nt_engines) and entry point of an engine
+instead of importing it: modules are imported on first use and resolved once per process,
+so a script only loads the engines it runs. Adding an engine means adding one spec here.
+
+    required_ssot  "sorted" | "ordered" | "both"
+    features       nt_core.schema.FEATURE_GROUPS the engine reads (own scoring only)
+    batch          module has score_batch(draws, rounds) -> (R,45)
+    deps           sub-engines whose scores the engine combines (executor DAG)
+    ranked         analyze() returns a plain Top-20 list instead of a result dict
+"""
+
+@dataclass(frozen=True)
+class EngineSpec:
+    engine_id: str                   # canonical id (upper case)
+    name: str                        # display name used in plans/reports
+    module: Optional[str] = None     # None: no implementation (StubEngine)
+    entry: str = "analyze"
+    required_ssot: str = "sorted"
+    features: Tuple[str, ...] = ()
+    batch: bool = False
+    deps: Tuple[str, ...] = ()
+    ranked: bool = False
+
+ENGINE_SPECS: Tuple[EngineSpec, ...] = (
+    EngineSpec("NT4", "NT4", "nt4", features=("num",), batch=True, ranked=True),
+    EngineSpec("NT-OMEGA", "NT-Omega", "nt_omega", batch=True, deps=("NTO",)),
+    EngineSpec("NT5", "NT5", "nt5", features=("num",), batch=True, ranked=True),
+    EngineSpec("NTO", "NTO", "nto", batch=True, deps=("NT4", "NT5", "NT-LL", "VPA", "NT-VPA-1")),
+    EngineSpec("NT-LL", "NT-LL", "nt_ll", features=("num",), batch=True),
+    EngineSpec("VPA", "VPA", "vpa", features=("num", "pair", "shape"), batch=True),
+    EngineSpec("NT-VPA-1", "NT-VPA-1", "nt_vpa_1", features=("num",), batch=True, deps=("VPA",)),
+    EngineSpec("AL1", "AL1", "al_engines", "analyze_al1", required_ssot="both", features=("order",)),
+    EngineSpec("AL2", "AL2", "al_engines", "analyze_al2", required_ssot="both", features=("order",)),
+    EngineSpec("ALX", "ALX", "al_engines", "analyze_alx", required_ssot="both", features=("order",)),
+    EngineSpec("NT-EXP", "NT-EXP", "diagnostic_stubs", "analyze_exp"),
+    EngineSpec("NT-DPP", "NT-DPP", "diagnostic_stubs", "analyze_dpp"),
+    EngineSpec("NT-HCE", "NT-HCE", "diagnostic_stubs", "analyze_hce"),
+    EngineSpec("NT-PAT", "NT-PAT", "diagnostic_stubs", "analyze_pat"),
+)
+
+ENGINES: Dict[str, EngineSpec] = {s.engine_id: s for s in ENGINE_SPECS}
 
 # Fixed list of engines
-ENGINE_IDS = [
-    "NT4", "NT-OMEGA", "NT5", "NTO", "NT-LL", "VPA", "NT-VPA-1", 
-    "AL1", "AL2", "ALX", "NT-EXP", "NT-DPP", "NT-HCE", "NT-PAT"
-]
+ENGINE_IDS = list(ENGINES)
+# Engines exposing score_batch(draws, rounds) -> (R,45) scores
+BATCH_ENGINES = [s.engine_id for s in ENGINE_SPECS if s.batch]
+
+_MODULES: Dict[str, object] = {}
+
+def get_spec(engine_id: str) -> Optional[EngineSpec]:
+    """Spec of an engine (ids and display names are case-insensitive), None if unknown."""
+    return ENGINES.get(engine_id.upper())
+
+def get_module(engine_id: str):
+    """Engine module (imported on first use), None if the engine has no implementation."""
+    spec = get_spec(engine_id)
+    if spec is None or spec.module is None:
+        return None
+    mod = _MODULES.get(spec.module)
+    if mod is None:
+        mod = importlib.import_module(f"nt_lotto.nt_engines.{spec.module}")
+        _MODULES[spec.module] = mod
+    return mod
+
+def get_analyze(engine_id: str) -> Optional[Callable]:
+    """analyze(df_sorted, round_r, **kwargs) of an engine, None if it has no implementation."""
+    mod = get_module(engine_id)
+    return None if mod is None else getattr(mod, get_spec(engine_id).entry)
+
+def get_score_batch(engine_id: str) -> Optional[Callable]:
+    """score_batch of an engine, None if it has no batch entry point."""
+    spec = get_spec(engine_id)
+    if spec is None or not spec.batch:
+        return None
+    return get_module(engine_id).score_batch
 
 def get_engines() -> List[EngineBase]:
     """
     Factory to return all registered engines.
-    Currently returns Stubs for most.
+    Batch engines are wrapped as AnalyzeEngine (Top-K of the round after the training data),
+    the rest are StubEngines.
     """
-    engines = []
-    
-    # TODO: Replace Stubs with actual implementations as they are ported
-    for eid in ENGINE_IDS:
-        # AL series might need ordered data
-        req_ssot = "both" if eid.startswith("AL") else "sorted"
-        
-        # Instantiate actual engine if available
-        if eid == "NT-LL":
-            # Duck-typing or wrapper if necessary, but for now we follow analyze() interface in scripts
-            # In a real OO system, we'd wrap it in an Engine class.
-            from .nt_ll import analyze as analyze_ll
-            # For registry consistency, we might keep it as a partial or callable
-            engines.append(analyze_ll) 
+    engines: List[EngineBase] = []
+    for spec in ENGINE_SPECS:
+        if spec.batch:
+            engines.append(AnalyzeEngine(spec.engine_id, required_ssot=spec.required_ssot))
         else:
-            engines.append(StubEngine(eid, required_ssot=req_ssot))
-        
+            engines.append(StubEngine(spec.engine_id, required_ssot=spec.required_ssot))
     return engines
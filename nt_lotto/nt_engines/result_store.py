@@ -0,0 +1,401 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.constants import RESULT_STORE_DIR
+from nt_lotto.nt_core.frame_memo import FrameMemo
+from . import registry
+from .batch import rank_order, N_NUMBERS
+from .executor import dependencies, get_executor, params_key
+from .parallel import ParallelRunner
+
+"""
+Engine Result Store
+Role: Content-addressed on-disk store of engine score rows, shared by every script.
+
+One record per (engine, round):
+    key      sha256 of (engine id, engine code hash, params, round, SSOT hash)
+    scores   float32 (45,)   score_batch row
+    order    int8 (45,)      numbers by score DESC, number ASC (from the float64 scores,
+                             so top-K = order[:K] matches analyze() exactly)
+    history  int32           draws with round < r the scores were computed from
+
+The code hash covers the engine module, its sub-engines, the shared batch/index code and the
+registry/executor that compose them; the SSOT hash only covers the draws with round < r, so
+appending a new draw keeps every earlier round valid.
+
+Layout: root/<engine>/<group>/ per (engine, code hash, params), holding meta.json and
+append-only segment files seg-*.npy (one per write batch). Segments are read memory-mapped;
+prune() drops stale groups and old segments and compacts the rest into one segment.
+
+NT_RESULT_STORE=0 disables the store; NT_RESULT_STORE_DIR moves it.
+"""
+
+RESULT_STORE_VERSION = 1
+
+RECORD_DTYPE = np.dtype([
+    ("key", "S64"),
+    ("round", "<i4"),
+    ("history", "<i4"),
+    ("scores", "<f4", (N_NUMBERS,)),
+    ("order", "i1", (N_NUMBERS,)),
+])
+
+# Shared code every engine's scores depend on (registry: EngineSpec ranked/deps; executor:
+# composite engines' sub-engine composition)
+_COMMON_MODULES = (
+    "nt_lotto.nt_engines.batch",
+    "nt_lotto.nt_core.window_index",
+    "nt_lotto.nt_engines.registry",
+    "nt_lotto.nt_engines.executor",
+)
+_CODE_HASHES: Dict[str, str] = {}
+
+def code_hash(engine_id: str) -> str:
+    """sha256 over the source of the engine, its sub-engines and the shared scoring code."""
+    eid = engine_id.upper()
+    hit = _CODE_HASHES.get(eid)
+    if hit is not None:
+        return hit
+    h = hashlib.sha256()
+    modules = [registry.get_module(e).__name__ for e in dependencies(eid) + [eid]] + list(_COMMON_MODULES)
+    for name in modules:
+        __import__(name)
+        with open(sys.modules[name].__file__, "rb") as f:
+            h.update(name.encode("utf-8") + b"\0" + f.read())
+    _CODE_HASHES[eid] = h.hexdigest()
+    return _CODE_HASHES[eid]
+
+class StoredResults:
+    """(R,45) scores / order and (R,) history for the requested rounds."""
+    def __init__(self, rounds: np.ndarray, scores: np.ndarray, order: np.ndarray, history: np.ndarray):
+        self.rounds = rounds
+        self.scores = scores
+        self.order = order
+        self.history = history
+
+    def topk(self, i: int, k: int) -> List[int]:
+        """Top-k numbers of row i, [] when the round had no history (as analyze returns)."""
+        if self.history[i] == 0:
+            return []
+        return self.order[i, :k].astype(int).tolist()
+
+class ResultStore:
+    def __init__(self, root: Optional[str] = RESULT_STORE_DIR):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        # group dir -> (segment names, {key: (records, row)})
+        self._index: Dict[str, Tuple[frozenset, Dict[bytes, Tuple[np.ndarray, int]]]] = {}
+
+    def group(self, engine_id: str, params: dict) -> str:
+        """Directory name of the (engine, code hash, params) group."""
+        parts = {"v": RESULT_STORE_VERSION, "engine": engine_id.upper(), "code": code_hash(engine_id), "params": params_key(params)}
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def key(self, engine_id: str, params: dict, round_r: int, ssot_hash: str) -> bytes:
+        parts = {
+            "v": RESULT_STORE_VERSION,
+            "engine": engine_id.upper(),
+            "code": code_hash(engine_id),
+            "params": params_key(params),
+            "round": int(round_r),
+            "ssot": ssot_hash,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest().encode("ascii")
+
+    def results(self, engine_id: str, draws: pd.DataFrame, rounds: Sequence[int],
+                runner: Optional[ParallelRunner] = None, **params) -> StoredResults:
+        """
+        Stored rows for rounds; missing ones are scored through the executor (or fanned out over
+        runner's process pool) and written.
+        """
+        eid = engine_id.upper()
+        rounds = np.asarray(np.atleast_1d(rounds), dtype=np.int64)
+        hashes, history = history_hashes(draws, rounds)
+        keys = [self.key(eid, params, r, h) for r, h in zip(rounds.tolist(), hashes)]
+        R = len(rounds)
+        scores = np.zeros((R, N_NUMBERS), dtype=np.float32)
+        order = np.zeros((R, N_NUMBERS), dtype=np.int8)
+
+        gdir = self._group_dir(eid, params)
+        index = self._load_index(gdir) if gdir else {}
+        missing = []
+        for i, key in enumerate(keys):
+            hit = index.get(key)
+            if hit is None:
+                missing.append(i)
+                continue
+            recs, row = hit
+            scores[i] = recs["scores"][row]
+            order[i] = recs["order"][row]
+        self.hits += R - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            if runner is not None and runner.workers > 1:
+                S = runner.scores([eid], rounds[missing], **params).get(eid)
+                if S is None:
+                    raise RuntimeError(f"{eid} failed in a worker: {runner.errors.get(eid)}")
+            else:
+                S = get_executor().scores(eid, draws, rounds[missing], **params)
+            recs = np.zeros(len(missing), dtype=RECORD_DTYPE)
+            recs["key"] = [keys[i] for i in missing]
+            recs["round"] = rounds[missing]
+            recs["history"] = history[missing]
+            recs["scores"] = S
+            recs["order"] = rank_order(S) + 1
+            scores[missing] = recs["scores"]
+            order[missing] = recs["order"]
+            if gdir:
+                self._write_segment(gdir, eid, params, recs)
+        return StoredResults(rounds, scores, order, history)
+
+    def warm(self, engine_ids: Iterable[str], draws: pd.DataFrame, rounds: Sequence[int],
+             workers: int = 1, **params) -> Dict[str, int]:
+        """
+        Compute and store every engine/round pair not stored yet; returns the newly stored rows
+        per engine. workers > 1 scores the missing rounds on a process pool.
+        """
+        out = {}
+        with ParallelRunner(draws, workers=workers) as runner:
+            for eid in engine_ids:
+                before = self.misses
+                self.results(eid, draws, rounds, runner=runner, **params)
+                out[eid.upper()] = self.misses - before
+        return out
+
+    def prune(self, max_bytes: Optional[int] = None, older_than: Optional[float] = None, stale: bool = True) -> int:
+        """
+        Remove groups whose engine code changed (stale) and segments last used more than
+        older_than seconds ago, compact every group into one segment, then drop the least
+        recently used groups until max_bytes fits. Returns the number of records removed.
+        """
+        removed = 0
+        now = time.time()
+        kept = []
+        for gdir, engine in self._groups():
+            meta = _read_json(os.path.join(gdir, "meta.json"))
+            if stale and (meta is None or meta.get("code") != code_hash(engine)):
+                removed += self._drop_group(gdir)
+                continue
+            segs = self._segments(gdir)
+            fresh = []
+            for path, mtime, _ in segs:
+                if older_than is not None and now - mtime > older_than:
+                    removed += _records_in(path)
+                    _remove(path)
+                else:
+                    fresh.append(path)
+            removed += self._compact(gdir, fresh)
+            segs = self._segments(gdir)
+            if segs:
+                kept.append((gdir, max(m for _, m, _ in segs), sum(size for _, _, size in segs)))
+            else:
+                self._drop_group(gdir)
+        if max_bytes is not None:
+            total = sum(size for _, _, size in kept)
+            for gdir, _, size in sorted(kept, key=lambda g: g[1]):
+                if total <= max_bytes:
+                    break
+                removed += self._drop_group(gdir)
+                total -= size
+        return removed
+
+    def clear(self) -> None:
+        for gdir, _ in self._groups():
+            self._drop_group(gdir)
+
+    # ---------------------------------------------------------------------------
+
+    def _group_dir(self, engine_id: str, params: dict) -> Optional[str]:
+        if not self.root:
+            return None
+        return os.path.join(self.root, engine_id, self.group(engine_id, params))
+
+    def _groups(self):
+        """(group dir, engine id) of every group on disk."""
+        if not self.root or not os.path.isdir(self.root):
+            return []
+        out = []
+        for eng in os.scandir(self.root):
+            if not eng.is_dir() or registry.get_module(eng.name) is None:
+                continue
+            for g in os.scandir(eng.path):
+                if g.is_dir():
+                    out.append((g.path, eng.name))
+        return out
+
+    def _segments(self, gdir: str):
+        """(path, mtime, size) of the group's segments, oldest first."""
+        out = []
+        if os.path.isdir(gdir):
+            for f in os.scandir(gdir):
+                if f.name.startswith("seg-") and f.name.endswith(".npy") and ".tmp" not in f.name:
+                    st = f.stat()
+                    out.append((f.path, st.st_mtime, st.st_size))
+        return sorted(out, key=lambda s: (s[1], s[0]))
+
+    def _load_index(self, gdir: str) -> Dict[bytes, Tuple[np.ndarray, int]]:
+        segs = self._segments(gdir)
+        names = frozenset(p for p, _, _ in segs)
+        memo = self._index.get(gdir)
+        if memo is not None and memo[0] == names:
+            index = memo[1]
+        else:
+            index = dict(memo[1]) if memo is not None and memo[0] <= names else {}
+            loaded = memo[0] if memo is not None and memo[0] <= names else frozenset()
+            for path, _, _ in segs:
+                if path in loaded:
+                    continue
+                recs = _open_segment(path)
+                if recs is None:
+                    continue
+                for row, key in enumerate(recs["key"].tolist()):
+                    index[key] = (recs, row)
+            self._index[gdir] = (names, index)
+        for path, _, _ in segs:
+            _touch(path)
+        return index
+
+    def _write_segment(self, gdir: str, engine_id: str, params: dict, recs: np.ndarray) -> None:
+        try:
+            os.makedirs(gdir, exist_ok=True)
+            meta_path = os.path.join(gdir, "meta.json")
+            if not os.path.exists(meta_path):
+                meta = {"engine": engine_id, "code": code_hash(engine_id), "params": params_key(params)}
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+            path = os.path.join(gdir, f"seg-{time.time_ns()}-{os.getpid()}.npy")
+            tmp = path + ".tmp.npy"
+            np.save(tmp, recs, allow_pickle=False)
+            os.replace(tmp, path)
+        except OSError:
+            return
+
+    def _compact(self, gdir: str, paths: List[str]) -> int:
+        """Merge segments into one (latest record per key wins); returns duplicates dropped."""
+        if len(paths) < 2:
+            return 0
+        parts = [r for r in (_open_segment(p) for p in paths) if r is not None]
+        if not parts:
+            return 0
+        recs = np.concatenate(parts)
+        del parts  # release the memory maps before the files are removed
+        self._index.pop(gdir, None)
+        # keep the last occurrence of every key
+        _, first_rev = np.unique(recs["key"][::-1], return_index=True)
+        keep = np.sort(len(recs) - 1 - first_rev)
+        merged = recs[keep]
+        path = os.path.join(gdir, f"seg-{time.time_ns()}-{os.getpid()}.npy")
+        try:
+            np.save(path + ".tmp.npy", merged, allow_pickle=False)
+            os.replace(path + ".tmp.npy", path)
+        except OSError:
+            return 0
+        for p in paths:
+            _remove(p)
+        return len(recs) - len(merged)
+
+    def _drop_group(self, gdir: str) -> int:
+        self._index.pop(gdir, None)
+        removed = 0
+        for path, _, _ in self._segments(gdir):
+            removed += _records_in(path)
+        for f in os.scandir(gdir):
+            _remove(f.path)
+        try:
+            os.rmdir(gdir)
+        except OSError:
+            pass
+        return removed
+
+def _open_segment(path: str) -> Optional[np.ndarray]:
+    try:
+        recs = np.load(path, mmap_mode="r", allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    return recs if recs.dtype == RECORD_DTYPE and recs.ndim == 1 else None
+
+def _records_in(path: str) -> int:
+    recs = _open_segment(path)
+    return 0 if recs is None else len(recs)
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
+
+_DEFAULT: Optional[ResultStore] = None
+_DEFAULT_INIT = False
+
+def get_result_store() -> Optional[ResultStore]:
+    """Process-wide store used by the scripts (None when disabled)."""
+    global _DEFAULT, _DEFAULT_INIT
+    if not _DEFAULT_INIT:
+        _DEFAULT_INIT = True
+        if os.environ.get("NT_RESULT_STORE") != "0":
+            _DEFAULT = ResultStore(root=os.environ.get("NT_RESULT_STORE_DIR", RESULT_STORE_DIR))
+    return _DEFAULT
+
+def set_result_store(store: Optional[ResultStore]) -> None:
+    global _DEFAULT, _DEFAULT_INIT
+    _DEFAULT, _DEFAULT_INIT = store, True
+
+def engine_results(engine_id: str, draws: pd.DataFrame, rounds: Sequence[int],
+                   runner: Optional[ParallelRunner] = None, **params) -> StoredResults:
+    """Results through the process-wide store, or straight from the executor when it is disabled."""
+    store = get_result_store()
+    if store is None:
+        store = ResultStore(root=None)
+    return store.results(engine_id, draws, rounds, runner=runner, **params)
+
+# Prefix hash chains of recent draws frames
+_CHAINS = FrameMemo(maxsize=8)
+
+def history_hashes(draws: pd.DataFrame, rounds: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """
+    (hash, n_rows) of the history of each round: the draws with round < r in frame order.
+    Hashes chain over rows, so a history that is a prefix of a longer frame hashes the same.
+    """
+    r = draws["round"].to_numpy()
+    if len(r) < 2 or np.all(r[1:] >= r[:-1]):
+        chain = _CHAINS.get([draws], lambda: _chain_hashes(draws))
+        ends = np.searchsorted(r, rounds, side="left")
+        return [chain[e] for e in ends], ends.astype(np.int32)
+    out, n = [], []
+    for t in rounds.tolist():
+        history = draws[draws["round"] < t]
+        out.append(_chain_hashes(history)[-1])
+        n.append(len(history))
+    return out, np.asarray(n, dtype=np.int32)
+
+def _chain_hashes(draws: pd.DataFrame) -> List[str]:
+    """sha256 chain over rows: out[t] = hash of rows [0, t) (values and column names)."""
+    rows = pd.util.hash_pandas_object(draws, index=False).to_numpy()
+    h = hashlib.sha256(b"EngineResults/1" + json.dumps([str(c) for c in draws.columns]).encode("utf-8")).digest()
+    out = [h.hex()]
+    for v in rows.tolist():
+        h = hashlib.sha256(h + int(v).to_bytes(8, "little")).digest()
+        out.append(h.hex())
+    return out
@@ -0,0 +1,191 @@
+from __future__ import annotations
+import itertools
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.backtest import topk_masks
+from nt_lotto.nt_core.window_index import SORTED_COLS
+from . import registry
+from .parallel import ParallelRunner
+
+"""
+Engine Parameter Sweep
+Role: Rank engine constant configurations by walk-forward Recall@K.
+
+A grid {param: [values]} expands to every combination. A configuration is scored through the
+engine's score_batch(draws, rounds, **params) (the constants it overrides are listed in
+SWEEP_PARAMS), so all configurations share the draws' prefix index and the executor's
+memoized sub-engine scores; round r is scored from the draws before r and judged against
+the draw of r.
+
+Successive halving (eta): every configuration is first scored on an evenly spaced subset of
+the rounds, anchored at the latest round; the best 1/eta move on to a rung with eta times as
+many rounds (each subset contains the previous one, so scored rounds are kept), and the
+survivors of the last rung are scored on every round. Configurations are scored in
+chunks on a ParallelRunner pool when workers > 1; the result does not depend on workers.
+"""
+
+# score_batch kwargs overriding each engine's constants (the defaults stay in the engine modules:
+# nt_ll B_UNDER/B_OVER/W_SIZE, nt4 W_G/W_R/W_T, nt5 A1..A6, vpa DEFAULT_WINDOW_SET /
+# DEFAULT_FEATURE_WEIGHTS, nt_vpa_1 alpha 0.5, nto default_engine_weights())
+SWEEP_PARAMS: Dict[str, Tuple[str, ...]] = {
+    "NT-LL": ("b_under", "b_over", "w_size"),
+    "NT4": ("w_g", "w_r", "w_t"),
+    "NT5": ("a1", "a2", "a3", "a4", "a5", "a6"),
+    "VPA": ("window_set", "feature_weights"),
+    "NT-VPA-1": ("alpha",),
+    "NTO": ("engine_weights",),
+}
+
+# Grids used when the caller does not pass one
+DEFAULT_GRIDS: Dict[str, Dict[str, list]] = {
+    "NT-LL": {"b_under": [0.6, 0.8, 1.0, 1.2], "b_over": [0.4, 0.6, 0.8, 1.0], "w_size": [10, 15, 20, 30]},
+    "NT4": {"w_g": [0.3, 0.4, 0.5, 0.6], "w_r": [0.1, 0.2, 0.3, 0.4], "w_t": [0.0, 0.1, 0.2, 0.3]},
+    "NT5": {"a1": [0.2, 0.3, 0.4], "a2": [0.1, 0.2, 0.3], "a3": [0.1, 0.15, 0.2],
+            "a4": [0.1, 0.2, 0.3], "a5": [0.1, 0.15, 0.2], "a6": [0.0, 0.1, 0.2]},
+    "VPA": {"window_set": [[3, 5, 10, 20], [5, 10, 20], [10, 20, 30]]},
+    "NT-VPA-1": {"alpha": [0.0, 0.25, 0.5, 0.75, 1.0, 1.5]},
+    "NTO": {"engine_weights": [
+        {"NT4": 1.0, "NT5": 1.0, "NT-LL": 1.0, "VPA": 1.0, "NT-VPA-1": 1.0},
+        {"NT4": 1.0, "NT5": 1.0, "NT-LL": 0.5, "VPA": 1.5, "NT-VPA-1": 1.5},
+        {"NT4": 1.0, "NT5": 1.0, "NT-LL": 1.5, "VPA": 0.5, "NT-VPA-1": 0.5},
+    ]},
+}
+
+# Configurations per pool task
+SWEEP_CHUNK = 16
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the grid values, in grid key order (the last key varies fastest)."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(list(grid[k]) for k in keys))]
+
+def check_params(engine_id: str, configs: Sequence[Dict[str, Any]]) -> None:
+    """ValueError for an engine without sweepable constants or an unknown parameter."""
+    known = SWEEP_PARAMS.get(engine_id.upper())
+    if known is None:
+        raise ValueError(f"Engine {engine_id} has no sweepable parameters (one of {sorted(SWEEP_PARAMS)})")
+    for params in configs:
+        unknown = sorted(set(params) - set(known))
+        if unknown:
+            raise ValueError(f"Unknown {engine_id} parameters: {unknown} (expected {sorted(known)})")
+
+def draw_truth(draws: pd.DataFrame, rounds: Sequence[int]) -> np.ndarray:
+    """(R,45) bool winning numbers of rounds; KeyError if a round has no draw."""
+    frame = draws.drop_duplicates("round").set_index("round")
+    missing = sorted(set(int(r) for r in rounds) - set(frame.index.tolist()))
+    if missing:
+        raise KeyError(f"Rounds without a draw: {missing[:5]}")
+    nums = frame.loc[list(rounds), SORTED_COLS].to_numpy(dtype=np.int64)
+    truth = np.zeros((len(rounds), 45), dtype=bool)
+    truth[np.repeat(np.arange(len(rounds)), 6), nums.ravel() - 1] = True
+    return truth
+
+def config_hits(draws: pd.DataFrame, engine_id: str, configs: Sequence[Dict[str, Any]], rounds: Sequence[int], k: int) -> np.ndarray:
+    """(C,R) |Top-k ∩ Win| of every configuration on every round (walk-forward)."""
+    rounds = [int(r) for r in rounds]
+    truth = draw_truth(draws, rounds)
+    score_batch = registry.get_score_batch(engine_id)
+    out = np.zeros((len(configs), len(rounds)), dtype=np.int64)
+    for c, params in enumerate(configs):
+        S = score_batch(draws, rounds, dtype=np.float64, **params)
+        out[c] = (topk_masks(S, k) & truth).sum(axis=1)
+    return out
+
+def fold_stats(hits: np.ndarray, folds: int) -> Dict[str, np.ndarray]:
+    """
+    Per-configuration recall (hits / 6) of (C,R) hits: mean, (C,folds) means of contiguous
+    round folds, and their minimum and std.
+    """
+    recall = hits / 6.0
+    parts = [p for p in np.array_split(np.arange(recall.shape[1]), max(1, int(folds))) if len(p)]
+    fold_means = np.stack([recall[:, p].mean(axis=1) for p in parts], axis=1)
+    return {
+        "recall": recall.mean(axis=1),
+        "folds": fold_means,
+        "fold_min": fold_means.min(axis=1),
+        "fold_std": fold_means.std(axis=1),
+    }
+
+def rung_rounds(rounds: Sequence[int], n_rungs: int, eta: int) -> List[List[int]]:
+    """
+    Round subsets of the rungs: rung s takes every eta^(n_rungs-1-s)-th round counted back from
+    the latest one, so each subset contains the previous one and the last rung is every round.
+    """
+    rounds = sorted(int(r) for r in rounds)
+    out = []
+    for s in range(n_rungs):
+        stride = eta ** (n_rungs - 1 - s)
+        out.append(rounds[::-1][::stride][::-1])
+    return out
+
+def successive_halving(engine_id: str, draws: pd.DataFrame, rounds: Sequence[int],
+                       configs: Sequence[Dict[str, Any]], k: int = 20, folds: int = 5, eta: int = 3,
+                       min_rounds: int = 20, workers: int = 1, chunk: int = SWEEP_CHUNK) -> pd.DataFrame:
+    """
+    Successive-halving sweep of configs over rounds. The number of rungs is limited by the
+    configurations (a rung keeps ceil(n/eta)) and by min_rounds (the first rung scores at least
+    that many rounds, unless there are fewer rounds); eta <= 1 or a single rung scores every
+    configuration on every round.
+
+    Returns one row per configuration, best first: config (index into configs), params, rung
+    (last rung reached), n_rounds, recall, recall_fold1.., fold_min, fold_std. Rows are ranked
+    by rung, then recall, then fold_min, then config index.
+    """
+    engine_id = engine_id.upper()
+    configs = [dict(c) for c in configs]
+    check_params(engine_id, configs)
+    rounds = sorted(set(int(r) for r in rounds))
+    if not configs or not rounds:
+        return pd.DataFrame()
+    eta = int(eta)
+    n_rungs = 1
+    if eta > 1:
+        n = len(configs)
+        while n > 1 and -(-len(rounds) // eta ** n_rungs) >= min_rounds:
+            n = math.ceil(n / eta)
+            n_rungs += 1
+    subsets = rung_rounds(rounds, n_rungs, eta)
+
+    # hits[c][round] of every scored (configuration, round)
+    hits: List[Dict[int, int]] = [{} for _ in configs]
+    alive = list(range(len(configs)))
+    records: Dict[int, dict] = {}
+    with ParallelRunner(draws, workers=workers) as runner:
+        for s, subset in enumerate(subsets):
+            todo = [r for r in subset if r not in hits[alive[0]]]
+            tasks = [(engine_id, [configs[c] for c in alive[i:i + chunk]], todo, k)
+                     for i in range(0, len(alive), max(1, int(chunk)))] if todo else []
+            parts = runner.map(config_hits, tasks)
+            for i, part in enumerate(parts):
+                for c, row in zip(alive[i * chunk:(i + 1) * chunk], part):
+                    hits[c].update(zip(todo, row.tolist()))
+            H = np.array([[hits[c][r] for r in subset] for c in alive], dtype=np.int64).reshape(len(alive), len(subset))
+            stats = fold_stats(H, folds)
+            for j, c in enumerate(alive):
+                records[c] = _record(c, configs[c], s, len(subset), stats, j)
+            if s < n_rungs - 1:
+                order = np.lexsort((np.array(alive), -stats["fold_min"], -stats["recall"]))
+                alive = [alive[j] for j in order[:math.ceil(len(alive) / eta)]]
+
+    rows = sorted(records.values(), key=lambda x: (-x["rung"], -x["recall"], -x["fold_min"], x["config"]))
+    return pd.DataFrame(rows)
+
+def _record(c: int, params: Dict[str, Any], rung: int, n_rounds: int, stats: Dict[str, np.ndarray], j: int) -> dict:
+    row = {"config": c, "params": params, "rung": rung, "n_rounds": n_rounds, "recall": float(stats["recall"][j])}
+    for f, v in enumerate(stats["folds"][j], 1):
+        row[f"recall_fold{f}"] = float(v)
+    row["fold_min"] = float(stats["fold_min"][j])
+    row["fold_std"] = float(stats["fold_std"][j])
+    return row
+
+def sweep(engine_id: str, draws: pd.DataFrame, rounds: Sequence[int], grid: Optional[Dict[str, Sequence[Any]]] = None,
+          **kwargs) -> pd.DataFrame:
+    """successive_halving() over expand_grid(grid) (DEFAULT_GRIDS[engine] when grid is None)."""
+    engine_id = engine_id.upper()
+    if grid is None:
+        if engine_id not in DEFAULT_GRIDS:
+            raise ValueError(f"No default grid for {engine_id} (one of {sorted(DEFAULT_GRIDS)})")
+        grid = DEFAULT_GRIDS[engine_id]
+    return successive_halving(engine_id, draws, rounds, expand_grid(grid), **kwargs)
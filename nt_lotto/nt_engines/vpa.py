@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+from nt_lotto.nt_core.window_index import WindowIndex, history_index, SORTED_COLS
+from .batch import batch_scores, minmax_rows, tail_counts, NUMBERS
+from .executor import get_executor
 
 """
 VPA (Value-Pattern Aggregation) Engine
@@ -21,166 +23,72 @@ def get_ending(n: int) -> int:
 def get_even_odd(n: int) -> str:
     return "even" if n % 2 == 0 else "odd"
 
-def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs) -> dict:
-    # default parameters
-    window_set = kwargs.get('window_set', [3, 5, 10, 20])
-    fw = kwargs.get('feature_weights', {
-        'band_dev': 0.3,
-        'ending_dev': 0.3,
-        'even_odd_dev': 0.1,
-        'pair_co_occurrence': 0.3
-    })
+DEFAULT_WINDOW_SET = [3, 5, 10, 20]
+DEFAULT_FEATURE_WEIGHTS = {
+    'band_dev': 0.3,
+    'ending_dev': 0.3,
+    'even_odd_dev': 0.1,
+    'pair_co_occurrence': 0.3
+}
+
+def _membership(groups: np.ndarray, size: int) -> np.ndarray:
+    """(45,size) 0/1 matrix: number n belongs to group groups[n-1]."""
+    m = np.zeros((45, size), dtype=np.int64)
+    m[np.arange(45), groups] = 1
+    return m
+
+BAND_OF = np.array([get_band(n) for n in NUMBERS]) - 1     # 0..4
+ENDING_OF = NUMBERS % 10                                   # 0..9
+EVEN_ODD_OF = NUMBERS % 2                                  # 0 even, 1 odd
+BAND_M = _membership(BAND_OF, 5)
+ENDING_M = _membership(ENDING_OF, 10)
+EVEN_ODD_M = _membership(EVEN_ODD_OF, 2)
+
+def score_batch(draws: pd.DataFrame, rounds, dtype=np.float32, **kwargs) -> np.ndarray:
+    """(R,45) VPA scores for every round in rounds (history = draws with round < r)."""
+    window_set, fw = _params(kwargs)
+    kernel = lambda widx, ends: _scores(widx, ends, window_set, fw)
+    return batch_scores(draws, rounds, kernel).astype(dtype, copy=False)
+
+def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, evidence: bool = True, **kwargs) -> dict:
+    window_set, fw = _params(kwargs)
     
-    df_past = df_sorted[df_sorted['round'] < round_r].copy()
-    if not df_past.empty:
-        assert df_past['round'].max() < round_r, "Look-ahead bias detected in VPA"
+    # rows [0, end) of the prefix index are df_sorted[round < round_r]
+    widx, end = history_index(df_sorted, round_r, SORTED_COLS)
+    if end > 0:
+        assert widx.rounds[:end].max() < round_r, "Look-ahead bias detected in VPA"
         
-    if df_past.empty:
+    if end == 0:
         return {
             "engine": "VPA", "round": round_r, "k_eval": k_eval,
             "params": {"window_set": window_set, "weights": fw},
             "scores": [], "topk": []
         }
 
-    total_past = len(df_past)
-    
-    # Global baselines
-    global_counts = {n: 0 for n in range(1, 46)}
-    global_bands = {1:0, 2:0, 3:0, 4:0, 5:0}
-    global_endings = {e: 0 for e in range(10)}
-    global_eo = {'even': 0, 'odd': 0}
-    
-    vals = df_past[['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values.flatten()
-    for v in vals:
-        try:
-            v_int = int(float(v))
-            if 1 <= v_int <= 45:
-                global_counts[v_int] += 1
-                global_bands[get_band(v_int)] += 1
-                global_endings[get_ending(v_int)] += 1
-                global_eo[get_even_odd(v_int)] += 1
-        except (ValueError, TypeError):
-            pass
-            
-    # Smoothing / Expected Ratios
-    def expected_ratio(count, total_count, options):
-        # Laplace
-        return (count + 1) / (total_count + options)
-
-    p_band_exp = {b: expected_ratio(global_bands[b], total_past * 6, 5) for b in global_bands}
-    p_end_exp = {e: expected_ratio(global_endings[e], total_past * 6, 10) for e in global_endings}
-    p_eo_exp = {k: expected_ratio(global_eo[k], total_past * 6, 2) for k in global_eo}
-
-    final_scores = {n: 0.0 for n in range(1, 46)}
-    evidence_map = defaultdict(list)
-    
-    # Process each window
-    # Recency decay W -> weight
-    w_sum = sum(1.0 / w for w in window_set)
-    decay = {w: (1.0 / w) / w_sum for w in window_set}
+    # Scores are shared with the composite engines through the executor memo
+    scores = get_executor().scores("VPA", df_sorted, [round_r], **score_params(kwargs))
     
+    # Evidence only needs the W=5 band and W=10 pair terms (skipped when not rendered)
+    evidence_map = {n: [] for n in range(1, 46)}
+    ends = np.array([end])
+    expected = _expected(widx, ends) if evidence else None
+    pair_prefix = _pair_prefix(widx) if evidence else None
     for w in window_set:
-        recent = df_past.tail(w)
-        if recent.empty: continue
-        
-        r_total = len(recent) * 6
-        r_vals = recent[['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values.flatten()
-        
-        r_bands = {1:0, 2:0, 3:0, 4:0, 5:0}
-        r_endings = {e: 0 for e in range(10)}
-        r_eo = {'even': 0, 'odd': 0}
-        
-        # Pair co-occurrence matrix for window
-        pair_matrix = np.zeros((46, 46))
-        for _, row in recent.iterrows():
-            nums = row[['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values
-            for i in range(len(nums)):
-                for j in range(i+1, len(nums)):
-                    try:
-                        u, v = int(float(nums[i])), int(float(nums[j]))
-                        if 1 <= u <= 45 and 1 <= v <= 45:
-                            pair_matrix[u][v] += 1
-                            pair_matrix[v][u] += 1
-                    except (ValueError, TypeError):
-                        pass
-        
-        for v in r_vals:
-            try:
-                v_int = int(float(v))
-                if 1 <= v_int <= 45:
-                    r_bands[get_band(v_int)] += 1
-                    r_endings[get_ending(v_int)] += 1
-                    r_eo[get_even_odd(v_int)] += 1
-            except (ValueError, TypeError):
-                pass
-                
-        p_band_obs = {b: expected_ratio(r_bands[b], r_total, 5) for b in r_bands}
-        p_end_obs = {e: expected_ratio(r_endings[e], r_total, 10) for e in r_endings}
-        p_eo_obs = {k: expected_ratio(r_eo[k], r_total, 2) for k in r_eo}
-        
-        # Normalize dev logic: VPA boosts numbers belonging to underrepresented patterns
-        # deviation = observed - expected. If obs < exp, dev is negative -> boost it? Or if we want trend momentum?
-        # Value-Pattern *Aggregation*: We score based on momentum (Trend riding) OR mean reversion.
-        # "최근 윈도우에서 관측되는 패턴 편차를 점수로 산출"
-        # Let's define deviation as Obs - Exp. 
-        # If mean reversion (like NT-LL): score = Exp - Obs (negative dev)
-        # However, VPA usually looks for pattern *trends* or structural imbalances.
-        # Let's say score = |Obs - Exp| to identify strong anomalies, 
-        # but to give a directional score: we reward Mean Reversion as default (Obs < Exp => positive score).
-        # We will follow the contract simply: Dev = Expected - Observed (underperforming patterns get positive score).
-        
-        dev_band = {b: p_band_exp[b] - p_band_obs[b] for b in p_band_exp}
-        dev_end = {e: p_end_exp[e] - p_end_obs[e] for e in p_end_exp}
-        dev_eo = {k: p_eo_exp[k] - p_eo_obs[k] for k in p_eo_exp}
-        
-        # MinMax norms per window to keep [0,1]
-        def norm_dict(d):
-            vmin, vmax = min(d.values()), max(d.values())
-            if vmax - vmin < 1e-9: return {k: 0.5 for k in d}
-            return {k: (v - vmin)/(vmax - vmin) for k, v in d.items()}
-            
-        n_band = norm_dict(dev_band)
-        n_end = norm_dict(dev_end)
-        n_eo = norm_dict(dev_eo)
-        
-        # Pair score: sum of co-occurrences with other numbers in this window
-        pair_scores = {n: np.sum(pair_matrix[n]) for n in range(1, 46)}
-        n_pair = norm_dict(pair_scores)
-        
-        # Combine
+        if not evidence or w not in (5, 10):
+            continue
+        n_band, _, _, n_pair = _window_terms(widx, ends, w, expected, pair_prefix)
         for n in range(1, 46):
-            b = get_band(n)
-            e = get_ending(n)
-            eo = get_even_odd(n)
-            
-            s = (fw['band_dev'] * n_band[b] + 
-                 fw['ending_dev'] * n_end[e] + 
-                 fw['even_odd_dev'] * n_eo[eo] + 
-                 fw['pair_co_occurrence'] * n_pair[n])
-            
-            final_scores[n] += decay[w] * s
-            
-            if w == 5 and n_band[b] > 0.8:
+            if w == 5 and n_band[0, n - 1] > 0.8:
                 evidence_map[n].append(f"Strong band anomaly (+dev) in W=5")
-            if w == 10 and n_pair[n] > 0.8:
+            if w == 10 and n_pair[0, n - 1] > 0.8:
                 evidence_map[n].append(f"High pair co-occurrence in W=10")
-
-    # Final normalization
-    f_min, f_max = min(final_scores.values()), max(final_scores.values())
     
     results = []
     for n in range(1, 46):
-        score_norm = 0.5
-        if f_max - f_min > 1e-9:
-            score_norm = (final_scores[n] - f_min) / (f_max - f_min)
-        
-        ev_list = evidence_map[n][:3] if evidence_map[n] else ["Average pattern fit"]
-        
-        results.append({
-            "n": n,
-            "score": float(score_norm),
-            "evidence": ev_list
-        })
+        item = {"n": n, "score": float(scores[0, n - 1])}
+        if evidence:
+            item["evidence"] = evidence_map[n][:3] if evidence_map[n] else ["Average pattern fit"]
+        results.append(item)
         
     results.sort(key=lambda x: (-x['score'], x['n']))
     topk = [r['n'] for r in results[:k_eval]]
@@ -193,3 +101,75 @@ def analyze(df_sorted: pd.DataFrame, round_r: int, *, k_eval: int = 20, **kwargs
         "scores": results,
         "topk": topk
     }
+
+def score_params(kwargs):
+    """The kwargs the VPA score reads (executor memo key)."""
+    return {k: kwargs[k] for k in ('window_set', 'feature_weights') if k in kwargs}
+
+def _params(kwargs):
+    return kwargs.get('window_set', list(DEFAULT_WINDOW_SET)), kwargs.get('feature_weights', dict(DEFAULT_FEATURE_WEIGHTS))
+
+def _pair_prefix(widx: WindowIndex) -> np.ndarray:
+    """
+    (T+1,45) cumulative pair co-occurrence row sums: over rows [a, b), prefix[b] - prefix[a]
+    = sum over the other numbers m of rounds containing both n and m.
+    """
+    onehot = np.diff(widx.cum, axis=0) > 0
+    partners = onehot * (onehot.sum(axis=1, keepdims=True) - 1)
+    out = np.zeros((len(onehot) + 1, 45), dtype=np.int64)
+    np.cumsum(partners, axis=0, out=out[1:])
+    return out
+
+def _expected(widx: WindowIndex, ends: np.ndarray):
+    """Expected band / ending / even-odd ratios of the whole history (Laplace smoothed)."""
+    total = (6 * ends)[:, None]
+    global_counts = widx.cum[ends] - widx.cum[0]
+    p_band_exp = (global_counts @ BAND_M + 1) / (total + 5)
+    p_end_exp = (global_counts @ ENDING_M + 1) / (total + 10)
+    p_eo_exp = (global_counts @ EVEN_ODD_M + 1) / (total + 2)
+    return p_band_exp, p_end_exp, p_eo_exp
+
+def _window_terms(widx: WindowIndex, ends: np.ndarray, w: int, expected, pair_prefix: np.ndarray):
+    """Per-number (R,45) band / ending / even-odd / pair terms of window w, each in [0,1]."""
+    p_band_exp, p_end_exp, p_eo_exp = expected
+    r_total = (np.minimum(w, ends) * 6)[:, None]
+    r_counts = tail_counts(widx, ends, w)
+    
+    p_band_obs = (r_counts @ BAND_M + 1) / (r_total + 5)
+    p_end_obs = (r_counts @ ENDING_M + 1) / (r_total + 10)
+    p_eo_obs = (r_counts @ EVEN_ODD_M + 1) / (r_total + 2)
+    
+    # Dev = Expected - Observed (underperforming patterns get positive score),
+    # MinMax normalized per window to keep [0,1]
+    n_band = minmax_rows(p_band_exp - p_band_obs, tol=1e-9, flat=0.5)[:, BAND_OF]
+    n_end = minmax_rows(p_end_exp - p_end_obs, tol=1e-9, flat=0.5)[:, ENDING_OF]
+    n_eo = minmax_rows(p_eo_exp - p_eo_obs, tol=1e-9, flat=0.5)[:, EVEN_ODD_OF]
+    
+    # Pair score: sum of co-occurrences with other numbers in this window
+    pair_scores = (pair_prefix[ends] - pair_prefix[np.maximum(ends - w, 0)]).astype(float)
+    n_pair = minmax_rows(pair_scores, tol=1e-9, flat=0.5)
+    return n_band, n_end, n_eo, n_pair
+
+def _scores(widx: WindowIndex, ends: np.ndarray, window_set, fw) -> np.ndarray:
+    """(R,45) float64 scores in [0,1] for history rows [0, ends[i])."""
+    expected = _expected(widx, ends)
+    
+    # Recency decay W -> weight
+    w_sum = sum(1.0 / w for w in window_set)
+    decay = {w: (1.0 / w) / w_sum for w in window_set}
+    
+    pair_prefix = _pair_prefix(widx)
+    final_scores = np.zeros((len(ends), 45), dtype=float)
+    for w in window_set:
+        n_band, n_end, n_eo, n_pair = _window_terms(widx, ends, w, expected, pair_prefix)
+        s = (fw['band_dev'] * n_band + 
+             fw['ending_dev'] * n_end + 
+             fw['even_odd_dev'] * n_eo + 
+             fw['pair_co_occurrence'] * n_pair)
+        final_scores += decay[w] * s
+
+    # Final normalization (0.5 when flat)
+    f_min = final_scores.min(axis=1, keepdims=True)
+    f_rng = final_scores.max(axis=1, keepdims=True) - f_min
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(f_rng > 1e-9, (final_scores - f_min) / f_rng, 0.5)
@@ -10,6 +10,10 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from nt_lotto.nt_core.ssot_loader import load_data
+from nt_lotto.nt_core.allocation import evaluate_plans, plan_matrix, search_plans
+from nt_lotto.nt_engines import registry
+from nt_lotto.nt_engines.parallel import ParallelRunner
+from nt_lotto.nt_engines.result_store import engine_results
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 logger = logging.getLogger("AllocationBacktest")
@@ -44,68 +48,81 @@ ALLOCATION_PLANS = {
     }
 }
 
-def get_actual_winners(df: pd.DataFrame, r: int):
-    row = df[df['round'] == r]
-    if row.empty: return set(), -1
-    cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']
-    winners = set(row.iloc[0][cols].values)
-    bonus = row.iloc[0]['bonus']
-    return winners, bonus
-
 def jaccard_index(s1: set, s2: set) -> float:
     if not s1 and not s2: return 1.0
     if not s1 or not s2: return 0.0
     return len(s1 & s2) / len(s1 | s2)
 
-def execute_engine(engine_name: str, df_cache: pd.DataFrame, target_round: int):
-    try:
-        # Avoid circular imports and heavy dependencies dynamically
-        if engine_name == "NT4":
-            from nt_lotto.nt_engines.nt4 import analyze
-            return analyze(df_cache, target_round)
-        elif engine_name == "NT5":
-            from nt_lotto.nt_engines.nt5 import analyze
-            return analyze(df_cache, target_round)
-        elif engine_name == "NT-LL":
-            from nt_lotto.nt_engines.nt_ll import analyze
-            return analyze(df_cache, target_round)
-        elif engine_name == "VPA":
-            from nt_lotto.nt_engines.vpa import analyze
-            return analyze(df_cache, target_round)
-        elif engine_name == "NT-VPA-1":
-            from nt_lotto.nt_engines.nt_vpa_1 import analyze
-            return analyze(df_cache, target_round)
-        elif engine_name == "NTO":
-            from nt_lotto.nt_engines.nto import analyze
-            return analyze(df_cache, target_round)
-        elif engine_name == "NT-Omega":
-            from nt_lotto.nt_engines.nt_omega import analyze
-            return analyze(df_cache, target_round)
-        else:
-            return {"topk": [], "scores": []}
-    except Exception as e:
-        logger.warning(f"Engine {engine_name} failed at R={target_round}: e")
+# analyze() top-k length per engine (NT-Omega returns its K_pool slice)
+TOPK_LEN = {"NT-Omega": 22}
+
+def engine_score_batches(engines, df_cache: pd.DataFrame, rounds, workers: int = 1) -> dict:
+    """
+    {engine: StoredResults for rounds} from the shared result store; failing engines are left out.
+    Rounds missing from the store are scored on `workers` processes.
+    """
+    out = {}
+    with ParallelRunner(df_cache, workers=workers) as runner:
+        for en in engines:
+            if registry.get_score_batch(en) is None:
+                continue
+            try:
+                out[en] = engine_results(en, df_cache, rounds, runner=runner)
+            except Exception as e:
+                logger.warning(f"Engine {en} failed: {e}")
+    return out
+
+def batch_result(engine_name: str, stored, i: int):
+    """The analyze() result of one round (topk / sorted scores) rebuilt from its stored row."""
+    if stored is None or stored.history[i] == 0:
         return {"topk": [], "scores": []}
+    if registry.get_spec(engine_name).ranked:
+        return stored.topk(i, 20)
+    order = stored.order[i].astype(int)
+    return {
+        "topk": stored.topk(i, TOPK_LEN.get(engine_name, 20)),
+        "scores": [{"n": int(n), "score": float(stored.scores[i, n - 1])} for n in order]
+    }
 
-def get_score_map(res, k=20):
-    if isinstance(res, dict) and "scores" in res and res["scores"]:
-        # Assume dict is [{'n': 1, 'score': 10}, ...]
-        scores = {}
-        target_len = min(k, len(res["scores"]))
-        for sc in res["scores"][:target_len]:
-            scores[sc['n']] = sc['score']
-        return scores
-    else:
-        # Fallback to topk
-        topk = res.get("topk", []) if isinstance(res, dict) else res
-        scores = {}
-        if not topk: return scores
-        for i, num in enumerate(topk[:k]):
+def engine_score_tensor(engines, stored: dict, n_rounds: int, k: int = 20) -> np.ndarray:
+    """
+    (R,E,45) score maps of the engines, each min-max normalized to 0-1 per round; 0 where an
+    engine leaves a number out.
+    A map holds the engine's Top-k scores (ranked engines: 1 - i/k by rank), rounds without
+    history or failed engines have an empty map.
+    """
+    S = np.zeros((n_rounds, len(engines), 45))
+    for e, en in enumerate(engines):
+        res = stored.get(en)
+        if res is None:
+            continue
+        top = res.order[:, :k].astype(np.int64)
+        if registry.get_spec(en).ranked:
             # rank-based normalization (1.0 to close to 0)
-            scores[num] = 1.0 - (i / k)
-        return scores
+            vals = np.broadcast_to(1.0 - np.arange(k) / k, top.shape)
+        else:
+            vals = np.take_along_axis(res.scores.astype(np.float64), top - 1, axis=1)
+        lo = vals.min(axis=1, keepdims=True)
+        span = vals.max(axis=1, keepdims=True) - lo
+        norm = np.where(span > 0, (vals - lo) / np.where(span > 0, span, 1.0), 1.0)
+        live = np.flatnonzero(res.history != 0)
+        S[live[:, None], e, top[live] - 1] = norm[live]
+    return S
+
+def actual_winners(df: pd.DataFrame, rounds):
+    """(R,) has-draw flags, (R,45) bool winning numbers and (R,) bonus numbers of rounds."""
+    cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']
+    rows = df.drop_duplicates('round').set_index('round').reindex(rounds)
+    found = rows[cols[0]].notna().to_numpy()
+    winners = np.zeros((len(rounds), 45), dtype=bool)
+    nums = rows.loc[found, cols].to_numpy(dtype=np.int64)
+    winners[np.repeat(np.flatnonzero(found), 6), nums.ravel() - 1] = True
+    bonus = np.ones(len(rounds), dtype=np.int64)
+    bonus[found] = rows.loc[found, 'bonus'].to_numpy(dtype=np.int64)
+    return found, winners, bonus
 
-def run_backtest(target_round: int, eval_n: int, k_eval: int, folds: int, out_latest: str, out_history: str):
+def run_backtest(target_round: int, eval_n: int, k_eval: int, folds: int, out_latest: str, out_history: str, workers: int = 1,
+                 search: int = 0, search_seed: int = 0):
     logger.info(f"--- STARTING ALLOCATION BACKTEST (Target: {target_round}, N={eval_n}, Folds={folds}) ---")
     start_r = target_round - eval_n
     end_r = target_round - 1
@@ -127,29 +144,19 @@ def run_backtest(target_round: int, eval_n: int, k_eval: int, folds: int, out_la
     results = {plan: [] for plan in ALLOCATION_PLANS.keys()}
     nato_overlap_stats = []
     
-    # 1. Collect predictions
-    for r in range(start_r, end_r + 1):
-        actual_win, actual_bonus = get_actual_winners(df_sorted, r)
-        if not actual_win:
-            continue
-            
-        engines_res = {}
-        score_maps = {}
-        for en in engines_needed:
-            res = execute_engine(en, df_sorted, r)
-            engines_res[en] = res
-            
-            smap = get_score_map(res, k=20)
-            
-            # Normalize score map to 0-1
-            if smap:
-                min_s = min(smap.values())
-                max_s = max(smap.values())
-                if max_s > min_s:
-                    smap = {k: (v - min_s)/(max_s - min_s) for k, v in smap.items()}
-                else:
-                    smap = {k: 1.0 for k in smap.keys()}
-            score_maps[en] = smap
+    # 1. Collect predictions (stored engine results, scored once per engine/round)
+    rounds = np.arange(start_r, end_r + 1)
+    stored = engine_score_batches(sorted(engines_needed), df_sorted, rounds, workers=workers)
+    
+    # Engine axis in the plans' key order, so portfolio scores accumulate in the same order
+    engine_axis = list(dict.fromkeys(en for w in ALLOCATION_PLANS.values() for en in w))
+    found, winners, bonus = actual_winners(df_sorted, rounds)
+    S = engine_score_tensor(engine_axis, stored, len(rounds))[found]
+    hits, bonus_hits = evaluate_plans(S, plan_matrix(ALLOCATION_PLANS, engine_axis), winners[found], bonus[found], k=k_eval)
+    
+    for i in np.flatnonzero(found).tolist():
+        r = int(rounds[i])
+        engines_res = {en: batch_result(en, stored.get(en), i) for en in ("NTO", "NT-Omega")}
 
         # NTO vs Omega Overlap
         nto_top = set(engines_res.get("NTO", {}).get("topk", [])[:k_eval]) if isinstance(engines_res.get("NTO"), dict) else set(engines_res.get("NTO", [])[:k_eval])
@@ -160,25 +167,13 @@ def run_backtest(target_round: int, eval_n: int, k_eval: int, folds: int, out_la
             "jaccard": j_overlap
         })
 
-        # Calculate Portfolio Scores
-        for plan_name, weights in ALLOCATION_PLANS.items():
-            port_score = {n: 0.0 for n in range(1, 46)}
-            for en, w in weights.items():
-                sm = score_maps.get(en, {})
-                for num, sc in sm.items():
-                    port_score[num] += sc * w
-                    
-            top20_sorted = sorted(port_score.items(), key=lambda x: x[1], reverse=True)[:k_eval]
-            top20_nums = set([x[0] for x in top20_sorted])
-            
-            recall = len(top20_nums & actual_win)
-            bonus_hit = 1 if actual_bonus in top20_nums else 0
-            
-            results[plan_name].append({
-                "round": r,
-                "recall": recall,
-                "bonus": bonus_hit
-            })
+    # Portfolio Scores: (P,R) hits of every plan from one batched Top-K
+    valid_rounds = rounds[found].tolist()
+    for p, plan_name in enumerate(ALLOCATION_PLANS.keys()):
+        results[plan_name] = [
+            {"round": int(r), "recall": int(h), "bonus": int(b)}
+            for r, h, b in zip(valid_rounds, hits[p], bonus_hits[p])
+        ]
             
     # 2. Fold Analysis
     fold_size = eval_n // folds
@@ -283,6 +278,20 @@ def run_backtest(target_round: int, eval_n: int, k_eval: int, folds: int, out_la
     else:
         md_lines.append(f"**{best_plan} 승(Win)** - Recall, BonusHit, 안정성 기준에서 가장 우수합니다.")
 
+    # 3. Plan Search (optional): Dirichlet samples + local refinement around the best plans
+    search_result = None
+    if search > 0:
+        search_result = search_plans(
+            S, engine_axis, winners[found], bonus[found], k_eval, folds, fold_size,
+            n_samples=search, seed=search_seed, start=plan_matrix(ALLOCATION_PLANS, engine_axis))
+        logger.info(f"Plan search evaluated {search_result['n_evaluated']} allocations")
+        md_lines.append(f"\n## Plan Search (Top {len(search_result['plans'])} of {search_result['n_evaluated']}, seed={search_seed})")
+        md_lines.append("| Rank | Mean Recall | Std Recall | Mean Bonus Hit | Fold Min | Fold Std | Weights |")
+        md_lines.append("| :---: | :---: | :---: | :---: | :---: | :---: | :--- |")
+        for rank, sp in enumerate(search_result["plans"], 1):
+            w_str = ", ".join(f"{en} {w:.3f}" for en, w in sp["weights"].items())
+            md_lines.append(f"| {rank} | {sp['mean_recall']:.3f} | {sp['std_recall']:.3f} | {sp['mean_bonus']:.3f} | {sp['fold_min']:.2f} | {sp['fold_std']:.3f} | {w_str} |")
+
     os.makedirs(out_latest, exist_ok=True)
     os.makedirs(out_history, exist_ok=True)
     
@@ -301,6 +310,8 @@ def run_backtest(target_round: int, eval_n: int, k_eval: int, folds: int, out_la
         "round_data": results,
         "winner": best_plan
     }
+    if search_result is not None:
+        json_output["search"] = search_result
     
     class NpEncoder(json.JSONEncoder):
         def default(self, obj):
@@ -326,6 +337,9 @@ if __name__ == "__main__":
     parser.add_argument("--folds", type=int, default=5)
     parser.add_argument("--out", type=str, default="docs/reports/latest")
     parser.add_argument("--history", type=str, default="docs/reports/history")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to score rounds missing from the result store")
+    parser.add_argument("--search", type=int, default=0, help="Search N random (Dirichlet) allocations plus local refinement; 0 = off")
+    parser.add_argument("--search_seed", type=int, default=0)
     
     # Needs a target round. We will fetch the latest round from df_sorted if not provided?
     # Actually wait. The assignment didn't specify --target, but we need it. Let's find latest.
@@ -334,4 +348,5 @@ if __name__ == "__main__":
     df, _ = load_data(exclusion_mode=True)
     target_round = df['round'].max() + 1
     
-    run_backtest(target_round, args.eval_n, args.k_eval, args.folds, args.out, args.history)
+    run_backtest(target_round, args.eval_n, args.k_eval, args.folds, args.out, args.history, workers=args.workers,
+                 search=args.search, search_seed=args.search_seed)
@@ -13,42 +13,30 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from nt_lotto.nt_core.ssot_loader import load_data
+from nt_lotto.nt_engines.executor import get_executor
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 logger = logging.getLogger("GenerateCombosV2")
 
+# analyze() kwargs per engine; the executor runs each engine (and its sub-engines) once per round.
+# Combos only read scores/topk, so per-number evidence strings are not built.
+ENGINE_CALLS = {
+    "NT-Omega": {"k_eval": 45, "k_pool": 22, "evidence": False},
+    "NTO": {"k_eval": 45, "evidence": False},
+    "NT-VPA-1": {"k_eval": 45, "evidence": False},
+    "NT5": {},
+    "NT-LL": {},
+    "NT4": {},
+    "VPA": {"evidence": False},
+}
+
 def get_engine_results(df_sorted, r, k_eval):
     results = {}
-    engines = ["NT-Omega", "NTO", "NT-VPA-1", "NT5", "NT-LL", "NT4", "VPA"]
+    executor = get_executor()
     
-    for engine_name in engines:
+    for engine_name, kwargs in ENGINE_CALLS.items():
         try:
-            if engine_name == "NT4":
-                from nt_lotto.nt_engines.nt4 import analyze
-                results[engine_name] = analyze(df_sorted, r)
-            elif engine_name == "NT5":
-                from nt_lotto.nt_engines.nt5 import analyze
-                results[engine_name] = analyze(df_sorted, r)
-            elif engine_name == "NT-LL":
-                from nt_lotto.nt_engines.nt_ll import analyze
-                res = analyze(df_sorted, r)
-                if isinstance(res, list):
-                    scores = [{"n": n, "score": 1.0 - (i/len(res))} for i, n in enumerate(res)]
-                    results[engine_name] = {"topk": res, "scores": scores}
-                else:
-                    results[engine_name] = res
-            elif engine_name == "VPA":
-                from nt_lotto.nt_engines.vpa import analyze
-                results[engine_name] = analyze(df_sorted, r)
-            elif engine_name == "NT-VPA-1":
-                from nt_lotto.nt_engines.nt_vpa_1 import analyze
-                results[engine_name] = analyze(df_sorted, r, k_eval=45)
-            elif engine_name == "NTO":
-                from nt_lotto.nt_engines.nto import analyze
-                results[engine_name] = analyze(df_sorted, r, k_eval=45)
-            elif engine_name == "NT-Omega":
-                from nt_lotto.nt_engines.nt_omega import analyze
-                results[engine_name] = analyze(df_sorted, r, k_eval=45, k_pool=22)
+            results[engine_name] = executor.analyze(engine_name, df_sorted, r, **kwargs)
         except Exception as e:
             logger.warning(f"Error running {engine_name}: {e}")
             results[engine_name] = {"topk": [], "scores": []}
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import os
+import logging
+
+# Adjust path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from nt_lotto.nt_core.constants import DAEMON_HOST, DAEMON_PORT
+from nt_lotto.nt_engines.daemon import DaemonClient, serve
+
+# Logging
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger("EngineDaemon")
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm engine daemon (SSOT + engine caches kept in memory)")
+    parser.add_argument("--host", type=str, default=os.environ.get("NT_DAEMON_HOST", DAEMON_HOST))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("NT_DAEMON_PORT", DAEMON_PORT)))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("start", help="Serve in the foreground until stopped")
+    sub.add_parser("status", help="Check whether a daemon answers")
+    sub.add_parser("stop", help="Ask a running daemon to exit")
+
+    args = parser.parse_args()
+    client = DaemonClient(args.host, args.port)
+
+    if args.command == "start":
+        if client.available():
+            logger.error(f"A daemon is already running on {args.host}:{args.port}")
+            sys.exit(1)
+        serve(args.host, args.port)
+    elif args.command == "status":
+        if not client.available():
+            logger.info(f"No daemon on {args.host}:{args.port}")
+            sys.exit(1)
+        logger.info(f"Daemon on {args.host}:{args.port}: {client.call('ping')}")
+    else:
+        if client.available():
+            client.shutdown()
+            logger.info("Daemon stopped")
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,14 @@ from typing import List, Dict
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from nt_lotto.nt_core.constants import SSOT_SORTED, SSOT_ORDERED, K_EVAL
-# We don't import actual engines because they are dynamic or many.
-# For scaffolding, we will import the registry or mock them.
-# Assuming we have a `nt_lotto/nt_engines/__init__.py` or similar to discover engines.
-# Since user says "14 Engines Fixed", we can hardcode the list.
+# Engines come from the registry; their modules are only imported when they run.
+from nt_lotto.nt_engines.registry import ENGINE_SPECS
 
-# Engine List
-ENGINES = [
-    "NT4", "NT-Omega", "NT5", "NTO", "NT-LL", "VPA", "NT-VPA-1", 
-    "AL1", "AL2", "ALX", "NT-EXP", "NT-DPP", "NT-HCE", "NT-PAT"
-]
+# Engine List (14 engines fixed, display names)
+ENGINES = [spec.name for spec in ENGINE_SPECS]
+
+# Engines whose Top-K is read from the result store (analyze(): Top-20 = K_EVAL)
+STORED_ENGINES = ["NT4", "NT5", "NT-LL"]
 
 # Logging
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
@@ -52,15 +50,11 @@ def get_engine_stub_prediction(engine_name: str, target_round: int) -> List[int]
     logger.warning(f"Engine {engine_name} is a STUB. No prediction for {target_round}.")
     return []
 
-def main():
-    parser = argparse.ArgumentParser(description="Run all 14 engines for a target round")
-    parser.add_argument("--target", type=int, required=True, help="Target Round (R+1)")
-    parser.add_argument("--out_dir", type=str, required=True, help="Output directory for Omega Pools/Engine Results")
-    
-    args = parser.parse_args()
-    
-    target_round = args.target
-    out_dir = args.out_dir
+def run_engines(target_round: int, out_dir: str, df_sorted: pd.DataFrame = None, workers: int = 1) -> str:
+    """
+    Run all 14 engines for target_round and write engine_topk_K20.csv to out_dir.
+    df_sorted defaults to the SSOT (with exclusions). Returns the CSV path.
+    """
     os.makedirs(out_dir, exist_ok=True)
     
     logger.info(f"Running Engines for Target Round {target_round}...")
@@ -69,9 +63,24 @@ def main():
     global df_sorted_cache
     from nt_lotto.nt_core.ssot_loader import load_data
     
-    if df_sorted_cache is None:
+    if df_sorted is not None:
+        df_sorted_cache = df_sorted
+    elif df_sorted_cache is None:
         df_sorted_cache, _ = load_data(exclusion_mode=True)
     
+    # Stored engines are scored up front, one task per engine when workers > 1
+    stored = {}
+    from nt_lotto.nt_engines.parallel import ParallelRunner
+    from nt_lotto.nt_engines.result_store import engine_results as stored_results
+    with ParallelRunner(df_sorted_cache, workers=workers) as runner:
+        if runner.workers > 1:
+            runner.scores(STORED_ENGINES, [target_round])
+        for engine_name in STORED_ENGINES:
+            try:
+                stored[engine_name] = stored_results(engine_name, df_sorted_cache, [target_round], runner=runner)
+            except Exception as e:
+                stored[engine_name] = e
+
     # Structure to hold results
     engine_results = []
     
@@ -81,16 +90,11 @@ def main():
         # 1. Execute Engine Logic
         prediction = []
         try:
-            if engine_name == "NT4":
-                from nt_lotto.nt_engines.nt4 import analyze as analyze_nt4
-                prediction = analyze_nt4(df_sorted_cache, target_round)
-            elif engine_name == "NT5":
-                from nt_lotto.nt_engines.nt5 import analyze as analyze_nt5
-                prediction = analyze_nt5(df_sorted_cache, target_round)
-            elif engine_name == "NT-LL":
-                from nt_lotto.nt_engines.nt_ll import analyze as analyze_ntll
-                result = analyze_ntll(df_sorted_cache, target_round)
-                prediction = result['topk'] if isinstance(result, dict) else result
+            if engine_name in STORED_ENGINES:
+                # Top-K from the shared result store (computed once per engine/round)
+                if isinstance(stored[engine_name], Exception):
+                    raise stored[engine_name]
+                prediction = stored[engine_name].topk(0, K_EVAL)
             else:
                 prediction = get_engine_stub_prediction(engine_name, target_round)
         except Exception as e:
@@ -115,6 +119,17 @@ def main():
     df = pd.DataFrame(engine_results)
     df.to_csv(out_csv, index=False)
     logger.info(f"Saved engine results to {out_csv}")
+    return out_csv
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all 14 engines for a target round")
+    parser.add_argument("--target", type=int, required=True, help="Target Round (R+1)")
+    parser.add_argument("--out_dir", type=str, required=True, help="Output directory for Omega Pools/Engine Results")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to score the stored engines")
+    
+    args = parser.parse_args()
+    
+    run_engines(args.target, args.out_dir, workers=args.workers)
 
 if __name__ == "__main__":
     main()
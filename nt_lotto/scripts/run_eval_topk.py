@@ -3,22 +3,115 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Set
 
 # Adjust path to import nt_lotto
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from nt_lotto.nt_core.constants import EVAL_DIR, K_EVAL
 from nt_lotto.nt_core.ssot import load_ssot_sorted, load_ssot_ordered, load_exclude_rounds, apply_exclusion
-from nt_lotto.nt_core.metrics import recall_at_k, summarize_recalls
+from nt_lotto.nt_core.metrics import recall_at_k
+from nt_lotto.nt_core.kpi import KPI_WINDOWS, EngineKPIState, load_kpi_state, save_kpi_state
 from nt_lotto.nt_engines.registry import get_engines
 
 def ensure_dir(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-def run_evaluation(start_round: int, end_round: int):
+def evaluate_round(t: int, ssot_sorted: pd.DataFrame, ssot_ordered: pd.DataFrame, excludes: Set[int], engines) -> Optional[dict]:
+    """
+    Walk-forward evaluation of round t: every engine is fit on the rounds before t.
+    Returns {"round", "win_numbers", "train_size", "rows"} or None if t is not in the SSOT.
+    """
+    # Test Data: round t
+    row_t = ssot_sorted[ssot_sorted['round'] == t]
+    if row_t.empty:
+        return None
+        
+    win_numbers = set(row_t.iloc[0][['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values.astype(int))
+    
+    # Train Data: round < t, excluding banned rounds
+    train_sorted = ssot_sorted[ssot_sorted['round'] < t].copy()
+    train_sorted = apply_exclusion(train_sorted, excludes)
+    
+    train_ordered = ssot_ordered[ssot_ordered['round'] < t].copy()
+    train_ordered = apply_exclusion(train_ordered, excludes)
+    
+    round_topk_data = [] # List of dicts
+    
+    for engine in engines:
+        # Fit
+        # Optimization: Some engines might not need refitting every round if they are simple laws
+        # But strictly following walk-forward:
+        engine.fit(train_sorted, train_ordered if engine.required_ssot in ["ordered", "both"] else None)
+        
+        # Predict
+        top_k = engine.topk_numbers(K_EVAL)
+        top_k_set = set(top_k)
+        
+        # Metric
+        # If top_k is empty (Stub), recall is NaN or 0? 
+        # Stub returns [], so Intersection is 0. Recall is 0.
+        # But strictly, if engine didn't run, maybe NaN? 
+        # Let's count it as 0 for now, but mark status.
+        
+        if not top_k:
+            recall = 0.0 # Or np.nan
+            status = "STUB/EMPTY"
+        else:
+            recall = recall_at_k(top_k_set, win_numbers)
+            status = "OK"
+            
+        round_topk_data.append({
+            "engine_id": engine.engine_id,
+            "top_k": str(list(top_k)), 
+            "recall": recall,
+            "status": status
+        })
+
+    return {"round": t, "win_numbers": win_numbers, "train_size": len(train_sorted), "rows": round_topk_data}
+
+# Per-process SSOT copy of a pool worker (sorted, ordered, excludes); never written to
+_WORKER_SSOT = None
+
+def _init_worker(ssot_sorted: pd.DataFrame, ssot_ordered: pd.DataFrame, excludes: Set[int]) -> None:
+    global _WORKER_SSOT
+    _WORKER_SSOT = (ssot_sorted, ssot_ordered, excludes)
+
+def _evaluate_shard(rounds: List[int]) -> List[Optional[dict]]:
+    ssot_sorted, ssot_ordered, excludes = _WORKER_SSOT
+    engines = get_engines()
+    return [evaluate_round(t, ssot_sorted, ssot_ordered, excludes, engines) for t in rounds]
+
+def evaluate_rounds(rounds: Sequence[int], ssot_sorted: pd.DataFrame, ssot_ordered: pd.DataFrame,
+                    excludes: Set[int], workers: int = 1) -> List[Optional[dict]]:
+    """
+    evaluate_round() for every round, in `rounds` order.
+    workers > 1 splits the rounds into contiguous shards, one per process; each round only
+    reads the rounds before it, so the merged shards equal the serial run.
+    """
+    rounds = [int(t) for t in rounds]
+    if workers <= 1 or len(rounds) < 2:
+        return _evaluate_serial(rounds, ssot_sorted, ssot_ordered, excludes)
+    shards = [s.tolist() for s in np.array_split(np.array(rounds), min(workers, len(rounds)))]
+    with ProcessPoolExecutor(max_workers=len(shards), initializer=_init_worker,
+                             initargs=(ssot_sorted, ssot_ordered, excludes)) as pool:
+        parts = list(pool.map(_evaluate_shard, shards))
+    return [res for part in parts for res in part]
+
+def _evaluate_serial(rounds: List[int], ssot_sorted: pd.DataFrame, ssot_ordered: pd.DataFrame, excludes: Set[int]) -> List[Optional[dict]]:
+    engines = get_engines()
+    return [evaluate_round(t, ssot_sorted, ssot_ordered, excludes, engines) for t in rounds]
+
+def run_evaluation(start_round: int, end_round: int, workers: int = 1, out_dir: str = EVAL_DIR, incremental: bool = False):
+    """
+    Walk-forward Recall@K evaluation of start_round..end_round.
+    The per-engine KPI checkpoint is saved in out_dir; with incremental=True a run resumes from
+    it and only evaluates the rounds after the last evaluated one. A checkpoint for another
+    start round, engine set or exclusion set, or one past end_round, is rebuilt from scratch.
+    """
     print(f"[INFO] Starting Evaluation K={K_EVAL} for rounds {start_round}~{end_round}")
     
     # 1. Load Data
@@ -32,107 +125,70 @@ def run_evaluation(start_round: int, end_round: int):
     # If the target round itself is excluded, we skip evaluation.
     
     # Prepare results container
-    # { engine_id: [recall_t1, recall_t2, ...] }
-    engine_results: Dict[str, List[float]] = {e.engine_id: [] for e in get_engines()}
-    engine_eval_counts: Dict[str, int] = {e.engine_id: 0 for e in get_engines()}
-    
-    engines = get_engines()
+    # { engine_id: running Recall@K aggregate }
+    engine_ids = [e.engine_id for e in get_engines()]
+    ensure_dir(out_dir)
+    state_path = os.path.join(out_dir, f"kpi_state_K{K_EVAL}.json")
+    scope = {"start": int(start_round)}
+    states: Dict[str, EngineKPIState] = {}
+    if incremental:
+        states = load_kpi_state(state_path, K_EVAL, KPI_WINDOWS, excludes, scope=scope)
+        if set(states) != set(engine_ids) or any(s.last_round > end_round for s in states.values()):
+            states = {}
+    resume_after = max((s.last_round for s in states.values()), default=start_round - 1)
+    if states:
+        print(f"[INFO] Resuming from checkpoint: rounds <= {resume_after} already evaluated")
+    states = {eid: states.get(eid) or EngineKPIState(eid, max(KPI_WINDOWS)) for eid in engine_ids}
     
     # 2. Iterate Rounds
     valid_rounds = [
-        r for r in range(start_round, end_round + 1)
+        r for r in range(max(start_round, resume_after + 1), end_round + 1)
         if r not in excludes
     ]
     
-    # Filter SSOT to relevant range mostly for quick check, but fit needs history
-    
-    results_summary = []
+    # Rounds are evaluated (possibly on several processes) before any artifact is written,
+    # so artifacts and summary are produced in round order either way
+    round_results = evaluate_rounds(valid_rounds, ssot_sorted, ssot_ordered, excludes, workers=workers)
 
-    for t in valid_rounds:
-        # 2.1 Prepare Data
-        # Test Data: round t
-        row_t = ssot_sorted[ssot_sorted['round'] == t]
-        if row_t.empty:
+    for t, res in zip(valid_rounds, round_results):
+        if res is None:
             print(f"[WARN] Round {t} not found in SSOT. Skipping.")
             continue
             
-        win_numbers = set(row_t.iloc[0][['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].values.astype(int))
-        
-        # Train Data: round < t, excluding banned rounds
-        train_sorted = ssot_sorted[ssot_sorted['round'] < t].copy()
-        train_sorted = apply_exclusion(train_sorted, excludes)
-        
-        train_ordered = ssot_ordered[ssot_ordered['round'] < t].copy()
-        train_ordered = apply_exclusion(train_ordered, excludes)
+        for row in res["rows"]:
+            states[row["engine_id"]].add(t, round(row["recall"] * 6))
         
         # Output directory
-        round_eval_dir = os.path.join(EVAL_DIR, str(t))
+        round_eval_dir = os.path.join(out_dir, str(t))
         ensure_dir(round_eval_dir)
         
-        round_topk_data = [] # List of dicts
-        round_recalls = {}
-        
-        # 2.2 Run Engines
-        for engine in engines:
-            # Fit
-            # Optimization: Some engines might not need refitting every round if they are simple laws
-            # But strictly following walk-forward:
-            engine.fit(train_sorted, train_ordered if engine.required_ssot in ["ordered", "both"] else None)
-            
-            # Predict
-            top_k = engine.topk_numbers(K_EVAL)
-            top_k_set = set(top_k)
-            
-            # Metric
-            # If top_k is empty (Stub), recall is NaN or 0? 
-            # Stub returns [], so Intersection is 0. Recall is 0.
-            # But strictly, if engine didn't run, maybe NaN? 
-            # Let's count it as 0 for now, but mark status.
-            
-            if not top_k:
-                recall = 0.0 # Or np.nan
-                status = "STUB/EMPTY"
-            else:
-                recall = recall_at_k(top_k_set, win_numbers)
-                status = "OK"
-                
-            engine_results[engine.engine_id].append(recall)
-            engine_eval_counts[engine.engine_id] += 1
-            
-            round_topk_data.append({
-                "engine_id": engine.engine_id,
-                "top_k": str(list(top_k)), 
-                "recall": recall,
-                "status": status
-            })
-            round_recalls[engine.engine_id] = recall
-
-        # 2.3 Save Round Artifacts
-        df_topk = pd.DataFrame(round_topk_data)
+        # Save Round Artifacts
+        df_topk = pd.DataFrame(res["rows"])
         df_topk.to_csv(os.path.join(round_eval_dir, f"engine_topk_K{K_EVAL}.csv"), index=False)
         
         # Generate README
         with open(os.path.join(round_eval_dir, "README.md"), "w", encoding="utf-8") as f:
             f.write(f"# Evaluation Report: Round {t}\n\n")
             f.write(f"- **Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"- **Win Numbers**: {sorted(list(win_numbers))}\n")
-            f.write(f"- **Train Size**: {len(train_sorted)} rounds\n")
+            f.write(f"- **Win Numbers**: {sorted(list(res['win_numbers']))}\n")
+            f.write(f"- **Train Size**: {res['train_size']} rounds\n")
             f.write(f"- **K_EVAL**: {K_EVAL}\n\n")
             f.write("## Engine Performance\n")
             f.write(df_topk.to_markdown(index=False))
             
-        print(f"[{t}] Evaluated {len(engines)} engines.")
+        print(f"[{t}] Evaluated {len(res['rows'])} engines.")
+
+    save_kpi_state(state_path, states, K_EVAL, KPI_WINDOWS, excludes, scope=scope)
 
     # 3. Final Summary
     summary_rows = []
     
-    for eid in engine_results:
-        recalls = engine_results[eid]
-        stats = summarize_recalls(recalls)
+    for eid, state in states.items():
+        stats = state.kpi_row(KPI_WINDOWS)
         summary_rows.append({
             "engine_id": eid,
-            "status": "ACTIVE" if any(recalls) else "STUB", # crude check
-            "n_rounds": len(recalls),
+            "status": "ACTIVE" if state.hit_sum else "STUB", # crude check
+            "n_rounds": state.n,
             "overall": f"{stats['overall']:.4f}",
             "recent10": f"{stats['recent10']:.4f}",
             "recent20": f"{stats['recent20']:.4f}",
@@ -140,7 +196,7 @@ def run_evaluation(start_round: int, end_round: int):
         })
         
     df_summary = pd.DataFrame(summary_rows)
-    summary_path = os.path.join(EVAL_DIR, f"summary_engine_recall_K{K_EVAL}.md")
+    summary_path = os.path.join(out_dir, f"summary_engine_recall_K{K_EVAL}.md")
     
     with open(summary_path, "w", encoding="utf-8") as f:
         f.write(f"# Engine Recall@{K_EVAL} Summary\n\n")
@@ -155,6 +211,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--start", type=int, required=True)
     parser.add_argument("--end", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=1, help="Processes the round range is sharded across")
+    parser.add_argument("--out_dir", type=str, default=EVAL_DIR)
+    parser.add_argument("--incremental", action="store_true", help="Only evaluate rounds after the saved KPI checkpoint")
     args = parser.parse_args()
     
-    run_evaluation(args.start, args.end)
+    run_evaluation(args.start, args.end, workers=args.workers, out_dir=args.out_dir, incremental=args.incremental)
@@ -0,0 +1,61 @@
+import argparse
+import sys
+import os
+import logging
+
+# Adjust path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from nt_lotto.nt_core.ssot_loader import load_data
+from nt_lotto.nt_engines.registry import BATCH_ENGINES
+from nt_lotto.nt_engines.result_store import ResultStore, get_result_store
+
+# Logging
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger("ResultStore")
+
+def warm(store: ResultStore, engines, start: int, end: int, workers: int = 1):
+    """Score every engine for rounds start..end that the store does not hold yet."""
+    df_sorted, _ = load_data(exclusion_mode=True)
+    rounds = list(range(start, end + 1))
+    for en in engines:
+        try:
+            added = store.warm([en], df_sorted, rounds, workers=workers)[en.upper()]
+            logger.info(f"{en}: {added} new / {len(rounds)} rounds")
+        except Exception as e:
+            logger.warning(f"Engine {en} failed: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm or prune the shared engine result store")
+    parser.add_argument("--root", type=str, default=None, help="Store directory (default: NT_RESULT_STORE_DIR or data/.result_store)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_warm = sub.add_parser("warm", help="Compute missing engine/round results")
+    p_warm.add_argument("--start", type=int, required=True)
+    p_warm.add_argument("--end", type=int, required=True)
+    p_warm.add_argument("--engines", type=str, default=",".join(BATCH_ENGINES), help="Comma separated engine ids")
+    p_warm.add_argument("--workers", type=int, default=1, help="Processes used to score missing rounds")
+
+    p_prune = sub.add_parser("prune", help="Drop stale/old results and compact the store")
+    p_prune.add_argument("--max-mb", type=float, default=None, help="Size budget after pruning")
+    p_prune.add_argument("--older-than-days", type=float, default=None, help="Drop results unused for this long")
+    p_prune.add_argument("--keep-stale", action="store_true", help="Keep results of changed engine code")
+
+    args = parser.parse_args()
+
+    store = ResultStore(root=args.root) if args.root else get_result_store()
+    if store is None:
+        logger.error("Result store is disabled (NT_RESULT_STORE=0)")
+        sys.exit(1)
+
+    if args.command == "warm":
+        engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+        warm(store, engines, args.start, args.end, workers=args.workers)
+    else:
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+        removed = store.prune(max_bytes=max_bytes, older_than=older_than, stale=not args.keep_stale)
+        logger.info(f"Pruned {removed} results from {store.root}")
+
+if __name__ == "__main__":
+    main()
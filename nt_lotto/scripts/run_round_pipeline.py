@@ -4,7 +4,6 @@ import os
 import json
 import logging
 import pandas as pd
-import subprocess
 from dataclasses import asdict
 from typing import List, Dict, Set, Optional
 
@@ -12,11 +11,12 @@ from typing import List, Dict, Set, Optional
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 # Import Core Constants and Functions
-from nt_lotto.nt_core.constants import SSOT_SORTED, SSOT_ORDERED, EXCLUDE_CSV, K_EVAL, K_POOL
+from nt_lotto.nt_core.constants import SSOT_SORTED, SSOT_ORDERED, EXCLUDE_CSV, K_EVAL, K_POOL, ARCHIVE_DIR
 from nt_lotto.nt_core.ssot_loader import load_data as load_ssot
 from nt_lotto.nt_core.ssot import load_exclude_rounds
 from nt_lotto.nt_core.scoring import score_portfolio, summarize_scoreboard
 from nt_lotto.nt_core.kpi import update_engine_kpi
+from nt_lotto.nt_engines import daemon
 from nt_lotto.nt_core.omega import (
     softmax_weights, 
     compute_engine_kpi,
@@ -31,17 +31,14 @@ logger = logging.getLogger("RoundPipeline")
 
 def run_engines_script(target_round: int, out_dir: str):
     """
-    Calls run_engines.py via subprocess to execute 14 engines.
-    This separates the engine execution environment from the orchestrator.
+    Runs the 14 engines (run_engines.py) through the engine daemon when one is up,
+    otherwise in this process. Either way the SSOT and engine caches stay warm between steps.
     """
-    script_path = os.path.join(os.path.dirname(__file__), "run_engines.py")
-    cmd = [sys.executable, script_path, "--target", str(target_round), "--out_dir", out_dir]
-    
-    logger.info(f"Subprocess: Running engines for Round {target_round}...")
+    logger.info(f"Running engines for Round {target_round}...")
     try:
-        subprocess.check_call(cmd)
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to run engines: {e}")
+        daemon.call("run_engines", target=target_round, out_dir=os.path.abspath(out_dir))
+    except Exception as e:
+        logger.exception(f"Failed to run engines: {e}")
         sys.exit(1)
 
 def main():
@@ -49,7 +46,8 @@ def main():
     parser.add_argument("--round", type=int, required=True, help="Current round (R) to Analyze/Backfill")
     parser.add_argument("--mode", type=str, choices=['backfill', 'next'], default='backfill',
                         help="Mode: backfill (score R only) or next (score R + predict R+1)")
-    parser.add_argument("--out_root", type=str, default="03_Global_Analysis_Archive", help="Output root directory")
+    parser.add_argument("--out_root", type=str, default=ARCHIVE_DIR,
+                        help="Output root directory (engine outputs must stay under the archive root)")
     
     args = parser.parse_args()
     
@@ -162,12 +160,15 @@ def main():
     exclusions = load_exclude_rounds()
     
     # Calculate KPI
+    # Resumes from the per-engine checkpoint: only rounds after the last evaluated one are scored,
+    # and an engine whose already evaluated Top-K history changed is rebuilt from the full history
     kpi_df = update_engine_kpi(
         kpi_csv_path=os.path.join(kpi_dir, "engine_kpi.csv"),
         engine_topk_by_round=formatted_history,
         ssot_sorted_df=ssot_sorted,
         exclusions=exclusions,
-        k_eval=K_EVAL
+        k_eval=K_EVAL,
+        state_path=os.path.join(kpi_dir, "engine_kpi_state.json")
     )
     
     kpi_save_path = os.path.join(kpi_dir, "engine_kpi.csv")
@@ -0,0 +1,81 @@
+import argparse
+import sys
+import os
+import json
+import logging
+
+# Adjust path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from nt_lotto.nt_core.ssot_loader import load_data
+from nt_lotto.nt_engines.sweep import DEFAULT_GRIDS, SWEEP_PARAMS, sweep
+
+# Logging
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger("ParamSweep")
+
+def load_grid(spec: str):
+    """--grid value: a JSON object or the path of a JSON file ({param: [values]})."""
+    if spec is None:
+        return None
+    if os.path.exists(spec):
+        with open(spec, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(spec)
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward hyperparameter sweep of an engine's constants")
+    parser.add_argument("--engine", type=str, required=True, help=f"One of {', '.join(SWEEP_PARAMS)}")
+    parser.add_argument("--grid", type=str, default=None, help="JSON object or file {param: [values]} (default: built-in grid)")
+    parser.add_argument("--eval_n", type=int, default=300, help="Latest N rounds evaluated")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--eta", type=int, default=3, help="Successive-halving factor (1 = score every configuration on every round)")
+    parser.add_argument("--min_rounds", type=int, default=20, help="Rounds scored in the first rung")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--top", type=int, default=20, help="Rows shown in the Markdown report")
+    parser.add_argument("--out", type=str, default="docs/reports/latest")
+    args = parser.parse_args()
+
+    engine = args.engine.upper()
+    grid = load_grid(args.grid)
+    if grid is None and engine not in DEFAULT_GRIDS:
+        logger.error(f"No default grid for {engine}; pass --grid")
+        sys.exit(1)
+
+    df_sorted, _ = load_data(exclusion_mode=True)
+    rounds = df_sorted['round'].drop_duplicates().sort_values().tolist()[-args.eval_n:]
+    logger.info(f"Sweeping {engine} on rounds {rounds[0]}~{rounds[-1]} (K={args.k}, eta={args.eta}, workers={args.workers})")
+
+    try:
+        result = sweep(engine, df_sorted, rounds, grid, k=args.k, folds=args.folds, eta=args.eta,
+                       min_rounds=args.min_rounds, workers=args.workers)
+    except (KeyError, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    os.makedirs(args.out, exist_ok=True)
+    base = os.path.join(args.out, f"Param_Sweep_{engine}_K{args.k}")
+    table = result.assign(params=result['params'].map(lambda p: json.dumps(p, sort_keys=True)))
+    table.to_csv(base + ".csv", index=False)
+
+    fold_cols = [c for c in table.columns if c.startswith("recall_fold")]
+    md_lines = [
+        f"# Parameter Sweep: {engine} (K={args.k})",
+        f"- **Rounds**: {rounds[0]} ~ {rounds[-1]} ({len(rounds)})",
+        f"- **Configurations**: {len(table)} (successive halving, eta={args.eta})\n",
+        "| Rank | Params | Rung | Rounds | Recall | Fold Min | Fold Std |",
+        "| :---: | :--- | :---: | :---: | :---: | :---: | :---: |",
+    ]
+    for rank, row in enumerate(table.head(args.top).itertuples(index=False), 1):
+        md_lines.append(f"| {rank} | `{row.params}` | {row.rung} | {row.n_rounds} | {row.recall:.4f} | {row.fold_min:.4f} | {row.fold_std:.4f} |")
+    if fold_cols and len(table):
+        md_lines.append(f"\nBest: {table.iloc[0]['params']} (folds: {', '.join(f'{v:.4f}' for v in table.iloc[0][fold_cols])})")
+    with open(base + ".md", "w", encoding="utf-8") as f:
+        f.write("\n".join(md_lines))
+
+    logger.info(f"Best {engine} parameters: {table.iloc[0]['params']} (recall {table.iloc[0]['recall']:.4f})")
+    logger.info(f"Sweep saved to {base}.csv / .md")
+
+if __name__ == "__main__":
+    main()
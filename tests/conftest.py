@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from nt_lotto.nt_core import feature_cache
+from nt_lotto.nt_core.schema import SSOT
+from nt_lotto.nt_engines import result_store
+
+def _synthetic_ssot(T=120, start=601, seed=0):
+    rng = np.random.default_rng(seed)
+    rows_s, rows_o = [], []
+    for i in range(T):
+        d = rng.choice(np.arange(1, 46), 7, replace=False)
+        r, date = start + i, f"2020-{1 + i % 12:02d}-01"
+        rows_s.append([r, date] + sorted(d[:6].tolist()) + [int(d[6])])
+        rows_o.append([r, date] + d[:6].tolist() + [int(d[6])])
+    s = pd.DataFrame(rows_s, columns=['round', 'date', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'bonus'])
+    o = pd.DataFrame(rows_o, columns=['round', 'date', 'b1', 'b2', 'b3', 'b4', 'b5', 'b6', 'bonus'])
+    return SSOT(sorted_df=s, ordered_df=o)
+
+def _synthetic_draws(T=120, start=601, seed=0, date=False):
+    df = _synthetic_ssot(T, start, seed).sorted_df
+    return df if date else df.drop(columns='date')
+
+@pytest.fixture
+def synthetic_ssot():
+    """synthetic_ssot(T, start, seed) -> SSOT of T random draws from round `start` (sorted and draw order)."""
+    return _synthetic_ssot
+
+@pytest.fixture
+def synthetic_draws():
+    """synthetic_draws(T, start, seed, date=False) -> the sorted frame of synthetic_ssot (round, n1..n6, bonus)."""
+    return _synthetic_draws
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Feature cache and result store live under the test's tmp_path, never in the repo's data/."""
+    monkeypatch.setenv("NT_FEATURE_CACHE_DIR", str(tmp_path / "feature_cache"))
+    monkeypatch.setenv("NT_RESULT_STORE_DIR", str(tmp_path / "result_store"))
+    # The process-wide defaults are re-created from the environment
+    monkeypatch.setattr(feature_cache, "_DEFAULT", None)
+    monkeypatch.setattr(feature_cache, "_DEFAULT_INIT", False)
+    monkeypatch.setattr(result_store, "_DEFAULT", None)
+    monkeypatch.setattr(result_store, "_DEFAULT_INIT", False)
@@ -0,0 +1,67 @@
+import numpy as np
+from nt_lotto.nt_core.allocation import evaluate_plans, plan_matrix, plan_metrics, rank_plans, search_plans
+
+ENGINES = ["A", "B", "C"]
+
+def _inputs(R=40, seed=2):
+    rng = np.random.default_rng(seed)
+    # Coarse values so portfolio scores tie often; engine C only scores 20 numbers
+    S = np.round(rng.uniform(size=(R, 3, 45)), 1)
+    S[:, 2] = 0.0
+    for r in range(R):
+        S[r, 2, rng.choice(45, 20, replace=False)] = rng.uniform(size=20)
+    winners = np.zeros((R, 45), dtype=bool)
+    bonus = np.zeros(R, dtype=np.int64)
+    for r in range(R):
+        d = rng.choice(np.arange(1, 46), 7, replace=False)
+        winners[r, d[:6] - 1] = True
+        bonus[r] = d[6]
+    return S, winners, bonus
+
+def _reference(S, weights, winners, bonus, k):
+    # Per-round dict loop of the allocation backtest
+    hits, bonus_hits = [], []
+    for r in range(len(S)):
+        port = {n: 0.0 for n in range(1, 46)}
+        for en, w in weights.items():
+            e = ENGINES.index(en)
+            for n in np.flatnonzero(S[r, e]) + 1:
+                port[n] += S[r, e, n - 1] * w
+        top = set(n for n, _ in sorted(port.items(), key=lambda x: x[1], reverse=True)[:k])
+        hits.append(len(top & set(np.flatnonzero(winners[r]) + 1)))
+        bonus_hits.append(int(bonus[r] in top))
+    return hits, bonus_hits
+
+def test_matrix_evaluation_matches_dict_loop():
+    S, winners, bonus = _inputs()
+    plans = {"p1": {"A": 0.5, "B": 0.3, "C": 0.2}, "p2": {"A": 0.1, "C": 0.9}, "p3": {"B": 1.0}}
+    W = plan_matrix(plans, ENGINES)
+    assert W.shape == (3, 3) and W[1, 1] == 0.0
+    for k in (6, 20):
+        hits, bonus_hits = evaluate_plans(S, W, winners, bonus, k=k, chunk=2)
+        for p, weights in enumerate(plans.values()):
+            ref_hits, ref_bonus = _reference(S, weights, winners, bonus, k)
+            assert hits[p].tolist() == ref_hits and bonus_hits[p].tolist() == ref_bonus
+
+def test_plan_metrics_and_ranking():
+    hits = np.array([[1, 2, 3, 4, 5], [3, 3, 3, 3, 3], [3, 3, 3, 3, 3]])
+    bonus_hits = np.array([[0, 0, 0, 0, 0], [0, 1, 0, 0, 0], [0, 0, 0, 0, 0]])
+    m = plan_metrics(hits, bonus_hits, folds=2, fold_size=2)
+    assert m["mean_recall"].tolist() == [3.0, 3.0, 3.0]
+    assert m["folds"][0].tolist() == [1.5, 4.0]
+    assert m["sharpe"][1] == 3.0 and np.isclose(m["std_recall"][0], np.std([1, 2, 3, 4, 5]))
+    assert rank_plans(m).tolist() == [1, 2, 0]
+
+def test_search_is_deterministic_and_keeps_the_best_start():
+    S, winners, bonus = _inputs()
+    start = plan_matrix({"p1": {"A": 0.5, "B": 0.3, "C": 0.2}}, ENGINES)
+    kw = dict(k=20, folds=3, fold_size=13, n_samples=300, seed=7, elite=8, refine_steps=2, n_local=16, start=start)
+    res = search_plans(S, ENGINES, winners, bonus, **kw)
+    assert res == search_plans(S, ENGINES, winners, bonus, **kw)
+    assert res["n_evaluated"] == 1 + 300 + 2 * 8 * 16 and len(res["plans"]) == 10
+    best = res["plans"][0]
+    assert np.isclose(sum(best["weights"].values()), 1.0) and len(best["folds"]) == 3
+    hits, _ = evaluate_plans(S, start, winners, bonus, k=20)
+    assert best["mean_recall"] >= hits.mean()
+    means = [p["mean_recall"] for p in res["plans"]]
+    assert means == sorted(means, reverse=True)
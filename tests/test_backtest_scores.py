@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.schema import SSOT, EngineOutput
+from nt_lotto.nt_core.backtest import backtest_scores, topk_masks
+from nt_lotto.nt_core.draw_matrix import mask_of, mask_of_onehot, popcount
+
+def test_topk_masks_break_ties_like_a_stable_sort():
+    rng = np.random.default_rng(3)
+    scores = np.round(rng.normal(size=(200, 45)), 1)
+    scores[::7, 40:] = np.nan
+    scores[5] = np.nan
+    for k in (1, 6, 20, 44, 45):
+        mask = topk_masks(scores, k)
+        ref = np.zeros_like(mask)
+        for r, row in enumerate(scores):
+            ref[r, np.array(EngineOutput("x", row).topk(k)) - 1] = True
+        assert (mask == ref).all(), k
+
+def test_popcount_of_masks():
+    draws = np.array([[1, 2, 3, 43, 44, 45], [7, 8, 9, 10, 11, 12]])
+    onehot = np.zeros((2, 45), dtype=bool)
+    onehot[np.repeat([0, 1], 6), draws.ravel() - 1] = True
+    assert (mask_of_onehot(onehot) == mask_of(draws)).all()
+    assert popcount(mask_of(draws) & mask_of(np.array([[1, 2, 12, 44, 30, 31]]))).tolist() == [3, 1]
+
+def test_backtest_scores_match_set_intersection(synthetic_ssot):
+    ssot = SSOT(sorted_df=synthetic_ssot(T=80, seed=41).sorted_df, ordered_df=pd.DataFrame())
+    rounds = list(range(611, 681))
+    scores = np.random.default_rng(8).normal(size=(len(rounds) - 1, 45))
+    res = backtest_scores(ssot, scores, rounds, k=20, engine="X")
+    truth = ssot.sorted_df.set_index("round")
+    hits = []
+    for i, t in enumerate(rounds[1:]):
+        topk = EngineOutput("x", scores[i]).topk(20)
+        assert res.per_round['topk'].iloc[i] == topk
+        hits.append(len(set(topk) & set(truth.loc[t, ["n1", "n2", "n3", "n4", "n5", "n6"]].tolist())))
+    assert res.per_round['hits'].tolist() == hits and res.per_round['round'].tolist() == rounds[1:]
+    assert np.isclose(res.mean_last10, np.mean(hits[-10:]) / 6.0) and res.engine == "X"
+    assert backtest_scores(ssot, scores[:0], rounds[:1]).per_round.empty
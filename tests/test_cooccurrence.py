@@ -0,0 +1,48 @@
+import itertools
+import numpy as np
+from nt_lotto.nt_core.draw_matrix import onehot_of
+from nt_lotto.nt_core.cooccurrence import CooccurrenceWindow, pair_counts, pair_prefix, pair_table, lift_matrix
+from nt_lotto.nt_core.window_index import SORTED_COLS
+
+def _draws(synthetic_draws):
+    """(T,6) sorted numbers."""
+    return synthetic_draws(T=80, seed=11)[SORTED_COLS].to_numpy()
+
+def _loop_counts(draws):
+    c = np.zeros((45, 45), dtype=int)
+    for row in draws:
+        for n in row:
+            c[n - 1, n - 1] += 1
+        for a, b in itertools.combinations(row, 2):
+            c[a - 1, b - 1] += 1
+            c[b - 1, a - 1] += 1
+    return c
+
+def test_pair_counts_match_loop(synthetic_draws):
+    draws = _draws(synthetic_draws)
+    counts = pair_counts(onehot_of(draws))
+    assert counts.dtype == np.float32
+    assert (counts == _loop_counts(draws)).all()
+
+def test_prefix_windows_and_incremental_window(synthetic_draws):
+    draws = _draws(synthetic_draws)
+    prefix = pair_prefix(onehot_of(draws))
+    assert (prefix[50] - prefix[20] == _loop_counts(draws[20:50])).all()
+
+    win = CooccurrenceWindow(size=30)
+    for row in draws:
+        win.push(row)
+    assert win.n_rows == 30
+    assert (win.counts == _loop_counts(draws[-30:])).all()
+
+def test_lift_and_table(synthetic_draws):
+    draws = _draws(synthetic_draws)
+    counts = pair_counts(onehot_of(draws))
+    lift = lift_matrix(counts, len(draws))
+    table = pair_table(counts, len(draws))
+    row = table.iloc[0]
+    a, b = int(row['n1']), int(row['n2'])
+    assert a < b
+    assert np.isclose(lift[a - 1, b - 1], row['lift'], rtol=1e-6)
+    assert (table['count'] > 0).all()
+    assert table[['n1', 'n2']].apply(tuple, axis=1).is_monotonic_increasing
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.schema import SSOT
+from nt_lotto.nt_core.draw_matrix import DrawMatrix, draw_matrix_of, mask_of, numbers_of_mask
+
+def _ssot():
+    sorted_df = pd.DataFrame({
+        'round': [3, 1, 2],
+        'date': ['c', 'a', 'b'],
+        'n1': [40, 1, 10], 'n2': [41, 2, 11], 'n3': [42, 3, 12],
+        'n4': [43, 4, 13], 'n5': [44, 5, 14], 'n6': [45, 6, 15],
+        'bonus': [1, 7, 16],
+    })
+    ordered_df = pd.DataFrame({
+        'round': [1, 3],
+        'date': ['a', 'c'],
+        'b1': [6, 45], 'b2': [5, 40], 'b3': [4, 41], 'b4': [3, 42], 'b5': [2, 43], 'b6': [1, 44],
+        'bonus': [7, 1],
+    })
+    return SSOT(sorted_df=sorted_df, ordered_df=ordered_df)
+
+def test_views_are_consistent():
+    dm = DrawMatrix.from_ssot(_ssot())
+    assert dm.rounds.tolist() == [1, 2, 3]
+    assert dm.numbers.dtype == np.uint8 and dm.numbers.shape == (3, 6)
+    assert dm.onehot.dtype == bool and dm.onehot.shape == (3, 45)
+    assert dm.mask.dtype == np.uint64
+
+    for t in range(len(dm)):
+        drawn = sorted(dm.numbers[t].tolist())
+        assert (np.nonzero(dm.onehot[t])[0] + 1).tolist() == drawn
+        assert numbers_of_mask(dm.mask[t]) == drawn
+    assert numbers_of_mask(mask_of([45, 1])[0]) == [1, 45]
+
+def test_ordered_aligned_on_round():
+    dm = DrawMatrix.from_ssot(_ssot())
+    assert dm.ordered[0].tolist() == [6, 5, 4, 3, 2, 1]
+    assert dm.ordered[1].tolist() == [0] * 6  # round 2 missing in ordered
+    assert dm.ordered[2].tolist() == [45, 40, 41, 42, 43, 44]
+    assert dm.bonus.tolist() == [7, 16, 1]
+    assert dm.bonus_onehot[2, 0]
+
+def test_slicing_and_memo():
+    ssot = _ssot()
+    dm = draw_matrix_of(ssot)
+    assert draw_matrix_of(ssot) is dm
+    assert dm.upto(2).rounds.tolist() == [1, 2]
+    assert dm.tail(1).rounds.tolist() == [3]
+    assert dm.row_of(2) == 1 and dm.row_of(9) == -1
+
+def test_memo_follows_in_place_edits():
+    ssot = _ssot()
+    dm = draw_matrix_of(ssot)
+    ssot.sorted_df.loc[0, ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']] = [30, 31, 32, 33, 34, 35]
+    fresh = draw_matrix_of(ssot)
+    assert fresh is not dm
+    assert fresh.numbers[-1].tolist() == [30, 31, 32, 33, 34, 35]
+    assert fresh.prefix_hashes[:3] == dm.prefix_hashes[:3] and fresh.prefix_hashes[3] != dm.prefix_hashes[3]
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import pandas as pd
+import pytest
+from nt_lotto.nt_engines import daemon, executor, nt4, nt_ll, result_store
+from nt_lotto.nt_engines.daemon import DaemonClient, DaemonError, EngineService, make_server
+from nt_lotto.nt_engines.executor import EngineExecutor
+from nt_lotto.nt_engines.result_store import ResultStore
+
+@pytest.fixture
+def warm_env(synthetic_draws, tmp_path, monkeypatch):
+    df = synthetic_draws(seed=13, date=True)
+    loads = []
+    monkeypatch.setattr(daemon, "load_data", lambda exclusion_mode=True: loads.append(exclusion_mode) or (df, df))
+    monkeypatch.setattr(result_store, "_DEFAULT", ResultStore(root=str(tmp_path / "store")))
+    monkeypatch.setattr(result_store, "_DEFAULT_INIT", True)
+    executor.set_executor(EngineExecutor())
+    yield df, loads
+    executor.set_executor(None)
+
+@pytest.fixture
+def server(warm_env, tmp_path):
+    token_file = str(tmp_path / "daemon.token")
+    srv = make_server("127.0.0.1", 0, service=EngineService(out_root=str(tmp_path / "archive")), token_file=token_file)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv, DaemonClient("127.0.0.1", srv.server_address[1], timeout=30, token_file=token_file)
+    srv.shutdown()
+    srv.server_close()
+    assert not os.path.exists(token_file)
+
+def test_daemon_serves_engine_results(server, warm_env):
+    srv, client = server
+    df, loads = warm_env
+    assert client.available()
+    for _ in range(2):
+        topk = client.call("engine_topk", engine="NT-LL", rounds=[650, 700], k=20)
+    assert topk == {"650": nt_ll.analyze(df, 650)['topk'], "700": nt_ll.analyze(df, 700)['topk']}
+    # The SSOT is loaded once and kept warm
+    assert loads == [True]
+    with pytest.raises(DaemonError):
+        client.call("no_such_method")
+
+def test_run_engines_through_client(server, tmp_path):
+    srv, client = server
+    path = client.call("run_engines", target=700, out_dir="Rounds/700")
+    assert path.startswith(str(tmp_path / "archive" / "Rounds" / "700"))
+    out = pd.read_csv(path)
+    assert len(out) == 14
+    assert out.loc[out['engine_id'] == "NT-LL", 'numbers'].iloc[0] != "[]"
+    for out_dir in (str(tmp_path / "elsewhere"), "../elsewhere"):
+        with pytest.raises(DaemonError, match="out_dir outside"):
+            client.call("run_engines", target=700, out_dir=out_dir)
+    assert not (tmp_path / "elsewhere").exists()
+
+def _raw_post(srv, headers, path="/shutdown"):
+    req = urllib.request.Request(f"http://127.0.0.1:{srv.server_address[1]}{path}", data=b"{}", headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        assert json.loads(e.read())["ok"] is False
+        return e.code
+
+def test_requests_need_token_json_and_localhost(server):
+    srv, client = server
+    token = open(srv.token_file).read()
+    assert os.stat(srv.token_file).st_mode & 0o777 == 0o600
+    ok = {"Content-Type": "application/json", daemon.TOKEN_HEADER: token}
+    assert _raw_post(srv, {"Content-Type": "application/json"}) == 403
+    assert _raw_post(srv, {**ok, daemon.TOKEN_HEADER: "0" * 64}) == 403
+    assert _raw_post(srv, {**ok, "Content-Type": "text/plain"}) == 415
+    assert _raw_post(srv, {**ok, "Host": "attacker.example:8765"}) == 403
+    assert client.available()
+    assert not DaemonClient("127.0.0.1", srv.server_address[1], token_file=srv.token_file + ".missing").available()
+
+def test_call_falls_back_in_process(warm_env, monkeypatch):
+    monkeypatch.setenv("NT_DAEMON", "0")
+    monkeypatch.setattr(daemon, "_LOCAL", EngineService())
+    assert daemon.call("engine_topk", engine="NT4", rounds=[700], k=5)["700"] == nt4.analyze(warm_env[0], 700)[:5]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from nt_lotto.nt_engines import executor, nt_omega, vpa
+from nt_lotto.nt_engines.executor import EngineExecutor, dependencies, frame_version
+
+@pytest.fixture
+def fresh_executor():
+    ex = EngineExecutor()
+    executor.set_executor(ex)
+    yield ex
+    executor.set_executor(None)
+
+def test_dependencies_are_topological():
+    assert dependencies("NT-Omega") == ["NT4", "NT5", "NT-LL", "VPA", "NT-VPA-1", "NTO"]
+    assert dependencies("VPA") == []
+
+def test_each_engine_runs_once_per_round(synthetic_draws, fresh_executor, monkeypatch):
+    calls = []
+    kernel = vpa._scores
+    monkeypatch.setattr(vpa, "_scores", lambda widx, ends, *a: calls.append(len(ends)) or kernel(widx, ends, *a))
+    df = synthetic_draws(seed=7)
+    for eid, kwargs in [("NT-Omega", {"k_eval": 45, "k_pool": 22}), ("NTO", {"k_eval": 45}), ("NT-VPA-1", {}), ("VPA", {})]:
+        fresh_executor.analyze(eid, df, 700, **kwargs)
+    assert calls == [1]
+    assert all(n == 1 for n in fresh_executor.computed.values())
+
+    # A batch over more rounds only scores the rounds not seen yet
+    fresh_executor.scores("NT-Omega", df, [699, 700, 701])
+    assert fresh_executor.computed["VPA"] == 3
+    assert fresh_executor.computed["NT-OMEGA"] == 3
+
+def test_memoized_scores_match_direct_batch(synthetic_draws, fresh_executor):
+    df = synthetic_draws(seed=7)
+    rounds = [650, 700, 721]
+    first = fresh_executor.scores("NT-Omega", df, rounds)
+    again = fresh_executor.scores("NT-Omega", df, rounds[::-1])
+    np.testing.assert_array_equal(again, first[::-1])
+    executor.set_executor(EngineExecutor(max_rows=0, max_results=0))
+    np.testing.assert_array_equal(nt_omega.score_batch(df, rounds, dtype=np.float64), first)
+
+def test_memo_is_keyed_by_content_and_params(synthetic_draws, fresh_executor):
+    df = synthetic_draws(seed=7)
+    changed = df.copy()
+    changed.loc[changed.index[-5], 'n1'] = 45 if changed.loc[changed.index[-5], 'n1'] != 45 else 1
+    assert frame_version(df) == frame_version(df.copy())
+    assert frame_version(df) != frame_version(changed)
+    fresh_executor.scores("VPA", df, [721])
+    fresh_executor.scores("VPA", df.copy(), [721])
+    assert fresh_executor.computed["VPA"] == 1
+    fresh_executor.scores("VPA", changed, [721])
+    fresh_executor.scores("VPA", df, [721], window_set=[3, 7])
+    assert fresh_executor.computed["VPA"] == 3
+
+def test_in_place_edit_is_not_served_from_memo(synthetic_draws, fresh_executor):
+    df = synthetic_draws(seed=7)
+    first = fresh_executor.scores("NT4", df, [721])
+    df.loc[df.index[-3], ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']] = [1, 2, 3, 4, 5, 6]
+    edited = fresh_executor.scores("NT4", df, [721])
+    assert not np.array_equal(edited, first)
+    executor.set_executor(EngineExecutor(max_rows=0, max_results=0))
+    np.testing.assert_array_equal(edited, executor.get_executor().scores("NT4", df.copy(), [721]))
+
+def test_failing_sub_engine_is_logged(synthetic_draws, fresh_executor, monkeypatch, caplog):
+    def fail(*a, **kw):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(vpa, "score_batch", fail)
+    with caplog.at_level("WARNING", logger="EngineExecutor"):
+        S = fresh_executor.scores("NTO", synthetic_draws(seed=7), [721])
+    assert np.isfinite(S).all()
+    assert "NTO: sub-engine VPA failed: RuntimeError: boom" in caplog.text
+
+def test_analyze_returns_copies(synthetic_draws, fresh_executor):
+    df = synthetic_draws(seed=7)
+    res = fresh_executor.analyze("VPA", df, 700)
+    res['scores'].clear()
+    assert len(fresh_executor.analyze("VPA", df, 700)['scores']) == 45
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.schema import EngineOutput
+from nt_lotto.nt_engines import nt_omega, nt_vpa_1, nto, vpa
+from nt_lotto.nt_engines.executor import EngineExecutor, set_executor
+
+def test_topk_is_a_stable_slice_of_one_argsort():
+    values = np.zeros(45)
+    values[[9, 2, 30]] = [2.0, 1.0, 1.0]
+    values[40] = np.nan
+    out = EngineOutput("X", values)
+    assert out.topk(4) == [10, 3, 31, 1]
+    assert out.topk(45)[-1] == 41
+    frame = pd.DataFrame({"score": values}, index=range(1, 46))
+    assert out.topk(20) == frame.sort_values("score", ascending=False, kind="stable").index[:20].tolist()
+
+def test_dataframe_view_is_lazy():
+    frame = pd.DataFrame({"score": np.linspace(1, 0, 45)}, index=range(1, 46))
+    out = EngineOutput("X", frame)
+    assert out.scores is frame and out.topk(3) == [1, 2, 3]
+    bare = EngineOutput("Y", frame["score"] * 2)
+    assert bare._frame is None
+    assert bare.scores["score"].iloc[0] == 2.0
+    assert not hasattr(bare, "__dict__")
+
+def test_evidence_flag_only_drops_the_strings(synthetic_draws):
+    df = synthetic_draws(seed=23)
+    set_executor(EngineExecutor())
+    try:
+        for analyze in (vpa.analyze, nt_vpa_1.analyze, nt_omega.analyze, nto.analyze):
+            full = analyze(df, 700)
+            lean = analyze(df, 700, evidence=False)
+            assert all(item["evidence"] for item in full["scores"])
+            assert all("evidence" not in item for item in lean["scores"])
+            assert lean["topk"] == full["topk"]
+            assert [i["score"] for i in lean["scores"]] == [i["score"] for i in full["scores"]]
+    finally:
+        set_executor(None)
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from nt_lotto.nt_engines import nt_ll, nt4, registry
+from nt_lotto.nt_engines.base import AnalyzeEngine, StubEngine
+from nt_lotto.nt_engines.executor import dependencies
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def test_specs_cover_the_fixed_engines():
+    assert len(registry.ENGINE_IDS) == 14
+    assert registry.get_spec("nt-omega").name == "NT-Omega"
+    assert registry.get_spec("NO-SUCH") is None
+    assert registry.BATCH_ENGINES == ["NT4", "NT-OMEGA", "NT5", "NTO", "NT-LL", "VPA", "NT-VPA-1"]
+    assert [s.engine_id for s in registry.ENGINE_SPECS if s.ranked] == ["NT4", "NT5"]
+    assert dependencies("NT-VPA-1") == ["VPA"]
+
+def test_entry_points_resolve():
+    assert registry.get_analyze("NT-LL") is nt_ll.analyze
+    assert registry.get_analyze("AL2")(None, 700)["engine"] == "AL2"
+    assert registry.get_score_batch("AL2") is None
+
+def test_modules_are_imported_on_first_use():
+    code = (
+        "import sys\n"
+        "from nt_lotto.nt_engines import registry\n"
+        "loaded = lambda: sorted(m.rsplit('.', 1)[1] for m in sys.modules if m.startswith('nt_lotto.nt_engines.'))\n"
+        "assert loaded() == ['base', 'registry'], loaded()\n"
+        "registry.get_score_batch('NT-LL')\n"
+        "assert 'nt_ll' in loaded() and 'vpa' not in loaded(), loaded()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+def test_get_engines_predicts_with_implemented_engines(synthetic_draws):
+    df = synthetic_draws(seed=17)
+    engines = {e.engine_id: e for e in registry.get_engines()}
+    assert isinstance(engines["NT4"], AnalyzeEngine) and isinstance(engines["AL1"], StubEngine)
+    train = df[df['round'] < 700]
+    engines["NT4"].fit(train, None)
+    engines["NT-LL"].fit(train, None)
+    assert engines["NT4"].topk_numbers(20) == nt4.analyze(df, 700)
+    assert engines["NT-LL"].topk_numbers(20) == nt_ll.analyze(df, 700)['topk']
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+from nt_lotto.nt_core.features import build_feature_pack
+from nt_lotto.nt_core.feature_builder import FeaturePackBuilder
+
+def _assert_same_pack(a, b):
+    assert a.t_end == b.t_end
+    exact = a.num_features.drop(columns=['ew_freq'], errors='ignore')
+    pdt.assert_frame_equal(exact, b.num_features.drop(columns=['ew_freq'], errors='ignore'), check_exact=True)
+    if 'ew_freq' in a.num_features:
+        np.testing.assert_allclose(b.num_features['ew_freq'], a.num_features['ew_freq'], rtol=1e-9, atol=1e-12)
+        assert ((a.num_features['ew_freq'] == 0) == (b.num_features['ew_freq'] == 0)).all()
+    pdt.assert_frame_equal(a.pair_stats, b.pair_stats, check_exact=True)
+    assert a.shape_stats.keys() == b.shape_stats.keys()
+    if a.shape_stats:
+        pdt.assert_series_equal(pd.Series(a.shape_stats['sum_stats']), pd.Series(b.shape_stats['sum_stats']), check_exact=True)
+        assert a.shape_stats['pattern_counts'] == b.shape_stats['pattern_counts']
+    if a.slot_state_probs is None:
+        assert b.slot_state_probs is None and b.markov_state is None
+    else:
+        pdt.assert_frame_equal(a.slot_state_probs, b.slot_state_probs, check_exact=True)
+        pdt.assert_frame_equal(a.markov_state, b.markov_state, check_exact=True)
+        assert a.state_mode == b.state_mode
+        assert (a.slot_counts == b.slot_counts).all() and (a.markov_counts == b.markov_counts).all()
+
+def test_builder_matches_batch_walk_forward(synthetic_ssot):
+    ssot = synthetic_ssot(T=160, seed=3)
+    params = dict(windows=[3, 5, 10, 20, 50], ew_alpha=0.93, ew_k=40, use_state="band_tail", pair_window=60)
+    builder = FeaturePackBuilder(ssot, **params)
+    for t_end in range(599, 761):
+        _assert_same_pack(build_feature_pack(ssot, t_end, **params), builder.feature_pack(t_end))
+
+def test_builder_rewinds(synthetic_ssot):
+    ssot = synthetic_ssot(T=40, seed=3)
+    builder = FeaturePackBuilder(ssot)
+    builder.feature_pack(640)
+    _assert_same_pack(build_feature_pack(ssot, 610), builder.feature_pack(610))
+
+def test_builder_requires_limits_maintained_groups(synthetic_ssot):
+    ssot = synthetic_ssot(T=60, seed=3)
+    builder = FeaturePackBuilder(ssot, requires={"num"})
+    pack = builder.feature_pack(650)
+    assert pack.loaded_groups() == set()
+    ref = build_feature_pack(ssot, 650)
+    pdt.assert_frame_equal(pack.num_features, ref.num_features, rtol=1e-9)
+    assert pack.loaded_groups() == {"num"}
+    # groups outside requires are not tracked, but still readable through the batch path
+    assert builder._pairs.n_rows == 0
+    pdt.assert_frame_equal(pack.pair_stats, ref.pair_stats, check_exact=True)
@@ -0,0 +1,112 @@
+import os
+import pandas as pd
+from nt_lotto.nt_core.schema import FEATURE_GROUPS
+from nt_lotto.nt_core.constants import WINDOWS_DEFAULT, EW_ALPHA_DEFAULT, PAIR_WINDOW_DEFAULT
+from nt_lotto.nt_core.features import build_feature_pack
+from nt_lotto.nt_core import feature_cache
+from nt_lotto.nt_core.feature_cache import FeatureCache, set_feature_cache
+from nt_lotto.nt_core.schema import SSOT
+
+PARAMS = (WINDOWS_DEFAULT, EW_ALPHA_DEFAULT, 200, "band_parity", PAIR_WINDOW_DEFAULT)
+
+def _assert_pack_equal(a, b):
+    assert a.t_end == b.t_end
+    pd.testing.assert_frame_equal(a.num_features, b.num_features, check_index_type=False)
+    pd.testing.assert_frame_equal(a.pair_stats, b.pair_stats)
+    pd.testing.assert_frame_equal(a.slot_state_probs, b.slot_state_probs, check_index_type=False)
+    pd.testing.assert_frame_equal(a.markov_state, b.markov_state, check_index_type=False)
+    pd.testing.assert_series_equal(pd.Series(a.shape_stats['sum_stats']), pd.Series(b.shape_stats['sum_stats']))
+    assert a.shape_stats['pattern_counts'] == b.shape_stats['pattern_counts']
+
+def _loaded(pack):
+    for group in FEATURE_GROUPS.values():
+        for field in group:
+            getattr(pack, field)
+    return pack
+
+def test_disk_round_trip(synthetic_ssot, tmp_path):
+    ssot = synthetic_ssot(seed=9)
+    set_feature_cache(None)
+    ref = _loaded(build_feature_pack(ssot, 700))
+
+    cache = FeatureCache(root=str(tmp_path))
+    key = cache.key(ssot, 700, *PARAMS)
+    cache.put(key, ref)
+    fresh = FeatureCache(root=str(tmp_path))
+    _assert_pack_equal(fresh.get(key), ref)
+
+def test_empty_history_round_trip(synthetic_ssot, tmp_path):
+    ssot = synthetic_ssot(seed=9)
+    set_feature_cache(None)
+    ref = _loaded(build_feature_pack(ssot, 500))
+    cache = FeatureCache(root=str(tmp_path))
+    cache.put("k" * 64, ref)
+    got = FeatureCache(root=str(tmp_path)).get("k" * 64)
+    pd.testing.assert_frame_equal(got.num_features, ref.num_features)
+    pd.testing.assert_frame_equal(got.pair_stats, ref.pair_stats)
+    assert got.slot_state_probs is None and got.shape_stats == {}
+
+def test_new_draw_keeps_earlier_keys(synthetic_ssot, tmp_path):
+    cache = FeatureCache(root=str(tmp_path))
+    short, longer = synthetic_ssot(T=100, seed=9), synthetic_ssot(T=101, seed=9)
+    assert cache.key(short, 680, *PARAMS) == cache.key(longer, 680, *PARAMS)
+    assert cache.key(short, 700, *PARAMS) != cache.key(longer, 701, *PARAMS)
+    assert cache.key(short, 680, *PARAMS) != cache.key(synthetic_ssot(T=100, seed=3), 680, *PARAMS)
+
+def test_key_covers_ordered_rows(synthetic_ssot, tmp_path):
+    cache = FeatureCache(root=str(tmp_path))
+    ssot = synthetic_ssot(seed=9)
+    key = cache.key(ssot, 680, *PARAMS)
+    o = ssot.ordered_df
+    # A duplicated ordered round is invisible to the draw matrix but not to the order features
+    dup = SSOT(sorted_df=ssot.sorted_df, ordered_df=pd.concat([o, o[o["round"] == 650]], ignore_index=True))
+    assert cache.key(dup, 680, *PARAMS) != key
+    assert cache.key(dup, 640, *PARAMS) == cache.key(ssot, 640, *PARAMS)
+    # Ordered rows whose round is missing from sorted_df
+    s = ssot.sorted_df[ssot.sorted_df["round"] != 679]
+    swapped = o.copy()
+    row = swapped["round"] == 679
+    swapped.loc[row, ["b1", "b2"]] = swapped.loc[row, ["b2", "b1"]].to_numpy()
+    assert cache.key(SSOT(sorted_df=s, ordered_df=o), 680, *PARAMS) != cache.key(SSOT(sorted_df=s, ordered_df=swapped), 680, *PARAMS)
+
+def test_key_covers_feature_code(synthetic_ssot, tmp_path, monkeypatch):
+    cache = FeatureCache(root=str(tmp_path))
+    ssot = synthetic_ssot(seed=9)
+    key = cache.key(ssot, 680, *PARAMS)
+    monkeypatch.setattr(feature_cache, "_CODE_HASH", "0" * 64)
+    assert cache.key(ssot, 680, *PARAMS) != key
+
+def test_build_feature_pack_hits_cache(synthetic_ssot, tmp_path):
+    ssot = synthetic_ssot(seed=9)
+    cache = FeatureCache(root=str(tmp_path))
+    set_feature_cache(cache)
+    try:
+        first = build_feature_pack(ssot, 690)
+        assert build_feature_pack(ssot, 690) is first
+    finally:
+        set_feature_cache(None)
+
+def test_lazy_pack_writes_back_loaded_groups(synthetic_ssot, tmp_path):
+    ssot = synthetic_ssot(seed=9)
+    cache = FeatureCache(root=str(tmp_path))
+    set_feature_cache(cache)
+    try:
+        pack = build_feature_pack(ssot, 690)
+        assert pack.loaded_groups() == set()
+        pack.num_features
+        assert pack.loaded_groups() == {"num"}
+    finally:
+        set_feature_cache(None)
+    stored = FeatureCache(root=str(tmp_path)).get(cache.key(ssot, 690, *PARAMS))
+    assert stored.loaded_groups() == {"num"}
+    pd.testing.assert_frame_equal(stored.num_features, pack.num_features, check_index_type=False)
+
+def test_lru_and_disk_eviction(synthetic_ssot, tmp_path):
+    ssot = synthetic_ssot(seed=9)
+    root = tmp_path / "lru"
+    cache = FeatureCache(root=str(root), max_items=2, max_bytes=1)
+    for t_end in (650, 660, 670):
+        cache.put(cache.key(ssot, t_end, *PARAMS), _loaded(build_feature_pack(ssot, t_end)))
+    assert len(cache._lru) == 2
+    files = [f for _, _, fs in os.walk(root) for f in fs]
+    assert len(files) <= 1
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.features import build_feature_pack
+from nt_lotto.nt_core.feature_tensor import build_feature_tensor
+
+def test_tensor_slices_match_feature_pack(synthetic_ssot):
+    ssot = synthetic_ssot(T=260, seed=5)
+    t_ends = list(range(598, 861, 7))
+    tensor = build_feature_tensor(ssot, t_ends)
+    assert tensor.values.dtype == np.float32
+    assert tensor.values.shape == (len(t_ends), 45, len(tensor.columns))
+
+    for t_end in t_ends:
+        ref = build_feature_pack(ssot, t_end).num_features
+        got = tensor.num_features(t_end)
+        assert list(got.columns) == list(ref.columns)
+        if ref.empty:
+            assert got.empty
+            continue
+        np.testing.assert_allclose(got.to_numpy(), ref.to_numpy(), rtol=1e-6, atol=1e-6)
+
+def test_feature_pack_uses_tensor_slice(synthetic_ssot):
+    ssot = synthetic_ssot(T=80, seed=5)
+    tensor = build_feature_tensor(ssot, [650])
+    pack = build_feature_pack(ssot, 650, tensor=tensor)
+    pd.testing.assert_frame_equal(pack.num_features, tensor.num_features(650))
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.frame_memo import FrameMemo, frame_fingerprint, pinned_fingerprint
+
+def _df():
+    rng = np.random.default_rng(3)
+    return pd.DataFrame(rng.integers(1, 46, size=(30, 7)), columns=['round', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6'])
+
+def test_fingerprint_follows_content():
+    df = _df()
+    fp = frame_fingerprint(df)
+    assert frame_fingerprint(df.copy()) == fp
+    assert frame_fingerprint(df.rename(columns={'n6': 'bonus'})) != fp
+    df.loc[3, 'n2'] += 1
+    assert frame_fingerprint(df) != fp
+    assert frame_fingerprint(None) == ""
+
+def test_memo_rebuilds_after_edit_and_is_bounded():
+    df, builds = _df(), []
+    memo = FrameMemo(maxsize=2)
+    build = lambda: builds.append(1) or len(builds)
+    assert memo.get([df], build) == memo.get([df.copy()], build) == 1
+    assert memo.get([df], build, key='other') == 2
+    df.loc[0, 'n1'] += 1
+    assert memo.get([df], build) == 3
+    assert len(memo._memo) == 2
+
+def test_pinned_fingerprint_is_scoped():
+    df = _df()
+    with pinned_fingerprint(df) as fp:
+        with pinned_fingerprint(df) as inner:
+            assert inner == fp
+        df.loc[0, 'n1'] += 1     # a pin serves the fingerprint taken on entry
+        assert frame_fingerprint(df) == fp
+    assert frame_fingerprint(df) != fp
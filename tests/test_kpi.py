@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
+import numpy as np
 import pandas as pd
-from nt_lotto.nt_core.kpi import compute_recall_at_k, update_engine_kpi
+from nt_lotto.nt_core.kpi import compute_recall_at_k, load_kpi_state, update_engine_kpi
 
 class TestKPI(unittest.TestCase):
     def test_recall(self):
@@ -35,5 +38,50 @@ class TestKPI(unittest.TestCase):
         # E2: R100=0.0, R101=1.0. Mean=0.5
         self.assertAlmostEqual(e2['overall'], 0.5)
 
+    def _history(self, T=60, start=100, seed=5):
+        rng = np.random.default_rng(seed)
+        ssot = []
+        for i in range(T):
+            d = sorted(rng.choice(np.arange(1, 46), 6, replace=False).tolist())
+            ssot.append({'round': start + i, **{f'n{j + 1}': d[j] for j in range(6)}})
+        topk = {
+            eng: {start + i: rng.choice(np.arange(1, 46), 20, replace=False).tolist() for i in range(T + 1)}
+            for eng in ("E1", "E2")
+        }
+        return pd.DataFrame(ssot), topk
+
+    def test_incremental_kpi_matches_rebuild(self):
+        ssot_df, history = self._history()
+        exclusions = {105, 130}
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "state.json")
+            for end in range(110, 161, 7):
+                part = {eng: {r: n for r, n in h.items() if r <= end} for eng, h in history.items()}
+                inc = update_engine_kpi("dummy.csv", part, ssot_df, exclusions, state_path=state)
+                full = update_engine_kpi("dummy.csv", part, ssot_df, exclusions)
+                pd.testing.assert_frame_equal(inc, full)
+            # Round 160 (no draw yet) is left for the next update
+            states = load_kpi_state(state, 20, (10, 20, 30), exclusions)
+            self.assertEqual(states["E1"].last_round, 159)
+            self.assertEqual(states["E1"].n, 58)
+            self.assertEqual(len(states["E1"].recent), 30)
+
+    def test_backfilled_round_rebuilds_engine(self):
+        ssot_df, history = self._history()
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "state.json")
+            update_engine_kpi("dummy.csv", history, ssot_df, set(), state_path=state)
+            before = load_kpi_state(state, 20, (10, 20, 30), set())
+            history["E1"][120] = ssot_df.loc[ssot_df['round'] == 120, ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].iloc[0].tolist()
+            # The rewrite is detected from the checkpoint's digest, without the caller naming it
+            inc = update_engine_kpi("dummy.csv", history, ssot_df, set(), state_path=state)
+            full = update_engine_kpi("dummy.csv", history, ssot_df, set())
+            pd.testing.assert_frame_equal(inc, full)
+            after = load_kpi_state(state, 20, (10, 20, 30), set())
+            self.assertNotEqual(after["E1"].digest, before["E1"].digest)
+            self.assertEqual(after["E2"].digest, before["E2"].digest)
+            # Another exclusion set invalidates the checkpoint
+            self.assertEqual(load_kpi_state(state, 20, (10, 20, 30), {101}), {})
+
 if __name__ == '__main__':
     unittest.main()
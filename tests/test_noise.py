@@ -0,0 +1,39 @@
+import threading
+import numpy as np
+from nt_lotto.nt_core.noise import batch_noise, round_noise
+from nt_lotto.nt_core.features import build_feature_pack
+from nt_lotto.nt_core.engines.nt4 import NT4ExplorationEngine
+from nt_lotto.nt_core.engines.nt_exp import NTExplorationEngine
+
+def test_streams_match_legacy_global_seeding():
+    for t in (0, 650, 1100):
+        np.random.seed(t)
+        legacy = np.random.normal(0, 0.05, size=45)
+        assert np.array_equal(round_noise(t, 0.05), legacy)
+    rows = batch_noise([700, 650, 700], 0.1)
+    assert np.array_equal(rows[1], round_noise(650, 0.1)) and np.array_equal(rows[0], rows[2])
+
+def test_engines_leave_the_global_rng_alone(synthetic_ssot):
+    ssot = synthetic_ssot(seed=31)
+    pack = build_feature_pack(ssot, 700)
+    np.random.seed(5)
+    expected = np.random.random(3)
+    np.random.seed(5)
+    NT4ExplorationEngine().score_numbers(ssot, pack, 700)
+    NTExplorationEngine().score_numbers(ssot, pack, 700)
+    assert np.array_equal(np.random.random(3), expected)
+
+def test_threads_and_batches_agree_with_single_calls(synthetic_ssot):
+    ssot = synthetic_ssot(seed=31)
+    t_ends = list(range(640, 720, 4))
+    packs = {t: build_feature_pack(ssot, t) for t in t_ends}
+    for eng in (NT4ExplorationEngine(), NTExplorationEngine()):
+        ref = np.array([eng.score_numbers(ssot, packs[t], t).values for t in t_ends])
+        got = {}
+        threads = [threading.Thread(target=lambda t=t: got.__setitem__(t, eng.score_numbers(ssot, packs[t], t).values)) for t in t_ends]
+        for th in threads: th.start()
+        for th in threads: th.join()
+        assert np.array_equal(np.array([got[t] for t in t_ends]), ref)
+        # Batch rows follow the backtest packs (float32 tensor features)
+        batch = eng.score_batch(ssot, t_ends)
+        assert batch.shape == ref.shape and np.allclose(batch, ref, atol=1e-5)
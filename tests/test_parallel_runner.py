@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from nt_lotto.nt_engines import executor
+from nt_lotto.nt_engines.executor import EngineExecutor
+from nt_lotto.nt_engines.parallel import ParallelRunner, _frame_from, _frame_layout
+from nt_lotto.nt_engines.result_store import ResultStore
+
+@pytest.fixture(autouse=True)
+def fresh_executor():
+    executor.set_executor(EngineExecutor())
+    yield
+    executor.set_executor(None)
+
+def test_shared_frame_keeps_columns_and_dtypes(synthetic_draws):
+    df = synthetic_draws(seed=11, date=True)
+    values, layout = _frame_layout(df)
+    assert values.shape == (len(df), 8)
+    back = _frame_from(values, layout)
+    assert list(back.columns) == list(df.columns)
+    assert not pd.api.types.is_numeric_dtype(back['date'])
+    pd.testing.assert_frame_equal(back.drop(columns='date'), df.drop(columns='date'))
+
+def test_pool_matches_serial_in_round_order(synthetic_draws):
+    df = synthetic_draws(seed=11, date=True)
+    engines = ["NT4", "NT-LL", "NTO", "NT-Omega"]
+    rounds = [721, 650, 700, 601, 690, 710, 655]
+    with ParallelRunner(df, workers=1) as runner:
+        serial = runner.scores(engines, rounds)
+    executor.set_executor(EngineExecutor())
+    with ParallelRunner(df, workers=2, block=2) as runner:
+        pooled = runner.scores(engines, rounds)
+        # Few rounds: one task per engine
+        single = runner.scores(["VPA", "NT5"], [700])
+    assert list(pooled) == [e.upper() for e in engines]
+    for eid in pooled:
+        np.testing.assert_array_equal(pooled[eid], serial[eid])
+    np.testing.assert_array_equal(single["VPA"], executor.get_executor().scores("VPA", df, [700]))
+
+def test_failing_engine_is_left_out(synthetic_draws):
+    with ParallelRunner(synthetic_draws(seed=11, date=True), workers=2) as runner:
+        out = runner.scores(["VPA", "NO-SUCH"], [700, 701])
+    assert list(out) == ["VPA"]
+    assert "NO-SUCH" in runner.errors
+
+def test_store_warm_with_workers(synthetic_draws, tmp_path):
+    df = synthetic_draws(seed=11, date=True)
+    store = ResultStore(root=str(tmp_path))
+    assert store.warm(["NT-VPA-1"], df, range(690, 700), workers=2) == {"NT-VPA-1": 10}
+    executor.set_executor(EngineExecutor())
+    np.testing.assert_array_equal(
+        ResultStore(root=str(tmp_path)).results("NT-VPA-1", df, range(690, 700)).scores,
+        ResultStore(root=None).results("NT-VPA-1", df, range(690, 700)).scores)
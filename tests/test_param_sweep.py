@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from nt_lotto.nt_engines import executor, nt4, nt5, nt_ll
+from nt_lotto.nt_engines.executor import EngineExecutor
+from nt_lotto.nt_engines.sweep import config_hits, expand_grid, rung_rounds, successive_halving, sweep
+
+@pytest.fixture(autouse=True)
+def fresh_executor():
+    executor.set_executor(EngineExecutor())
+    yield
+    executor.set_executor(None)
+
+def test_score_batch_overrides_engine_constants(synthetic_draws):
+    df = synthetic_draws(T=160, seed=19, date=True)
+    rounds = list(range(690, 720))
+    defaults = [
+        (nt4, {"w_g": nt4.W_G, "w_r": nt4.W_R, "w_t": nt4.W_T}, {"w_t": 0.6}),
+        (nt5, {"a1": nt5.A1, "a6": nt5.A6}, {"a6": 0.5}),
+        (nt_ll, {"b_under": nt_ll.B_UNDER, "b_over": nt_ll.B_OVER, "w_size": nt_ll.W_SIZE}, {"w_size": 10}),
+    ]
+    for mod, same, other in defaults:
+        base = mod.score_batch(df, rounds)
+        assert np.array_equal(mod.score_batch(df, rounds, **same), base)
+        assert not np.array_equal(mod.score_batch(df, rounds, **other), base)
+
+def test_grid_and_rungs(synthetic_draws):
+    assert expand_grid({"a": [1, 2], "b": [3, 4]}) == [{"a": 1, "b": 3}, {"a": 1, "b": 4}, {"a": 2, "b": 3}, {"a": 2, "b": 4}]
+    subsets = rung_rounds(range(1, 21), 3, 3)
+    assert subsets[0] == [2, 11, 20] and subsets[-1] == list(range(1, 21))
+    assert set(subsets[0]) <= set(subsets[1]) <= set(subsets[2])
+    with pytest.raises(ValueError):
+        successive_halving("NT4", synthetic_draws(T=160, seed=19, date=True), [700], [{"alpha": 1.0}])
+    with pytest.raises(ValueError):
+        successive_halving("AL1", synthetic_draws(T=160, seed=19, date=True), [700], [{}])
+
+def test_full_sweep_ranks_by_walk_forward_recall(synthetic_draws):
+    df = synthetic_draws(T=160, seed=19, date=True)
+    rounds = list(range(700, 760))
+    configs = expand_grid({"alpha": [0.0, 0.5, 1.0, 2.0]})
+    res = successive_halving("NT-VPA-1", df, rounds, configs, eta=1, folds=3)
+    hits = config_hits(df, "NT-VPA-1", configs, rounds, 20)
+    recall = hits.mean(axis=1) / 6.0
+    assert (res['n_rounds'] == 60).all() and (res['rung'] == 0).all()
+    assert res['recall'].tolist() == sorted(res['recall'].tolist(), reverse=True)
+    assert np.allclose(res.set_index('config').loc[range(4), 'recall'], recall)
+    assert np.isclose(res['recall_fold1'].iloc[0], hits[res['config'].iloc[0], :20].mean() / 6.0)
+
+def test_successive_halving_is_independent_of_workers(synthetic_draws):
+    df = synthetic_draws(T=160, seed=19, date=True)
+    rounds = list(range(640, 760))
+    grid = {"w_g": [0.3, 0.5, 0.7], "w_r": [0.1, 0.3, 0.5], "w_t": [0.0, 0.2, 0.4]}
+    serial = sweep("NT4", df, rounds, grid, eta=3, min_rounds=10, chunk=4)
+    pooled = sweep("NT4", df, rounds, grid, eta=3, min_rounds=10, chunk=4, workers=2)
+    pd.testing.assert_frame_equal(serial, pooled)
+    # 27 -> 9 -> 3 configurations on 14 / 40 / 120 rounds
+    assert serial['rung'].value_counts().sort_index().tolist() == [18, 6, 3]
+    assert serial['n_rounds'].drop_duplicates().tolist() == [120, 40, 14]
@@ -0,0 +1,81 @@
+import json
+import os
+import numpy as np
+import pytest
+from nt_lotto.nt_engines import executor, nt_ll, nto
+from nt_lotto.nt_engines.executor import EngineExecutor
+from nt_lotto.nt_engines.result_store import ResultStore, history_hashes
+
+@pytest.fixture(autouse=True)
+def fresh_executor():
+    executor.set_executor(EngineExecutor())
+    yield
+    executor.set_executor(None)
+
+def test_round_trip_matches_engine(synthetic_draws, tmp_path):
+    df = synthetic_draws(seed=5)
+    rounds = [601, 650, 700, 721]
+    store = ResultStore(root=str(tmp_path))
+    first = store.results("NT-LL", df, rounds)
+    assert store.misses == 4 and store.hits == 0
+
+    again = ResultStore(root=str(tmp_path)).results("NT-LL", df, rounds)
+    np.testing.assert_array_equal(again.scores, first.scores)
+    np.testing.assert_array_equal(again.order, first.order)
+    assert again.scores.dtype == np.float32
+    np.testing.assert_array_equal(again.scores, nt_ll.score_batch(df, rounds))
+
+    # Top-K comes from the float64 ranking, exactly as analyze() returns it
+    for i, r in enumerate(rounds):
+        assert again.topk(i, 20) == nt_ll.analyze(df, r)['topk']
+
+def test_appending_a_draw_keeps_earlier_rounds(synthetic_draws, tmp_path):
+    df = synthetic_draws(seed=5)
+    store = ResultStore(root=str(tmp_path))
+    store.results("NTO", df.iloc[:100], [650, 700])
+    store.results("NTO", df, [650, 700, 721])
+    assert store.hits == 2 and store.misses == 3
+
+    hashes, history = history_hashes(df, np.array([650, 700]))
+    assert list(history) == [49, 99]
+    assert hashes == history_hashes(df.iloc[:100], np.array([650, 700]))[0]
+
+def test_params_and_content_change_the_key(synthetic_draws, tmp_path):
+    df = synthetic_draws(seed=5)
+    store = ResultStore(root=str(tmp_path))
+    store.results("NTO", df, [700])
+    store.results("NTO", df, [700], engine_weights={"VPA": 1.0})
+    changed = df.copy()
+    changed.loc[10, 'bonus'] = 45 if changed.loc[10, 'bonus'] != 45 else 1
+    store.results("NTO", changed, [700])
+    assert store.misses == 3
+    np.testing.assert_allclose(
+        store.results("NTO", df, [700], engine_weights={"VPA": 1.0}).scores,
+        nto.score_batch(df, [700], engine_weights={"VPA": 1.0}))
+
+def test_in_place_edit_changes_the_key(synthetic_draws):
+    df = synthetic_draws(seed=5)
+    before, _ = history_hashes(df, np.array([650, 700]))
+    df.loc[60, 'bonus'] = 45 if df.loc[60, 'bonus'] != 45 else 1
+    after, _ = history_hashes(df, np.array([650, 700]))
+    assert after[0] == before[0] and after[1] != before[1]
+    assert after == history_hashes(df.copy(), np.array([650, 700]))[0]
+
+def test_warm_and_prune(synthetic_draws, tmp_path):
+    df = synthetic_draws(seed=5)
+    store = ResultStore(root=str(tmp_path))
+    assert store.warm(["VPA", "NT5"], df, range(690, 700)) == {"VPA": 10, "NT5": 10}
+    assert store.warm(["VPA"], df, range(690, 705)) == {"VPA": 5}
+
+    # Two segments are compacted into one, nothing is lost
+    assert store.prune() == 0
+    vpa_group = [d for d in (tmp_path / "VPA").iterdir()][0]
+    assert len([f for f in os.listdir(vpa_group) if f.startswith("seg-")]) == 1
+    assert ResultStore(root=str(tmp_path)).warm(["VPA"], df, range(690, 705)) == {"VPA": 0}
+
+    # Results of changed engine code are stale
+    meta = json.loads((vpa_group / "meta.json").read_text())
+    (vpa_group / "meta.json").write_text(json.dumps(dict(meta, code="old")))
+    assert store.prune() == 15
+    assert not vpa_group.exists()
+    assert store.prune(max_bytes=0) == 10
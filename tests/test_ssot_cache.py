@@ -0,0 +1,61 @@
+import os
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core import ssot_cache
+from nt_lotto.nt_core.ssot_cache import load_draw_table, load_ssot_frame, sidecar_paths
+
+def _write_csv(path, rows):
+    df = pd.DataFrame(rows, columns=['round', 'date', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'bonus'])
+    df.to_csv(path, index=False)
+
+ROWS = [
+    [1, '2020-01-04', 1, 2, 3, 4, 5, 6, 7],
+    [2, '2020-01-11', 10, 11, 12, 13, 14, 15, 16],
+    [3, '2020-01-18', 40, 41, 42, 43, 44, 45, 1],
+]
+
+def test_frame_matches_read_csv(tmp_path):
+    csv = str(tmp_path / "ssot_sorted.csv")
+    _write_csv(csv, ROWS)
+    ssot_cache.clear_memo()
+
+    df = load_ssot_frame(csv)
+    ref = pd.read_csv(csv)
+    assert list(df.columns) == list(ref.columns)
+    for c in ref.columns:
+        assert list(df[c]) == list(ref[c])
+
+    npy_path, meta_path = sidecar_paths(csv)
+    assert os.path.exists(npy_path) and os.path.exists(meta_path)
+
+def test_sidecar_is_mmapped_int8(tmp_path):
+    csv = str(tmp_path / "ssot_sorted.csv")
+    _write_csv(csv, ROWS)
+    ssot_cache.clear_memo()
+    load_draw_table(csv)
+    ssot_cache.clear_memo()
+
+    table = load_draw_table(csv)
+    assert isinstance(table, np.memmap)
+    assert table.dtype['n1'] == np.int8
+    assert table.dtype['round'] == np.int32
+
+def test_rebuild_on_csv_change(tmp_path):
+    csv = str(tmp_path / "ssot_sorted.csv")
+    _write_csv(csv, ROWS[:2])
+    ssot_cache.clear_memo()
+    assert len(load_ssot_frame(csv)) == 2
+
+    _write_csv(csv, ROWS)
+    st = os.stat(csv)
+    os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    df = load_ssot_frame(csv)
+    assert len(df) == 3
+    assert df['round'].tolist() == [1, 2, 3]
+
+def test_drops_broken_trailing_row(tmp_path):
+    csv = str(tmp_path / "ssot_sorted.csv")
+    _write_csv(csv, ROWS + [[None] * 9])
+    ssot_cache.clear_memo()
+    df = load_ssot_frame(csv)
+    assert df['round'].tolist() == [1, 2, 3]
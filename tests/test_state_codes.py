@@ -0,0 +1,34 @@
+import numpy as np
+from nt_lotto.nt_core.features import _state, state_labels, state_codes, slot_counts, transition_counts, markov_frame
+
+def _draws(synthetic_ssot):
+    """(T,6) numbers in draw order."""
+    return synthetic_ssot(T=60, seed=4).ordered_df[['b1', 'b2', 'b3', 'b4', 'b5', 'b6']].to_numpy()
+
+def test_codes_match_string_states():
+    for mode in ("band", "band_parity", "band_tail"):
+        labels = state_labels(mode)
+        codes = state_codes(np.arange(1, 46), mode)
+        assert [labels[c] for c in codes] == [_state(n, mode) for n in range(1, 46)]
+
+def test_bincount_matrices_match_loops(synthetic_ssot):
+    draws = _draws(synthetic_ssot)
+    mode = "band_parity"
+    S = len(state_labels(mode))
+    codes = state_codes(draws, mode)
+    slots = slot_counts(codes, S)
+    trans = transition_counts(codes, S)
+    ref_s = np.zeros((6, S), dtype=int)
+    ref_t = np.zeros((S, S), dtype=int)
+    for row in codes:
+        for j in range(6):
+            ref_s[j, row[j]] += 1
+        for j in range(5):
+            ref_t[row[j], row[j + 1]] += 1
+    assert (slots == ref_s).all() and (trans == ref_t).all()
+    assert (slots.sum(axis=1) == len(draws)).all()
+
+    mk = markov_frame(trans, mode)
+    assert mk['count'].sum() == 5 * len(draws)
+    assert mk['count'].is_monotonic_decreasing
+    np.testing.assert_allclose(mk.groupby('from')['p'].sum(), 1.0)
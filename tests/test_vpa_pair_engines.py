@@ -0,0 +1,38 @@
+import numpy as np
+from nt_lotto.nt_core.features import build_feature_pack
+from nt_lotto.nt_core.engines.vpa_engines import VPA, NTVPA1, anchor_rows, anchor_scores, pair_matrices
+
+def test_anchor_row_sums_match_pair_loop(synthetic_ssot):
+    ssot = synthetic_ssot(T=150, seed=21)
+    pair_df = build_feature_pack(ssot, 700).pair_stats
+    counts, lift = pair_matrices(pair_df)
+    anchors = [3, 17, 40]
+    ref_c, ref_l = np.zeros(46), np.zeros(46)
+    for anc in anchors:
+        for _, row in pair_df[(pair_df["n1"] == anc) | (pair_df["n2"] == anc)].iterrows():
+            other = int(row["n2"] if row["n1"] == anc else row["n1"])
+            ref_c[other] += row["count"]
+            if row["lift"] > 1.2:
+                ref_l[other] += row["lift"]
+    assert np.array_equal(anchor_scores(counts, anchor_rows([anchors]))[0], ref_c[1:])
+    strong = np.where(lift > 1.2, lift, 0.0)
+    assert np.array_equal(anchor_scores(strong, anchor_rows([anchors]))[0], ref_l[1:])
+
+def test_batch_scores_equal_per_round_scores(synthetic_ssot):
+    ssot = synthetic_ssot(T=150, seed=21)
+    t_ends = [600, 601, 602] + list(range(610, 751, 9)) + [760]
+    packs = [build_feature_pack(ssot, t) for t in t_ends]
+    for eng in (VPA(), NTVPA1()):
+        ref = np.array([eng.score_numbers(ssot, p, t).values for p, t in zip(packs, t_ends)])
+        assert np.array_equal(eng.score_batch(ssot, t_ends), ref), eng.name
+    assert not ref[0].any() and not ref[-1].any()
+
+def test_batch_takes_an_anchor_matrix(synthetic_ssot):
+    ssot = synthetic_ssot(T=150, seed=21)
+    t_ends = [650, 700]
+    anchors = anchor_rows([[1, 2, 3], [44, 45]])
+    out = VPA().score_batch(ssot, t_ends, anchors=anchors)
+    # Same anchors through the per-round row sums
+    pair_df = build_feature_pack(ssot, 700).pair_stats
+    raw = anchor_scores(pair_matrices(pair_df)[0], anchors[1:])[0]
+    assert np.allclose(out[1], (raw - raw.mean()) / raw.std(ddof=1))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from nt_lotto.nt_core.window_index import WindowIndex, frame_index, history_index
+
+def _value_counts(df, cols):
+    vals = df[cols].values.flatten()
+    return pd.Series(vals).value_counts().reindex(range(1, 46), fill_value=0).to_numpy()
+
+def test_window_counts_match_value_counts(synthetic_draws):
+    df = synthetic_draws(T=120, start=1, seed=7)
+    widx = WindowIndex.from_frame(df)
+    cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']
+    for a, b in [(0, 120), (10, 40), (119, 120), (50, 50)]:
+        assert (widx.count(a, b) == _value_counts(df.iloc[a:b], cols)).all()
+        assert (widx.bonus_count(a, b) == _value_counts(df.iloc[a:b], ['bonus'])).all()
+    assert (widx.tail_count(5, 30) == _value_counts(df.head(5), cols)).all()
+
+def test_last_seen(synthetic_draws):
+    df = synthetic_draws(T=120, start=1, seed=7)
+    widx = WindowIndex.from_frame(df)
+    end = 60
+    expected = np.zeros(45, dtype=int)
+    for _, row in df.head(end).iterrows():
+        for c in ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']:
+            expected[row[c] - 1] = row['round']
+    assert (widx.last_seen(end) == expected).all()
+
+def test_history_index_excludes_target_round(synthetic_draws):
+    df = synthetic_draws(T=120, start=1, seed=7)
+    widx, end = history_index(df, 50)
+    assert end == 49
+    assert widx.rounds[:end].max() < 50
+
+def test_frame_index_follows_in_place_edits(synthetic_draws):
+    df = synthetic_draws(T=120, start=1, seed=7)
+    cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6']
+    assert frame_index(df) is frame_index(df.copy())
+    df.loc[10, cols] = [1, 2, 3, 4, 5, 6]
+    assert (frame_index(df).count(0, 120) == _value_counts(df, cols)).all()